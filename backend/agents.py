@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import asyncio
+import importlib
+import threading
+from typing import Dict
+from metrics import Counter, Histogram
+
+# Lazy access to the four agent graphs.
+# Importing an agent pulls in LangGraph, LangChain and the Groq SDK and builds
+# its compiled graph and chat model, which is most of a worker's boot time. The
+# modules are now imported on first use (on a thread, so the event loop keeps
+# serving) or warmed by the lifespan hook; a worker that only serves /exams
+# never loads them at all.
+#   AGENT_WARMUP=background  load after startup without delaying readiness (default)
+#   AGENT_WARMUP=blocking    load before the worker accepts requests
+#   AGENT_WARMUP=off         load on the first request that needs an agent
+# Every graph run is timed and counted by who decided (rules, cache, llm, ...)
+# for /metrics.
+
+AGENT_MODULES = ("grading_agent", "integrity_agent", "audio_agent", "identity_agent")
+AGENT_WARMUP = os.environ.get("AGENT_WARMUP", "background").lower()
+
+_import_lock = threading.Lock()
+load_seconds: Dict[str, float] = {}
+
+graph_seconds = Histogram("agent_graph_seconds", "Agent graph run latency", ["graph", "outcome"])
+graph_decisions = Counter("agent_decisions_total", "Completed graph runs by deciding step", ["graph", "decided_by"])
+
+
+def _import_agent(module_name: str):
+    with _import_lock:
+        module = sys.modules.get(module_name)
+        if module is None:
+            started = time.perf_counter()
+            module = importlib.import_module(module_name)
+            load_seconds[module_name] = round(time.perf_counter() - started, 3)
+            print(f"Loaded {module_name} in {load_seconds[module_name]:.2f}s")
+        return module
+
+
+async def load_agent(module_name: str):
+    module = sys.modules.get(module_name)
+    if module is not None and module_name in load_seconds:
+        return module
+    return await asyncio.to_thread(_import_agent, module_name)
+
+
+class LazyGraph:
+    # Stand-in for a compiled graph; the agent module is imported on the first ainvoke
+    def __init__(self, module_name: str, attr: str):
+        self.module_name = module_name
+        self.attr = attr
+        self.name = module_name.replace("_agent", "")  # metrics label: grading, integrity, audio, identity
+
+    async def ainvoke(self, state, *args, **kwargs):
+        graph = getattr(await load_agent(self.module_name), self.attr)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await graph.ainvoke(state, *args, **kwargs)
+            outcome = "ok"
+        finally:
+            graph_seconds.observe(time.perf_counter() - started, graph=self.name, outcome=outcome)
+        decided_by = result.get("decided_by") or ("cache" if result.get("cached") else "llm")
+        graph_decisions.inc(graph=self.name, decided_by=decided_by)
+        return result
+
+
+async def warm_agents():
+    for module_name in AGENT_MODULES:
+        try:
+            await load_agent(module_name)
+        except Exception as e:
+            # Left for the first request to retry (and report) the import
+            print(f"Warm-up of {module_name} failed: {e}")
+
+
+def agent_stats() -> dict:
+    return {
+        "warmup": AGENT_WARMUP,
+        "loaded": {name: load_seconds.get(name) for name in AGENT_MODULES},
+    }
@@ -1,10 +1,12 @@
 import os
 from typing import TypedDict
 from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
+from audio_rules import precheck_transcript
+from llm_gateway import chat_model, invoke
+from rate_limits import estimate_tokens
 
 if not os.environ.get("GROQ_API_KEY"):
     pass
@@ -15,6 +17,8 @@ class AudioState(TypedDict):
     current_question: str
     is_violation: bool
     reason: str
+    decided_by: str # "rules" or "llm"
+    deadline: float # absolute epoch seconds; the model call never outlives it
 
 # Define Output
 class AudioVerdict(BaseModel):
@@ -23,9 +27,20 @@ class AudioVerdict(BaseModel):
 
 # Initialize LLM - Using 70B for high-fidelity semantic understanding
 # We need to distinguish between "Reading question" vs "Reading to a friend"
-llm = ChatGroq(model_name="llama-3.3-70b-versatile", temperature=0)
+MODEL_NAME = "llama-3.3-70b-versatile"
+llm = chat_model(MODEL_NAME)
 
-def analyze_audio_node(state: AudioState):
+def precheck_node(state: AudioState):
+    verdict = precheck_transcript(state["transcript"], state.get("current_question", ""))
+    if verdict is None:
+        return {}
+    return {"decided_by": "rules", **verdict}
+
+def route_after_precheck(state: AudioState):
+    # Silence, wake words and question read-backs never reach the 70B model
+    return END if state.get("decided_by") == "rules" else "auditor"
+
+async def analyze_audio_node(state: AudioState):
     parser = JsonOutputParser(pydantic_object=AudioVerdict)
     
     prompt = ChatPromptTemplate.from_messages([
@@ -52,27 +67,31 @@ def analyze_audio_node(state: AudioState):
     
     chain = prompt | llm | parser
     
-    try:
-        result = chain.invoke({
+    result = await invoke(
+        MODEL_NAME,
+        lambda: chain.ainvoke({
             "question": state["current_question"],
             "transcript": state["transcript"],
             "format_instructions": parser.get_format_instructions()
-        })
-        
-        return {
-            "is_violation": result["is_violation"],
-            "reason": result["reason"]
-        }
-    except Exception as e:
-        return {
-            "is_violation": False,
-            "reason": f"Error analyzing audio: {str(e)}"
-        }
+        }),
+        tokens=estimate_tokens(state["current_question"], state["transcript"]),
+        deadline=state.get("deadline"),
+        hedge=True,
+        node="auditor"
+    )
+
+    return {
+        "decided_by": "llm",
+        "is_violation": result["is_violation"],
+        "reason": result["reason"]
+    }
 
 # Build Graph
 workflow = StateGraph(AudioState)
+workflow.add_node("precheck", precheck_node)
 workflow.add_node("auditor", analyze_audio_node)
-workflow.set_entry_point("auditor")
+workflow.set_entry_point("precheck")
+workflow.add_conditional_edges("precheck", route_after_precheck)
 workflow.add_edge("auditor", END)
 
 audio_graph = workflow.compile()
@@ -0,0 +1,140 @@
+import os
+import re
+import difflib
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Local fast path for audio transcripts.
+# Silent chunks, assistant wake words and plain question read-backs are decided
+# here without a model call; only ambiguous transcripts reach the 70B auditor.
+# Phrases are matched with an Aho-Corasick automaton built once at import, over
+# normalized text padded with spaces, so every match falls on word boundaries.
+
+DEFAULT_VIOLATION_PHRASES = [
+    # Voice assistants
+    "hey google", "ok google", "okay google", "alexa", "hey siri", "siri", "cortana",
+    "hey chatgpt", "chatgpt", "bixby",
+    # Asking someone else for the answer
+    "what is the answer", "what's the answer", "tell me the answer", "give me the answer",
+    "can you help me", "can you help", "help me out", "is it a or b", "which one is it",
+    "search for", "look it up", "google it",
+]
+
+DEFAULT_FILLER_WORDS = [
+    "hmm", "hm", "hmmm", "um", "umm", "uh", "uhh", "uh huh", "er", "ah", "oh", "mm",
+    "okay", "ok", "so", "well", "let", "me", "think", "maybe", "i", "guess", "right",
+    "yeah", "no", "wait", "actually", "like", "its", "it's", "it", "is", "the", "a", "an",
+]
+
+# Extra phrases, comma separated (e.g. AUDIO_EXTRA_VIOLATION_PHRASES="hey meta,ask gemini")
+EXTRA_VIOLATION_PHRASES = [p for p in os.environ.get("AUDIO_EXTRA_VIOLATION_PHRASES", "").split(",") if p.strip()]
+EXTRA_FILLER_WORDS = [p for p in os.environ.get("AUDIO_EXTRA_FILLER_WORDS", "").split(",") if p.strip()]
+
+# Share of content words that must come from the question to count as reading it aloud
+AUDIO_QUESTION_OVERLAP = float(os.environ.get("AUDIO_QUESTION_OVERLAP", "0.85"))
+# Similarity for a transcript word to count as a (misheard) question word
+AUDIO_FUZZY_CUTOFF = float(os.environ.get("AUDIO_FUZZY_CUTOFF", "0.8"))
+
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+
+def normalize_transcript(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+class PhraseMatcher:
+    # Aho-Corasick over characters: one pass over the text finds every phrase
+    def __init__(self, phrases: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[str]] = [[]]
+
+        for phrase in phrases:
+            phrase = normalize_transcript(phrase)
+            if not phrase:
+                continue
+            state = 0
+            for ch in f" {phrase} ":
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            if phrase not in self.out[state]:
+                self.out[state].append(phrase)
+
+        # Breadth-first failure links; depth-1 states fail back to the root
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                if state:
+                    self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, normalized: str) -> List[str]:
+        found = []
+        state = 0
+        for ch in f" {normalized} ":
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for phrase in self.out[state]:
+                if phrase not in found:
+                    found.append(phrase)
+        return found
+
+
+violation_matcher = PhraseMatcher(DEFAULT_VIOLATION_PHRASES + EXTRA_VIOLATION_PHRASES)
+FILLER_WORDS = frozenset(normalize_transcript(w) for w in DEFAULT_FILLER_WORDS + EXTRA_FILLER_WORDS)
+
+
+@lru_cache(maxsize=256)
+def _question_words(question: str) -> frozenset:
+    return frozenset(normalize_transcript(question).split())
+
+
+def reads_question(words: List[str], question: str) -> bool:
+    # True when enough words come from the question (exactly or as a close mishearing)
+    question_words = _question_words(question)
+    allowed_misses = int(len(words) * (1 - AUDIO_QUESTION_OVERLAP))
+    misses = 0
+    for w in words:
+        if w in question_words:
+            continue
+        if difflib.get_close_matches(w, question_words, n=1, cutoff=AUDIO_FUZZY_CUTOFF):
+            continue
+        misses += 1
+        if misses > allowed_misses:
+            return False
+    return True
+
+
+def precheck_transcript(transcript: str, question: str) -> Optional[dict]:
+    # Returns a verdict for clear-cut transcripts, None when the model should decide
+    normalized = normalize_transcript(transcript)
+    if not normalized:
+        return {"is_violation": False, "reason": "No speech in this audio chunk."}
+
+    # Phrases that are part of the question itself are just the question being read
+    question_text = normalize_transcript(question)
+    hits = [h for h in violation_matcher.find(normalized) if f" {h} " not in f" {question_text} "]
+    if hits:
+        quoted = ", ".join(f'"{h}"' for h in hits)
+        return {"is_violation": True, "reason": f"Transcript contains {quoted}, which addresses an external source."}
+
+    content = [w for w in normalized.split() if w not in FILLER_WORDS]
+    if not content:
+        return {"is_violation": False, "reason": "Only filler words / thinking out loud."}
+
+    if reads_question(content, question):
+        return {"is_violation": False, "reason": "Candidate is reading the question text aloud."}
+    return None
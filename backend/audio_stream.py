@@ -0,0 +1,176 @@
+import os
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+import numpy as np
+from metrics import Counter
+from vad import (
+    VAD_SAMPLE_RATE, VAD_FRAME_MS, VAD_PAD_MS, VAD_MIN_SEGMENT_MS, VAD_MIN_SPEECH_SECONDS,
+    frame_features, classify_frames, encode_wav
+)
+
+# Streaming audio ingestion for /ws/audio/{attempt_id}.
+# The browser streams 16 kHz mono s16le PCM. Each session keeps the last
+# STREAM_BUFFER_SECONDS in a ring buffer, classifies new frames with the same
+# features as vad.py (noise floor tracked over the recent past), and cuts an
+# utterance once speech is followed by STREAM_END_SILENCE_MS of silence or
+# reaches STREAM_MAX_UTTERANCE_SECONDS. Only utterances are dispatched to
+# transcription, as WAV, a few hundred ms after the speaker stops. Past
+# STREAM_MAX_INFLIGHT running transcriptions, up to STREAM_MAX_BACKLOG more
+# utterances wait their turn; beyond that they are dropped, logged and counted.
+
+STREAM_BUFFER_SECONDS = float(os.environ.get("STREAM_BUFFER_SECONDS", "30"))
+STREAM_END_SILENCE_MS = int(os.environ.get("STREAM_END_SILENCE_MS", "700"))
+STREAM_MAX_UTTERANCE_SECONDS = float(os.environ.get("STREAM_MAX_UTTERANCE_SECONDS", "12"))
+STREAM_MAX_INFLIGHT = int(os.environ.get("STREAM_MAX_INFLIGHT", "2"))  # utterances transcribing per session
+STREAM_MAX_BACKLOG = int(os.environ.get("STREAM_MAX_BACKLOG", "4"))  # utterances waiting for a slot per session
+STREAM_NOISE_WINDOW_SECONDS = 10.0
+
+FRAME_SAMPLES = VAD_SAMPLE_RATE * VAD_FRAME_MS // 1000
+
+utterances_dropped = Counter("audio_stream_utterances_dropped_total", "Utterances dropped because transcription was behind")
+
+
+class PcmRingBuffer:
+    # Fixed-size float32 buffer addressed by absolute sample index
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.total = 0  # samples ever written
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def write(self, samples: "np.ndarray"):
+        if len(samples) > self.capacity:
+            self.total += len(samples) - self.capacity  # overwritten before ever being stored
+            samples = samples[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def read(self, start: int, end: int) -> "np.ndarray":
+        start, end = max(start, self.oldest), min(end, self.total)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        idx = np.arange(start, end) % self.capacity
+        return self.data[idx]
+
+
+# dispatch(wav_bytes, start_seconds, end_seconds)
+Dispatch = Callable[[bytes, float, float], Awaitable[None]]
+
+
+class AudioStreamSession:
+    def __init__(self, dispatch: Dispatch, sample_rate: int = VAD_SAMPLE_RATE):
+        self.dispatch = dispatch
+        self.sample_rate = sample_rate
+        self.buffer = PcmRingBuffer(int(STREAM_BUFFER_SECONDS * sample_rate))
+        self.processed = 0  # absolute index of the next unclassified frame start
+        self._remainder = b""  # odd trailing byte between messages
+        self._energy = deque(maxlen=int(STREAM_NOISE_WINDOW_SECONDS * 1000 / VAD_FRAME_MS))
+
+        self.utterance_start: Optional[int] = None
+        self.last_speech_end = 0
+        self.speech_frames = 0
+
+        self._tasks = set()
+        self._backlog = deque()  # (wav, start_seconds, end_seconds) waiting for a slot
+        self.utterances = 0
+        self.backlogged = 0
+        self.dropped = 0
+        self.bytes_received = 0
+
+    def feed(self, pcm: bytes):
+        self.bytes_received += len(pcm)
+        pcm = self._remainder + pcm
+        usable = len(pcm) // 2 * 2
+        self._remainder = pcm[usable:]
+        if usable:
+            self.buffer.write(np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32) / 32768.0)
+        self._process()
+
+    def _process(self):
+        base = max(self.processed, self.buffer.oldest)
+        count = (self.buffer.total - base) // FRAME_SAMPLES
+        if count <= 0:
+            return
+        frames = self.buffer.read(base, base + count * FRAME_SAMPLES).reshape(count, FRAME_SAMPLES)
+        energy_db, band_ratio, flatness = frame_features(frames, self.sample_rate)
+        self._energy.extend(energy_db.tolist())
+        speech = classify_frames(energy_db, band_ratio, flatness, np.percentile(self._energy, 10))
+
+        end_silence = STREAM_END_SILENCE_MS * self.sample_rate // 1000
+        max_utterance = int(STREAM_MAX_UTTERANCE_SECONDS * self.sample_rate)
+        pad = VAD_PAD_MS * self.sample_rate // 1000
+        for i, is_speech in enumerate(speech):
+            frame_start = base + i * FRAME_SAMPLES
+            frame_end = frame_start + FRAME_SAMPLES
+            if is_speech:
+                if self.utterance_start is None:
+                    self.utterance_start = max(frame_start - pad, self.buffer.oldest)
+                    self.speech_frames = 0
+                self.last_speech_end = frame_end
+                self.speech_frames += 1
+            if self.utterance_start is None:
+                continue
+            if frame_end - self.last_speech_end >= end_silence or frame_end - self.utterance_start >= max_utterance:
+                self._cut(min(self.last_speech_end + pad, frame_end))
+        self.processed = base + count * FRAME_SAMPLES
+
+    def _cut(self, end: int):
+        start, frames = self.utterance_start, self.speech_frames
+        self.utterance_start, self.speech_frames = None, 0
+        # Clicks and short noises never become utterances
+        if frames * VAD_FRAME_MS < max(VAD_MIN_SEGMENT_MS, VAD_MIN_SPEECH_SECONDS * 1000):
+            return
+        utterance = (start / self.sample_rate, end / self.sample_rate)
+        if len(self._tasks) >= STREAM_MAX_INFLIGHT and len(self._backlog) >= STREAM_MAX_BACKLOG:
+            # Transcription is far behind: drop rather than queue unbounded audio
+            self.dropped += 1
+            utterances_dropped.inc()
+            print(f"Audio stream dropped utterance {utterance[0]:.2f}-{utterance[1]:.2f}s: transcription backlog full")
+            return
+        self.utterances += 1
+        # Encoded now: the ring buffer may overwrite these samples while it waits
+        wav = encode_wav(self.buffer.read(start, end), self.sample_rate)
+        if len(self._tasks) >= STREAM_MAX_INFLIGHT:
+            self.backlogged += 1
+            self._backlog.append((wav, *utterance))
+            return
+        self._start(wav, *utterance)
+
+    def _start(self, wav: bytes, start: float, end: float):
+        task = asyncio.create_task(self._run(wav, start, end))
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if self._backlog and len(self._tasks) < STREAM_MAX_INFLIGHT:
+            self._start(*self._backlog.popleft())
+
+    async def _run(self, wav: bytes, start: float, end: float):
+        try:
+            await self.dispatch(wav, round(start, 2), round(end, 2))
+        except Exception as e:
+            print(f"Audio stream dispatch failed: {e}")
+
+    async def close(self, flush: bool = True):
+        # Dispatch a trailing utterance, then wait for in-flight transcriptions
+        if flush and self.utterance_start is not None:
+            self._cut(self.last_speech_end)
+        # Finishing tasks start backlogged utterances, so wait until both are empty
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "seconds_received": round(self.bytes_received / 2 / self.sample_rate, 2),
+            "utterances": self.utterances,
+            "backlogged": self.backlogged,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,95 @@
+import asyncio
+import argparse
+import base64
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Benchmark for the identity image preprocessing stage.
+#   python bench_image_prep.py photos/*.jpg
+#   python bench_image_prep.py --pair id_card.jpg selfie.jpg   (also times the vision model)
+# Reports payload bytes (raw vs normalized, after base64) and preprocessing
+# latency; with --pair and GROQ_API_KEY set it also compares model latency.
+
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+load_dotenv()
+
+from image_prep import prepare_image, PILLOW_AVAILABLE, IMAGE_PREP_VERSION, sniff_mime
+from cpu_pool import shutdown_process_pool
+
+
+def b64_size(data: bytes) -> int:
+    return len(base64.b64encode(data))
+
+
+async def bench_payloads(paths):
+    total_raw, total_prepped, total_ms = 0, 0, 0.0
+    print(f"Preprocessing: {IMAGE_PREP_VERSION} (Pillow available: {PILLOW_AVAILABLE})")
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        started = time.perf_counter()
+        prepped, _ = await prepare_image(raw)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        total_raw += b64_size(raw)
+        total_prepped += b64_size(prepped)
+        total_ms += elapsed_ms
+        print(f"  {os.path.basename(path)}: {b64_size(raw) / 1024:8.1f} KB -> {b64_size(prepped) / 1024:8.1f} KB  ({elapsed_ms:6.1f} ms)")
+    if paths:
+        saved = 1 - total_prepped / total_raw if total_raw else 0.0
+        print(f"Total payload: {total_raw / 1024:.1f} KB -> {total_prepped / 1024:.1f} KB ({saved:.1%} saved), "
+              f"avg prep {total_ms / len(paths):.1f} ms/image")
+
+
+async def bench_model(id_path: str, selfie_path: str, runs: int):
+    from identity_agent import identity_graph
+
+    with open(id_path, "rb") as f:
+        id_raw = f.read()
+    with open(selfie_path, "rb") as f:
+        selfie_raw = f.read()
+    (id_prepped, id_mime), (selfie_prepped, selfie_mime) = await asyncio.gather(prepare_image(id_raw), prepare_image(selfie_raw))
+
+    variants = {
+        "raw": (id_raw, sniff_mime(id_raw), selfie_raw, sniff_mime(selfie_raw)),
+        "normalized": (id_prepped, id_mime, selfie_prepped, selfie_mime),
+    }
+    for name, (id_bytes, id_type, selfie_bytes, selfie_type) in variants.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            # No hashes in the state: the verdict cache must not short-circuit the benchmark
+            result = await identity_graph.ainvoke({
+                "id_card_image_base64": base64.b64encode(id_bytes).decode("utf-8"),
+                "webcam_image_base64": base64.b64encode(selfie_bytes).decode("utf-8"),
+                "id_card_mime": id_type,
+                "webcam_mime": selfie_type
+            })
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"  {name:<10} median {timings[len(timings) // 2] * 1000:7.0f} ms  "
+              f"match={result['is_match']} confidence={result['confidence']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark identity image preprocessing")
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--pair", nargs=2, metavar=("ID_CARD", "SELFIE"))
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        await bench_payloads(args.images + (args.pair or []))
+        if args.pair:
+            if not os.environ.get("GROQ_API_KEY"):
+                print("⚠️  Skipping model latency: GROQ_API_KEY not set.")
+            else:
+                print("Vision model latency:")
+                await bench_model(args.pair[0], args.pair[1], args.runs)
+    finally:
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
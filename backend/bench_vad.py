@@ -0,0 +1,109 @@
+import asyncio
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Benchmark for the voice activity detector in front of Whisper.
+#   python bench_vad.py                     (synthetic 15 s chunks: silence, noise, hum, speech-like)
+#   python bench_vad.py recordings/*.webm   (real chunks; needs ffmpeg)
+# Reports how many transcription calls are avoided, how much audio is still
+# uploaded after trimming, and VAD latency per chunk.
+
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from vad import NUMPY_AVAILABLE, VAD_AVAILABLE, VAD_SAMPLE_RATE, analyze_samples, detect_speech
+
+CHUNK_SECONDS = 15
+
+
+def synthetic_corpus(per_kind: int, seed: int = 7):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    sr = VAD_SAMPLE_RATE
+    t = np.arange(CHUNK_SECONDS * sr) / sr
+
+    def room_noise(level):
+        # Brown-ish background: integrated white noise, high-passed by differencing the DC away
+        noise = np.cumsum(rng.normal(0, 1, len(t)))
+        noise -= np.convolve(noise, np.ones(400) / 400, mode="same")
+        return level * noise / (np.abs(noise).max() + 1e-9)
+
+    def speech_like(start, seconds):
+        # Voiced harmonics (f0 ~ 120-200 Hz) shaped by three formants, syllable-rate envelope
+        f0 = rng.uniform(120, 200)
+        voice = np.zeros(len(t))
+        for k in range(1, 30):
+            f = k * f0
+            gain = sum(np.exp(-((f - fm) / bw) ** 2) for fm, bw in ((500, 150), (1500, 250), (2500, 300)))
+            voice += gain * np.sin(2 * np.pi * f * t + rng.uniform(0, 2 * np.pi))
+        envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)
+        window = (t >= start) & (t < start + seconds)
+        return 0.2 * voice / np.abs(voice).max() * envelope * window
+
+    corpus = []
+    for i in range(per_kind):
+        corpus.append((f"silence-{i}", np.zeros(len(t)) + rng.normal(0, 1e-4, len(t)), False))
+        corpus.append((f"room-noise-{i}", room_noise(0.02) + rng.normal(0, 0.003, len(t)), False))
+        corpus.append((f"hum-{i}", 0.05 * np.sin(2 * np.pi * 50 * t) + rng.normal(0, 0.002, len(t)), False))
+        start = rng.uniform(0, 10)
+        corpus.append((f"speech-{i}", speech_like(start, rng.uniform(2, 5)) + room_noise(0.01), True))
+    return [(name, samples.astype(np.float32), expected) for name, samples, expected in corpus]
+
+
+def report(results, elapsed_ms):
+    sent = [r for _, r, _ in results if r.has_speech]
+    total_audio = sum(r.duration_seconds for _, r, _ in results)
+    uploaded = sum(r.speech_seconds for r in sent)
+    print(f"Chunks: {len(results)}  transcription calls: {len(sent)}  avoided: {len(results) - len(sent)} "
+          f"({1 - len(sent) / len(results):.0%})")
+    print(f"Audio uploaded: {uploaded:.1f} s of {total_audio:.1f} s ({1 - uploaded / total_audio:.0%} trimmed)")
+    print(f"VAD latency: {sum(elapsed_ms) / len(elapsed_ms):.1f} ms/chunk avg, {max(elapsed_ms):.1f} ms max")
+    labelled = [(r, expected) for _, r, expected in results if expected is not None]
+    if labelled:
+        correct = sum(r.has_speech == expected for r, expected in labelled)
+        print(f"Accuracy on labelled chunks: {correct}/{len(labelled)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark VAD in front of Whisper")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--per-kind", type=int, default=10, help="synthetic chunks per kind")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("⚠️  NumPy is not installed; VAD is disabled.")
+        return
+
+    results, elapsed_ms = [], []
+    if args.files:
+        if not VAD_AVAILABLE:
+            print("⚠️  ffmpeg not found; cannot decode audio files.")
+            return
+        for path in sorted(p for pattern in args.files for p in glob.glob(pattern)):
+            with open(path, "rb") as f:
+                data = f.read()
+            started = time.perf_counter()
+            result = await detect_speech(data)
+            elapsed_ms.append((time.perf_counter() - started) * 1000)
+            if result is not None:
+                results.append((os.path.basename(path), result, None))
+    else:
+        for name, samples, expected in synthetic_corpus(args.per_kind):
+            started = time.perf_counter()
+            result = analyze_samples(samples)
+            elapsed_ms.append((time.perf_counter() - started) * 1000)
+            results.append((name, result, expected))
+
+    if args.verbose:
+        for name, result, _ in results:
+            print(f"  {name:<20} speech {result.speech_seconds:5.2f} s  segments {result.segments}")
+    if results:
+        report(results, elapsed_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,235 @@
+import json
+import time
+import base64
+import hashlib
+import asyncio
+import sqlite3
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# Exam catalog helpers: the catalog version counter (drives ETags and cache
+# invalidation across workers), keyset pagination cursors for /exams and the
+# pre-serialized exam detail cache for /exams/{exam_id}.
+
+try:
+    import orjson
+
+    def dumps_json(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # orjson ships in requirements.txt; stdlib json keeps bare checkouts working
+    def dumps_json(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+EXAM_LIST_FIELDS = ("id", "title", "description", "duration_minutes", "category", "difficulty", "image_url")
+
+
+def get_catalog_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else 0
+
+
+def bump_catalog_version(conn: sqlite3.Connection):
+    # Call inside the transaction that edits exams/questions
+    conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+
+
+def catalog_etag(version: int, query: str = "") -> str:
+    # query: the normalized request variant (filters, fields, page), so each
+    # variant of the listing gets its own validator
+    if not query:
+        return f'W/"catalog-{version}"'
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+    return f'W/"catalog-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" match
+    strip = lambda tag: tag[2:] if tag.startswith("W/") else tag
+    return "*" in tags or strip(etag) in {strip(tag) for tag in tags}
+
+
+# Sort key for unfiltered pages: NULL categories sort (and compare) as ''
+CATEGORY_KEY = "COALESCE(category, '')"
+
+
+def encode_cursor(category: Optional[str], exam_id: str) -> str:
+    raw = json.dumps([category or "", exam_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        category, exam_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(exam_id, str) or not (category is None or isinstance(category, str)):
+        raise ValueError("Invalid cursor")
+    return category or "", exam_id
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(EXAM_LIST_FIELDS)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in EXAM_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # id is always returned so clients can address the exam
+    return ["id"] + [f for f in dict.fromkeys(selected) if f != "id"]
+
+
+def fetch_exam_page(conn: sqlite3.Connection, fields: List[str], limit: Optional[int], category: Optional[str] = None, after: Optional[Tuple[Optional[str], str]] = None):
+    # Keyset pagination over (COALESCE(category, ''), id), served by
+    # idx_exams_category_key (idx_exams_category when filtering by category).
+    # Cost per page is O(limit) no matter how deep the cursor is.
+    # limit=None returns every remaining row without a cursor.
+    columns = list(dict.fromkeys(fields + ["category"]))
+    query = f"SELECT {', '.join(columns)} FROM exams"
+    params = []
+    if category:
+        query += " WHERE category = ?"
+        params.append(category)
+        if after:
+            query += " AND id > ?"
+            params.append(after[1])
+        query += " ORDER BY id"
+    else:
+        if after:
+            # Expanded row-value comparison: SQLite can only seek the expression index with this form
+            query += f" WHERE {CATEGORY_KEY} >= ? AND ({CATEGORY_KEY} > ? OR id > ?)"
+            params.extend([after[0] or "", after[0] or "", after[1]])
+        query += f" ORDER BY {CATEGORY_KEY}, id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit + 1)
+
+    rows = conn.execute(query, params).fetchall()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = encode_cursor(last["category"], last["id"])
+
+    items = []
+    for row in rows:
+        record = dict(zip(columns, row))
+        items.append({f: record[f] for f in fields})
+    return items, next_cursor
+
+
+def load_exam_detail(conn: sqlite3.Connection, exam_id: str) -> Optional[dict]:
+    exam_row = conn.execute(
+        "SELECT id, title, description, duration_minutes, category, difficulty FROM exams WHERE id = ?", (exam_id,)
+    ).fetchone()
+    if not exam_row:
+        return None
+
+    exam = {
+        "id": exam_row[0],
+        "title": exam_row[1],
+        "description": exam_row[2],
+        "duration_minutes": exam_row[3],
+        "category": exam_row[4],
+        "difficulty": exam_row[5],
+        "questions": []
+    }
+    # correct_answer is deliberately not sent to the candidate's browser
+    q_rows = conn.execute(
+        "SELECT id, question_text, question_type, options FROM questions WHERE exam_id = ?", (exam_id,)
+    ).fetchall()
+    for q_row in q_rows:
+        exam["questions"].append({
+            "id": q_row[0],
+            "question_text": q_row[1],
+            "question_type": q_row[2],
+            "options": json.loads(q_row[3]),
+        })
+    return exam
+
+
+class ExamDetailCache:
+    # Caches the fully serialized /exams/{id} body per exam. Entries are tagged
+    # with the catalog version they were built from; a version bump (seeding or
+    # editing, from any worker) invalidates them. Concurrent misses for the same
+    # exam share a single rebuild instead of stampeding the database.
+
+    def __init__(self, database, max_items: int = 1024, version_check_interval: float = 1.0):
+        self.database = database
+        self.max_items = max_items
+        self.version_check_interval = version_check_interval
+
+        self._entries = OrderedDict()  # exam_id -> (catalog_version, body bytes)
+        self._inflight = {}  # exam_id -> Future[Optional[bytes]]
+        self._version = None
+        self._version_checked_at = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def _current_version(self) -> int:
+        # Cross-worker changes are noticed within version_check_interval
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.version_check_interval:
+            self._version = await self.database.run(get_catalog_version)
+            self._version_checked_at = now
+        return self._version
+
+    def _build(self, conn: sqlite3.Connection, exam_id: str):
+        version = get_catalog_version(conn)
+        exam = load_exam_detail(conn, exam_id)
+        return version, (dumps_json(exam) if exam is not None else None)
+
+    async def get(self, exam_id: str) -> Optional[bytes]:
+        version = await self._current_version()
+        entry = self._entries.get(exam_id)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(exam_id)
+            self.hits += 1
+            return entry[1]
+
+        inflight = self._inflight.get(exam_id)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # never "unretrieved"
+        self._inflight[exam_id] = future
+        try:
+            built_version, body = await self.database.run(self._build, exam_id)
+            if body is not None:
+                # Unknown ids are not cached, so random probes cannot fill the cache
+                self._entries[exam_id] = (built_version, body)
+                self._entries.move_to_end(exam_id)
+                while len(self._entries) > self.max_items:
+                    self._entries.popitem(last=False)
+            future.set_result(body)
+            return body
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[exam_id]
+
+    def invalidate(self, exam_id: Optional[str] = None):
+        if exam_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(exam_id, None)
+        self._version_checked_at = 0.0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "items": len(self._entries),
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
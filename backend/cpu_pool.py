@@ -0,0 +1,32 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Shared process pool for CPU-bound work (PDF rendering, image re-encoding)
+# that would otherwise stall the event loop. Workers are spawned, not forked,
+# so they start clean instead of inheriting the server's threads and sockets.
+# Functions submitted here must be top-level and picklable.
+
+CPU_POOL_WORKERS = int(os.environ.get("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def run_cpu(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), fn, *args)
+
+
+def shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+from storage import Database
+
+# Two-tier cache for grading verdicts:
+#   1. In-memory LRU (per worker, hot re-submits / retries)
+#   2. SQLite store (survives restarts, shared by all workers on the box)
+# Grading runs at temperature 0, so a cached verdict for the same normalized
+# (question, rubric, answer, model, prompt version) is as good as a fresh one.
+
+GRADE_CACHE_DB = os.environ.get("GRADE_CACHE_DB", "grade_cache.db")
+GRADE_CACHE_MEMORY_ITEMS = int(os.environ.get("GRADE_CACHE_MEMORY_ITEMS", "2048"))
+GRADE_CACHE_MAX_ROWS = int(os.environ.get("GRADE_CACHE_MAX_ROWS", "200000"))
+GRADE_CACHE_TTL_SECONDS = int(os.environ.get("GRADE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 0 = never expire
+
+# Check the on-disk size limit every N writes instead of on every insert
+PRUNE_EVERY = 256
+
+
+def normalize_text(text: str) -> str:
+    # Unicode NFC + collapsed whitespace; case is kept (it can matter for answers)
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+def make_cache_key(question: str, rubric: str, student_answer: str, model: str, prompt_version: str) -> str:
+    payload = json.dumps(
+        [normalize_text(question), normalize_text(rubric), normalize_text(student_answer), model, prompt_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GradeCache:
+    def __init__(self, path: str, memory_items: int, max_rows: int, ttl_seconds: int):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._db = Database(path, pool_size=4)
+        self._schema_ready = False
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        # Created lazily so importing the grading agent has no disk side effects
+        if self._schema_ready:
+            return
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS grade_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_grade_cache_created_at ON grade_cache(created_at)")
+        self._schema_ready = True
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: dict):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return dict(value)
+                del self._memory[key]
+
+        row, expired = None, False
+        try:
+            with self._db.connection() as conn:
+                self._ensure_schema(conn)
+                row = conn.execute("SELECT value, created_at FROM grade_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None and self._expired(row[1]):
+                    with conn:
+                        conn.execute("DELETE FROM grade_cache WHERE key = ?", (key,))
+                    row, expired = None, True
+        except sqlite3.Error as e:
+            # A broken cache must never break grading; treat it as a miss
+            print(f"Grade cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                self.evictions += int(expired)
+                return None
+            value, stored_at = json.loads(row[0]), row[1]
+            self._remember(key, stored_at, value)
+            self.disk_hits += 1
+            return dict(value)
+
+    def put(self, key: str, value: dict):
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, stored_at, dict(value))
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= PRUNE_EVERY
+            if prune:
+                self._writes_since_prune = 0
+
+        try:
+            with self._db.connection() as conn:
+                self._ensure_schema(conn)
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO grade_cache (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), stored_at)
+                    )
+                if prune:
+                    self._prune(conn)
+            with self._lock:
+                self.writes += 1
+        except sqlite3.Error as e:
+            print(f"Grade cache write failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        removed = 0
+        with conn:
+            if self.ttl_seconds > 0:
+                removed += conn.execute(
+                    "DELETE FROM grade_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM grade_cache").fetchone()[0] - self.max_rows
+            if overflow > 0:
+                removed += conn.execute(
+                    "DELETE FROM grade_cache WHERE key IN (SELECT key FROM grade_cache ORDER BY created_at LIMIT ?)",
+                    (overflow,)
+                ).rowcount
+        with self._lock:
+            self.evictions += removed
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._db.connection() as conn:
+            self._ensure_schema(conn)
+            with conn:
+                conn.execute("DELETE FROM grade_cache")
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "memory_items": len(self._memory),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+grade_cache = GradeCache(
+    GRADE_CACHE_DB,
+    memory_items=GRADE_CACHE_MEMORY_ITEMS,
+    max_rows=GRADE_CACHE_MAX_ROWS,
+    ttl_seconds=GRADE_CACHE_TTL_SECONDS,
+)
@@ -1,10 +1,13 @@
 import os
-from typing import TypedDict, Annotated
+import asyncio
+from typing import TypedDict, Annotated, List, Optional
 from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
+from grade_cache import grade_cache, make_cache_key
+from llm_gateway import chat_model, invoke, LLMError, LLMUnavailable
+from rate_limits import estimate_tokens
 
 # Ensure API Key is set (User must provide it in .env or run with it)
 if not os.environ.get("GROQ_API_KEY"):
@@ -18,6 +21,7 @@ class GradingState(TypedDict):
     score: int
     feedback: str
     confidence_score: float
+    cached: bool
 
 # Define Output Structure
 class GradeOutput(BaseModel):
@@ -28,11 +32,27 @@ class GradeOutput(BaseModel):
 # Initialize LLM
 # Utilizing Llama 3 70B via Groq for extreme speed and free tier
 # Utilizing Llama 3.3 70B via Groq (Versatile) for best performance
-llm = ChatGroq(model_name="llama-3.3-70b-versatile", temperature=0)
+MODEL_NAME = "llama-3.3-70b-versatile"
+llm = chat_model(MODEL_NAME)
 
+# Bump whenever the grading prompt changes so old cached verdicts are not reused
+PROMPT_VERSION = "v1"
 
-# Define Node
-def grade_node(state: GradingState):
+def _cache_key(state: GradingState) -> str:
+    return make_cache_key(state["question"], state["rubric"], state["student_answer"], MODEL_NAME, PROMPT_VERSION)
+
+
+# Define Nodes
+def cache_lookup_node(state: GradingState):
+    cached = grade_cache.get(_cache_key(state))
+    if cached is None:
+        return {"cached": False}
+    return {**cached, "cached": True}
+
+def route_after_cache(state: GradingState):
+    return END if state.get("cached") else "grader"
+
+async def grade_node(state: GradingState):
     parser = JsonOutputParser(pydantic_object=GradeOutput)
     
     prompt = ChatPromptTemplate.from_messages([
@@ -50,30 +70,183 @@ def grade_node(state: GradingState):
     
     chain = prompt | llm | parser
     
-    try:
-        result = chain.invoke({
+    # Failures raise (LLMError / LLMUnavailable) instead of returning a fake score
+    result = await invoke(
+        MODEL_NAME,
+        lambda: chain.ainvoke({
             "question": state["question"],
             "rubric": state["rubric"],
             "student_answer": state["student_answer"],
             "format_instructions": parser.get_format_instructions()
-        })
-        
-        return {
-            "score": result["score"],
-            "feedback": result["feedback"],
-            "confidence_score": result["confidence"]
-        }
-    except Exception as e:
-        return {
-            "score": 0,
-            "feedback": f"Error grading answer: {str(e)}",
-            "confidence_score": 0.0
-        }
+        }),
+        tokens=estimate_tokens(state["question"], state["rubric"], state["student_answer"]),
+        node="grader"
+    )
+
+    output = {
+        "score": result["score"],
+        "feedback": result["feedback"],
+        "confidence_score": result["confidence"]
+    }
+    # Only successful verdicts are cached
+    await asyncio.to_thread(grade_cache.put, _cache_key(state), output)
+    return output
 
 # Build Graph
 workflow = StateGraph(GradingState)
+workflow.add_node("cache_lookup", cache_lookup_node)
 workflow.add_node("grader", grade_node)
-workflow.set_entry_point("grader")
+workflow.set_entry_point("cache_lookup")
+workflow.add_conditional_edges("cache_lookup", route_after_cache)
 workflow.add_edge("grader", END)
 
 grade_answer_graph = workflow.compile()
+
+# --- Batch Grading ---
+# A whole attempt is graded concurrently (bounded by a semaphore). Short answers
+# can additionally be packed several-per-prompt and un-packed into per-question
+# GradeOutput results, so N short answers cost one round trip instead of N.
+GRADE_BATCH_MAX_CONCURRENCY = int(os.environ.get("GRADE_BATCH_MAX_CONCURRENCY", "4"))
+GRADE_PACK_MAX_ANSWER_CHARS = int(os.environ.get("GRADE_PACK_MAX_ANSWER_CHARS", "400"))
+GRADE_PACK_MAX_ITEMS = int(os.environ.get("GRADE_PACK_MAX_ITEMS", "8"))
+
+# Packed verdicts come from a different prompt, so they are cached in their own
+# namespace: a later single /grade never returns one as a hit
+PACKED_PROMPT_VERSION = f"packed-{PROMPT_VERSION}"
+
+def _packed_cache_key(item: dict) -> str:
+    return make_cache_key(item["question"], item["rubric"], item["student_answer"], MODEL_NAME, PACKED_PROMPT_VERSION)
+
+def _error_result(e: Exception) -> dict:
+    # Per-answer failure; the rest of the batch is still returned
+    return {"error": str(e), "retryable": getattr(e, "retryable", False)}
+
+class PackedGrade(GradeOutput):
+    index: int = Field(..., description="Index of the answer being graded")
+
+class PackedGradeOutput(BaseModel):
+    grades: List[PackedGrade] = Field(..., description="One grade per answer, in any order")
+
+def _is_packable(item: dict) -> bool:
+    return len(item["student_answer"].strip()) <= GRADE_PACK_MAX_ANSWER_CHARS
+
+async def _grade_single(item: dict) -> dict:
+    result = await grade_answer_graph.ainvoke({
+        "question": item["question"],
+        "student_answer": item["student_answer"],
+        "rubric": item["rubric"]
+    })
+    return {
+        "score": result["score"],
+        "feedback": result["feedback"],
+        "confidence_score": result["confidence_score"],
+        "cached": result.get("cached", False)
+    }
+
+async def _grade_packed(items: List[dict]) -> List[Optional[dict]]:
+    parser = JsonOutputParser(pydantic_object=PackedGradeOutput)
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "You are an expert academic grader. Grade each answer based STRICTLY on its own rubric. Be fair and objective. Grade every answer independently."),
+        ("user", """
+        {answers}
+        
+        Evaluate every answer above. Return a JSON object with a 'grades' list containing, for each answer, its 'index', 'score', 'feedback', and 'confidence'.
+        {format_instructions}
+        """)
+    ])
+
+    blocks = []
+    for i, item in enumerate(items):
+        blocks.append(
+            f"[Answer {i}]\nQuestion: {item['question']}\nRubric: {item['rubric']}\n\nStudent Answer: {item['student_answer']}"
+        )
+
+    chain = prompt | llm | parser
+
+    answers = "\n\n".join(blocks)
+    try:
+        result = await invoke(
+            MODEL_NAME,
+            lambda: chain.ainvoke({"answers": answers, "format_instructions": parser.get_format_instructions()}),
+            tokens=estimate_tokens(answers, completion=128 * len(items)),
+            node="grader_packed"
+        )
+        grades = PackedGradeOutput(**result).grades
+    except LLMUnavailable:
+        # Single calls would fail the same way
+        raise
+    except Exception as e:
+        print(f"Packed grading failed, falling back to single calls: {e}")
+        return [None] * len(items)
+
+    outputs = [None] * len(items)
+    for grade in grades:
+        if 0 <= grade.index < len(items) and outputs[grade.index] is None:
+            outputs[grade.index] = {
+                "score": grade.score,
+                "feedback": grade.feedback,
+                "confidence_score": grade.confidence,
+                "cached": False
+            }
+    return outputs
+
+async def grade_answers_batch(items: List[dict], max_concurrency: int = GRADE_BATCH_MAX_CONCURRENCY, pack_short_answers: bool = True) -> List[dict]:
+    # One result per item, in order; a failed answer gets {"error", "retryable"}
+    # instead of failing the whole batch
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results = [None] * len(items)
+
+    async def run_single(i: int):
+        try:
+            async with semaphore:
+                results[i] = await _grade_single(items[i])
+        except LLMError as e:
+            results[i] = _error_result(e)
+
+    async def run_pack(indexes: List[int]):
+        try:
+            async with semaphore:
+                outputs = await _grade_packed([items[i] for i in indexes])
+        except LLMError as e:
+            for i in indexes:
+                results[i] = _error_result(e)
+            return
+        for i, output in zip(indexes, outputs):
+            if output is None:
+                # Answer missing from the packed reply; grade it on its own
+                await run_single(i)
+                continue
+            await asyncio.to_thread(
+                grade_cache.put, _packed_cache_key(items[i]), {k: output[k] for k in ("score", "feedback", "confidence_score")}
+            )
+            results[i] = output
+
+    def cached_verdict(item: dict) -> Optional[dict]:
+        # A single-prompt verdict is as good as a packed one; not the other way round
+        return grade_cache.get(_cache_key(item)) or grade_cache.get(_packed_cache_key(item))
+
+    singles, packable = [], []
+    for i, item in enumerate(items):
+        if pack_short_answers and _is_packable(item):
+            # Answers already in the cache never need a slot in a packed prompt
+            cached = await asyncio.to_thread(cached_verdict, item)
+            if cached is not None:
+                results[i] = {**cached, "cached": True}
+            else:
+                packable.append(i)
+        else:
+            singles.append(i)
+
+    # A pack of one is just a single call with a worse prompt
+    packs = [packable[i:i + GRADE_PACK_MAX_ITEMS] for i in range(0, len(packable), max(1, GRADE_PACK_MAX_ITEMS))]
+    for pack in packs:
+        if len(pack) == 1:
+            singles.append(pack[0])
+    packs = [pack for pack in packs if len(pack) > 1]
+
+    await asyncio.gather(
+        *(run_single(i) for i in singles),
+        *(run_pack(pack) for pack in packs)
+    )
+    return results
@@ -0,0 +1,51 @@
+import time
+from starlette.routing import Match
+from metrics import Gauge, Histogram
+
+# ASGI middleware feeding /metrics: request latency per route template and
+# status, plus requests (and audio WebSockets) in flight per route.
+# Routes are labelled by their template ("/attempts/{attempt_id}/integrity"),
+# never the raw path, so IDs do not explode the number of series.
+
+request_seconds = Histogram("http_request_seconds", "HTTP request latency", ["method", "route", "status"])
+in_flight = Gauge("http_requests_in_flight", "Requests (and WebSocket sessions) being served", ["method", "route"])
+
+
+def route_template(app, scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, router_app=None):
+        self.app = app
+        self.router_app = router_app  # the FastAPI app whose routes name the series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "WEBSOCKET")
+        route = route_template(self.router_app, scope)
+        if scope["type"] == "websocket":
+            with in_flight.track(method=method, route=route):
+                await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}  # an exception before the response starts is a 500
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with in_flight.track(method=method, route=route):
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                request_seconds.observe(time.perf_counter() - started, method=method, route=route, status=status["code"])
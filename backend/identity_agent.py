@@ -1,11 +1,14 @@
 import os
 import base64
+import asyncio
 from typing import TypedDict
 from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, Field
 from langchain_core.output_parsers import JsonOutputParser
+from identity_cache import get_verdict, put_verdict
+from image_prep import IMAGE_PREP_VERSION
+from llm_gateway import chat_model, invoke
 
 if not os.environ.get("GROQ_API_KEY"):
     pass
@@ -14,9 +17,15 @@ if not os.environ.get("GROQ_API_KEY"):
 class IdentityState(TypedDict):
     id_card_image_base64: str
     webcam_image_base64: str
+    id_card_mime: str  # MIME type of the (normalized) images; defaults to image/jpeg
+    webcam_mime: str
+    id_card_hash: str  # sha256 of the original upload, enables the verdict cache
+    webcam_hash: str
     is_match: bool
     confidence: float
     reason: str
+    cached: bool
+    deadline: float  # absolute epoch seconds; the model call never outlives it
 
 # Define Output
 class IdentityOutput(BaseModel):
@@ -26,9 +35,28 @@ class IdentityOutput(BaseModel):
 
 # Initialize Vision Logic
 # using Llama 4 Maverick (Multimodal) as Vision Models are deprecated
-llm_vision = ChatGroq(model_name="meta-llama/llama-4-maverick-17b-128e-instruct", temperature=0)
+MODEL_NAME = "meta-llama/llama-4-maverick-17b-128e-instruct"
+llm_vision = chat_model(MODEL_NAME)
 
-def verify_identity_node(state: IdentityState):
+# Bump whenever the prompt or image preprocessing changes so cached verdicts are not reused
+PROMPT_VERSION = "v1"
+CACHE_VARIANT = f"{MODEL_NAME}:{PROMPT_VERSION}:{IMAGE_PREP_VERSION}"
+
+# Token budget charged per verification (two images + prompt + reply)
+VISION_REQUEST_TOKENS = 2000
+
+def cache_lookup_node(state: IdentityState):
+    if not state.get("id_card_hash") or not state.get("webcam_hash"):
+        return {"cached": False}
+    cached = get_verdict(state["id_card_hash"], state["webcam_hash"], CACHE_VARIANT)
+    if cached is None:
+        return {"cached": False}
+    return {**cached, "cached": True}
+
+def route_after_cache(state: IdentityState):
+    return END if state.get("cached") else "verifier"
+
+async def verify_identity_node(state: IdentityState):
     parser = JsonOutputParser(pydantic_object=IdentityOutput)
     
     # Construct Multimodal Prompt
@@ -37,38 +65,41 @@ def verify_identity_node(state: IdentityState):
             {"type": "text", "text": "You are a biometric security officer. Compare these two images. Image 1 is an ID Card. Image 2 is a Selfie. Do they show the same person? Focus on facial structure, nose shape, and eyes. Ignore hair style, hair length, age differences, or glasses. Return JSON with 'is_match', 'confidence', and 'reason'."},
             {
                 "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{state['id_card_image_base64']}"},
+                "image_url": {"url": f"data:{state.get('id_card_mime', 'image/jpeg')};base64,{state['id_card_image_base64']}"},
             },
             {
                 "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{state['webcam_image_base64']}"},
+                "image_url": {"url": f"data:{state.get('webcam_mime', 'image/jpeg')};base64,{state['webcam_image_base64']}"},
             },
             {"type": "text", "text": parser.get_format_instructions()} 
         ]
     )
     
-    try:
-        response = llm_vision.invoke([message])
+    async def call():
+        response = await llm_vision.ainvoke([message])
         # Parse the response (Using text parsing since vision model output might be raw)
-        # Usually invoke returns an AIMessage with content
-        parsed = parser.parse(response.content)
-        
-        return {
-            "is_match": parsed["is_match"],
-            "confidence": parsed["confidence"],
-            "reason": parsed["reason"]
-        }
-    except Exception as e:
-        return {
-            "is_match": False,
-            "confidence": 0.0,
-            "reason": f"Error interacting with Vision Model: {str(e)}"
-        }
+        return parser.parse(response.content)
+
+    # Groq bills each image as a fixed token block, not by payload size
+    # Same images, temperature 0: safe to hedge a slow call with a backup request
+    parsed = await invoke(MODEL_NAME, call, tokens=VISION_REQUEST_TOKENS, deadline=state.get("deadline"), hedge=True, node="verifier")
+
+    output = {
+        "is_match": parsed["is_match"],
+        "confidence": parsed["confidence"],
+        "reason": parsed["reason"]
+    }
+    # Only real verdicts are cached
+    if state.get("id_card_hash") and state.get("webcam_hash"):
+        await asyncio.to_thread(put_verdict, state["id_card_hash"], state["webcam_hash"], CACHE_VARIANT, output)
+    return output
 
 # Build Graph
 workflow = StateGraph(IdentityState)
+workflow.add_node("cache_lookup", cache_lookup_node)
 workflow.add_node("verifier", verify_identity_node)
-workflow.set_entry_point("verifier")
+workflow.set_entry_point("cache_lookup")
+workflow.add_conditional_edges("cache_lookup", route_after_cache)
 workflow.add_edge("verifier", END)
 
 identity_graph = workflow.compile()
@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Optional
+from storage import db
+
+# Persistent store of identity verdicts keyed by the content hashes of the
+# (ID card, webcam image) pair plus the model/prompt variant that produced them.
+# Retries and re-entries with the exact same pair are answered without a
+# vision-model call. Webcam frames rarely repeat, so entries expire after
+# IDENTITY_CACHE_TTL_SECONDS and the table is capped at IDENTITY_CACHE_MAX_ROWS
+# (oldest first), checked every PRUNE_EVERY writes as in grade_cache.py.
+
+IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get("IDENTITY_CACHE_TTL_SECONDS", str(24 * 3600)))  # 0 = never expire
+IDENTITY_CACHE_MAX_ROWS = int(os.environ.get("IDENTITY_CACHE_MAX_ROWS", "50000"))
+
+# Check the size limit every N writes instead of on every insert
+PRUNE_EVERY = 256
+
+identity_cache_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_lock = threading.Lock()
+_writes_since_prune = 0
+
+
+def _expired(created_at: float) -> bool:
+    return IDENTITY_CACHE_TTL_SECONDS > 0 and time.time() - created_at > IDENTITY_CACHE_TTL_SECONDS
+
+
+def get_verdict(id_card_hash: str, webcam_hash: str, variant: str) -> Optional[dict]:
+    key = (id_card_hash, webcam_hash, variant)
+    try:
+        with db.connection() as conn:
+            row = conn.execute(
+                "SELECT verdict, created_at FROM identity_verdicts WHERE id_card_sha256 = ? AND webcam_sha256 = ? AND variant = ?",
+                key
+            ).fetchone()
+            if row is not None and _expired(row[1]):
+                with conn:
+                    conn.execute(
+                        "DELETE FROM identity_verdicts WHERE id_card_sha256 = ? AND webcam_sha256 = ? AND variant = ?", key
+                    )
+                identity_cache_stats["evictions"] += 1
+                row = None
+    except sqlite3.Error as e:
+        print(f"Identity cache read failed: {e}")
+        row = None
+
+    if row is None:
+        identity_cache_stats["misses"] += 1
+        return None
+    identity_cache_stats["hits"] += 1
+    return json.loads(row[0])
+
+
+def put_verdict(id_card_hash: str, webcam_hash: str, variant: str, verdict: dict):
+    global _writes_since_prune
+    with _lock:
+        _writes_since_prune += 1
+        prune = _writes_since_prune >= PRUNE_EVERY
+        if prune:
+            _writes_since_prune = 0
+
+    try:
+        with db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO identity_verdicts (id_card_sha256, webcam_sha256, variant, verdict, created_at) VALUES (?, ?, ?, ?, ?)",
+                (id_card_hash, webcam_hash, variant, json.dumps(verdict), time.time())
+            )
+        identity_cache_stats["writes"] += 1
+        if prune:
+            prune_verdicts()
+    except sqlite3.Error as e:
+        print(f"Identity cache write failed: {e}")
+
+
+def prune_verdicts() -> int:
+    removed = 0
+    with db.transaction() as conn:
+        if IDENTITY_CACHE_TTL_SECONDS > 0:
+            removed += conn.execute(
+                "DELETE FROM identity_verdicts WHERE created_at < ?", (time.time() - IDENTITY_CACHE_TTL_SECONDS,)
+            ).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM identity_verdicts").fetchone()[0] - IDENTITY_CACHE_MAX_ROWS
+        if overflow > 0:
+            removed += conn.execute(
+                """
+                DELETE FROM identity_verdicts WHERE (id_card_sha256, webcam_sha256, variant) IN (
+                    SELECT id_card_sha256, webcam_sha256, variant FROM identity_verdicts ORDER BY created_at LIMIT ?
+                )
+                """,
+                (overflow,)
+            ).rowcount
+    identity_cache_stats["evictions"] += removed
+    return removed
@@ -0,0 +1,75 @@
+import io
+import os
+import importlib.util
+from typing import Tuple
+from cpu_pool import run_cpu
+
+# Normalizes images before they are sent to the vision model:
+# decode -> EXIF-rotate -> downsize to IMAGE_MAX_DIMENSION -> re-encode as JPEG at
+# IMAGE_JPEG_QUALITY. Runs in the CPU process pool. Multi-megabyte phone photos
+# and PDF renders shrink to a few hundred KB, and the data URL MIME type is
+# always correct afterwards.
+
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", "1024"))
+IMAGE_JPEG_QUALITY = int(os.environ.get("IMAGE_JPEG_QUALITY", "85"))
+
+# Part of the identity verdict cache key: changing preprocessing changes what the model sees
+IMAGE_PREP_VERSION = f"jpeg{IMAGE_JPEG_QUALITY}-max{IMAGE_MAX_DIMENSION}"
+
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+SNIFFED_MIME = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+]
+
+
+def sniff_mime(data: bytes) -> str:
+    for magic, mime in SNIFFED_MIME:
+        if data.startswith(magic):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+# EXIF tag holding the camera orientation; 1 = already upright
+EXIF_ORIENTATION = 0x0112
+
+
+def normalize_image(data: bytes, max_dimension: int, quality: int) -> Tuple[bytes, bool]:
+    # Runs inside a pool worker. Returns (normalized JPEG, whether the original
+    # could be sent as-is: a JPEG that is upright and within the size limit)
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as img:
+        original_ok = (
+            img.format == "JPEG"
+            and img.getexif().get(EXIF_ORIENTATION, 1) == 1
+            and max(img.size) <= max_dimension
+        )
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGB")
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=quality, optimize=True)
+        return out.getvalue(), original_ok
+
+
+async def prepare_image(data: bytes) -> Tuple[bytes, str]:
+    # Returns (image bytes, MIME type). Falls back to the original bytes when
+    # Pillow is not installed or the image cannot be decoded.
+    mime = sniff_mime(data)
+    if not PILLOW_AVAILABLE:
+        return data, mime
+    try:
+        normalized, original_ok = await run_cpu(normalize_image, data, IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY)
+    except Exception as e:
+        print(f"Image normalization failed, sending original: {e}")
+        return data, mime
+    # A small, already-compressed JPEG can come out slightly larger; keep the
+    # smaller one, but never a rotated or oversized original
+    if original_ok and len(data) <= len(normalized):
+        return data, mime
+    return normalized, "image/jpeg"
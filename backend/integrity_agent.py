@@ -1,10 +1,13 @@
 import os
+import json
 from typing import TypedDict, List
 from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
+from integrity_features import extract_features, rule_verdict
+from llm_gateway import chat_model, invoke
+from rate_limits import estimate_tokens
 
 if not os.environ.get("GROQ_API_KEY"):
     pass
@@ -12,6 +15,9 @@ if not os.environ.get("GROQ_API_KEY"):
 # Define State
 class IntegrityState(TypedDict):
     alerts: List[dict] # serialized JSON of alerts
+    features: dict # compact per-type counts/rates/bursts/streaks
+    decided_by: str # "rules" or "llm"
+    model_used: str # set when the LLM decided
     verdict: str
     risk_level: str
     explanation: str
@@ -23,15 +29,28 @@ class IntegrityOutput(BaseModel):
     explanation: str = Field(..., description="Brief explanation of the analysis")
 
 # Initialize LLM - Using 8B Instant for speed
-llm_fast = ChatGroq(model_name="llama-3.1-8b-instant", temperature=0)
+MODEL_NAME = "llama-3.1-8b-instant"
+llm_fast = chat_model(MODEL_NAME)
 
-def analyze_node(state: IntegrityState):
+def features_node(state: IntegrityState):
+    features = state.get("features") or extract_features(state.get("alerts") or [])
+    verdict = rule_verdict(features)
+    if verdict is None:
+        return {"features": features}
+    return {"features": features, "decided_by": "rules", **verdict}
+
+def route_after_features(state: IntegrityState):
+    # Clear-cut cases were settled by rules; only ambiguous ones reach the LLM
+    return END if state.get("decided_by") == "rules" else "analyst"
+
+async def analyze_node(state: IntegrityState):
     parser = JsonOutputParser(pydantic_object=IntegrityOutput)
     
     prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert exam proctor AI. Analyze the following proctoring logs (alerts) to determine if academic dishonesty occurred. Be strict but fair."),
+        ("system", "You are an expert exam proctor AI. Analyze the following proctoring log summary to determine if academic dishonesty occurred. Be strict but fair."),
         ("user", """
-        Alert Logs: {alerts}
+        Alert Summary (per type: count, rate per minute, most alerts inside one burst window, longest run of consecutive alerts):
+        {features}
         
         Analyze the frequency, type, and timing of these alerts.
         - Occasional gaze shifts are normal (LOW risk).
@@ -45,36 +64,28 @@ def analyze_node(state: IntegrityState):
     
     chain = prompt | llm_fast | parser
     
-    try:
-        # If no alerts, return clean
-        if not state["alerts"]:
-            return {
-                "risk_level": "LOW",
-                "verdict": "Clean Record",
-                "explanation": "No anomalies or violations detected during the session."
-            }
+    features = json.dumps(state["features"], separators=(",", ":"))
+    result = await invoke(
+        MODEL_NAME,
+        lambda: chain.ainvoke({"features": features, "format_instructions": parser.get_format_instructions()}),
+        tokens=estimate_tokens(features),
+        node="analyst"
+    )
 
-        result = chain.invoke({
-            "alerts": str(state["alerts"]),
-            "format_instructions": parser.get_format_instructions()
-        })
-        
-        return {
-            "risk_level": result["risk_level"],
-            "verdict": result["verdict"],
-            "explanation": result["explanation"]
-        }
-    except Exception as e:
-        return {
-            "risk_level": "UNKNOWN",
-            "verdict": "Error",
-            "explanation": "Failed to analyze logs."
-        }
+    return {
+        "decided_by": "llm",
+        "model_used": MODEL_NAME,
+        "risk_level": result["risk_level"],
+        "verdict": result["verdict"],
+        "explanation": result["explanation"]
+    }
 
 # Build Graph
 workflow = StateGraph(IntegrityState)
+workflow.add_node("features", features_node)
 workflow.add_node("analyst", analyze_node)
-workflow.set_entry_point("analyst")
+workflow.set_entry_point("features")
+workflow.add_conditional_edges("features", route_after_features)
 workflow.add_edge("analyst", END)
 
 integrity_graph = workflow.compile()
@@ -0,0 +1,146 @@
+import os
+from bisect import bisect_right
+from typing import List, Optional
+from log_ingest import normalize_violation_type, alert_epoch_seconds
+
+# Deterministic feature extraction for proctoring alert logs.
+# The accumulator is a plain JSON-serializable dict and can be updated
+# incrementally (new alerts only), so it can also be persisted per attempt.
+# rule_verdict() settles clear-cut cases; only ambiguous ones reach the LLM,
+# and then as compact features instead of the raw alert list.
+
+BURST_WINDOW_SECONDS = float(os.environ.get("INTEGRITY_BURST_WINDOW_SECONDS", "60"))
+
+# Rule thresholds
+HIGH_RISK_TYPES = {"phone_detected"}
+MULTIPLE_FACES_HIGH_COUNT = 3
+GAZE_LOW_MAX_COUNT = 3
+GAZE_LOW_MAX_BURST = 2
+
+# Weighted alert score for ambiguous sessions; the model is only asked again
+# once the score crosses into a new band
+RISK_WEIGHTS = {
+    "phone_detected": 10,
+    "multiple_faces": 4,
+    "tab_switch": 2,
+    "fullscreen_exit": 2,
+    "voice_detected": 2,
+    "gaze_away": 1,
+    "no_face": 1,
+}
+RISK_BAND_THRESHOLDS = (4, 8, 16, 32, 64)
+
+
+def new_accumulator() -> dict:
+    return {
+        "total": 0,
+        "first_ts": None,
+        "last_ts": None,
+        "counts": {},
+        "longest_streak": {},
+        "max_burst": {},
+        "streak_type": None,
+        "streak_len": 0,
+        "recent": {},  # type -> timestamps inside the current burst window
+    }
+
+
+def accumulate(acc: dict, alerts: List[dict]) -> dict:
+    # Alerts are expected to be newer than anything already accumulated
+    events = sorted(
+        ((alert_epoch_seconds(a.get("timestamp")), normalize_violation_type(a.get("type") or "unknown")) for a in alerts),
+        key=lambda e: e[0]
+    )
+    for ts, kind in events:
+        acc["total"] += 1
+        acc["first_ts"] = ts if acc["first_ts"] is None else acc["first_ts"]
+        acc["last_ts"] = ts
+        acc["counts"][kind] = acc["counts"].get(kind, 0) + 1
+
+        # Consecutive alerts of the same type
+        if acc["streak_type"] == kind:
+            acc["streak_len"] += 1
+        else:
+            acc["streak_type"], acc["streak_len"] = kind, 1
+        acc["longest_streak"][kind] = max(acc["longest_streak"].get(kind, 0), acc["streak_len"])
+
+        # Most alerts of one type inside any BURST_WINDOW_SECONDS window
+        recent = [t for t in acc["recent"].get(kind, []) if ts - t < BURST_WINDOW_SECONDS]
+        recent.append(ts)
+        acc["recent"][kind] = recent
+        acc["max_burst"][kind] = max(acc["max_burst"].get(kind, 0), len(recent))
+    return acc
+
+
+def summarize(acc: dict) -> dict:
+    duration_min = 0.0
+    if acc["first_ts"] is not None:
+        duration_min = max((acc["last_ts"] - acc["first_ts"]) / 60, 1.0)
+    return {
+        "total_alerts": acc["total"],
+        "duration_minutes": round(duration_min, 1),
+        "burst_window_seconds": BURST_WINDOW_SECONDS,
+        "per_type": {
+            kind: {
+                "count": count,
+                "rate_per_minute": round(count / duration_min, 2) if duration_min else 0.0,
+                "max_burst": acc["max_burst"].get(kind, 0),
+                "longest_streak": acc["longest_streak"].get(kind, 0),
+            }
+            for kind, count in sorted(acc["counts"].items())
+        },
+    }
+
+
+def extract_features(alerts: List[dict]) -> dict:
+    return summarize(accumulate(new_accumulator(), alerts))
+
+
+def rule_verdict(features: dict) -> Optional[dict]:
+    per_type = features["per_type"]
+    count = lambda kind: per_type.get(kind, {}).get("count", 0)
+
+    if features["total_alerts"] == 0:
+        return {
+            "risk_level": "LOW",
+            "verdict": "Clean Record",
+            "explanation": "No anomalies or violations detected during the session."
+        }
+
+    high = [kind for kind in HIGH_RISK_TYPES if count(kind)]
+    if high:
+        details = ", ".join(f"{kind} x{count(kind)}" for kind in sorted(high))
+        return {
+            "risk_level": "HIGH",
+            "verdict": "Possible Cheating",
+            "explanation": f"Prohibited item detected ({details}); this is always treated as high risk."
+        }
+
+    if count("multiple_faces") >= MULTIPLE_FACES_HIGH_COUNT:
+        return {
+            "risk_level": "HIGH",
+            "verdict": "Possible Cheating",
+            "explanation": f"Another person was in frame {count('multiple_faces')} times."
+        }
+
+    # Only a few, spread-out gaze shifts: normal behaviour
+    gaze_like = {"gaze_away", "no_face"}
+    if set(per_type) <= gaze_like:
+        gaze_total = sum(count(kind) for kind in gaze_like)
+        gaze_burst = max(per_type[kind]["max_burst"] for kind in per_type)
+        if gaze_total <= GAZE_LOW_MAX_COUNT and gaze_burst <= GAZE_LOW_MAX_BURST:
+            return {
+                "risk_level": "LOW",
+                "verdict": "Clean",
+                "explanation": f"Only {gaze_total} occasional gaze shift(s); within normal behaviour."
+            }
+
+    return None
+
+
+def risk_score(features: dict) -> int:
+    return sum(RISK_WEIGHTS.get(kind, 1) * stats["count"] for kind, stats in features["per_type"].items())
+
+
+def risk_band(features: dict) -> int:
+    return bisect_right(RISK_BAND_THRESHOLDS, risk_score(features))
@@ -0,0 +1,145 @@
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import weakref
+from typing import Callable, List, Optional, Tuple
+from integrity_features import new_accumulator, accumulate, summarize, rule_verdict, risk_band
+
+# Rolling, per-attempt integrity analysis.
+# Each attempt keeps its aggregated alert features, the last verdict and a
+# high-water mark in integrity_state, so a call only folds in alerts it has
+# not seen yet. Rules are re-applied on every call (they are free); the model
+# is only asked again when the weighted alert score crosses into a new band.
+# Every changed verdict is appended to integrity_reports.
+
+SOURCE_REQUEST = "request"  # high-water mark = number of posted alerts already seen
+SOURCE_LOGS = "logs"        # high-water mark = last proctoring_logs row id
+
+REPORT_RISK_LEVELS = {"LOW", "MEDIUM", "HIGH"}  # integrity_reports check constraint (data/schema.sql)
+
+
+def load_state(conn: sqlite3.Connection, attempt_id: str, source: str) -> dict:
+    row = conn.execute(
+        "SELECT high_water, accumulator, band, result FROM integrity_state WHERE attempt_id = ? AND source = ?",
+        (attempt_id, source)
+    ).fetchone()
+    if row is None:
+        return {"high_water": 0, "accumulator": new_accumulator(), "band": None, "result": None}
+    return {
+        "high_water": row[0],
+        "accumulator": json.loads(row[1]),
+        "band": row[2],
+        "result": json.loads(row[3]) if row[3] else None,
+    }
+
+
+def save_state(conn: sqlite3.Connection, attempt_id: str, source: str, state: dict, report: Optional[Tuple[dict, str]]):
+    with conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO integrity_state (attempt_id, source, high_water, accumulator, band, result, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                attempt_id, source, state["high_water"], json.dumps(state["accumulator"]),
+                state["band"], json.dumps(state["result"]) if state["result"] else None, time.time()
+            )
+        )
+        if report is not None:
+            result, model_used = report
+            conn.execute(
+                "INSERT INTO integrity_reports (id, attempt_id, risk_level, verdict, explanation, model_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), attempt_id, result["risk_level"], result["verdict"], result["explanation"], model_used)
+            )
+
+
+# Served by idx_proctoring_logs_attempt_id: a range seek, no sort
+NEW_LOGS_SQL = "SELECT id, violation_type, occurred_at FROM proctoring_logs WHERE attempt_id = ? AND id > ? ORDER BY id"
+
+
+def fetch_new_logs(conn: sqlite3.Connection, attempt_id: str, after_id: int) -> List[tuple]:
+    return conn.execute(NEW_LOGS_SQL, (attempt_id, after_id)).fetchall()
+
+
+class RollingIntegrity:
+    def __init__(self, database, graph, model_name: str = "llm"):
+        self.database = database
+        self.graph = graph
+        self.model_name = model_name
+        self._locks = weakref.WeakValueDictionary()  # dropped once no call holds them
+
+        self.calls = 0
+        self.llm_calls = 0
+        self.alerts_processed = 0
+
+    def _lock_for(self, attempt_id: str) -> asyncio.Lock:
+        # Serializes updates per attempt within this worker; the table row is the source of truth
+        lock = self._locks.get(attempt_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[attempt_id] = lock
+        return lock
+
+    async def analyze_alerts(self, attempt_id: str, alerts: List[dict]) -> dict:
+        # The dashboard posts the full (append-only) history; only the tail is new
+        async def new_alerts(high_water: int):
+            if len(alerts) < high_water:
+                return None, 0  # history shrank: start over
+            return alerts[high_water:], len(alerts)
+        return await self._update(attempt_id, SOURCE_REQUEST, new_alerts)
+
+    async def analyze_logs(self, attempt_id: str) -> dict:
+        async def new_alerts(high_water: int):
+            rows = await self.database.run(fetch_new_logs, attempt_id, high_water)
+            if not rows:
+                return [], high_water
+            return [{"type": kind, "timestamp": occurred_at} for _, kind, occurred_at in rows], rows[-1][0]
+        return await self._update(attempt_id, SOURCE_LOGS, new_alerts)
+
+    async def _update(self, attempt_id: str, source: str, load_new: Callable) -> dict:
+        async with self._lock_for(attempt_id):
+            self.calls += 1
+            state = await self.database.run(load_state, attempt_id, source)
+            alerts, high_water = await load_new(state["high_water"])
+            if alerts is None:
+                state = {"high_water": 0, "accumulator": new_accumulator(), "band": None, "result": None}
+                alerts, high_water = await load_new(0)
+
+            if not alerts and state["result"] is not None:
+                return {**state["result"], "reanalyzed": False, "alerts_processed": 0}
+
+            accumulate(state["accumulator"], alerts)
+            state["high_water"] = high_water
+            features = summarize(state["accumulator"])
+            band = risk_band(features)
+            previous = state["result"]
+
+            result, model_used = rule_verdict(features), "rules"
+            if result is not None:
+                result["decided_by"] = "rules"
+            elif previous is not None and previous.get("decided_by") == "llm" and band == state["band"]:
+                result, model_used = previous, None  # same band: keep the last model verdict
+            else:
+                self.llm_calls += 1
+                output = await self.graph.ainvoke({"features": features})
+                model_used = output.get("model_used", self.model_name)  # the graph names its model once loaded
+                result = {k: output[k] for k in ("risk_level", "verdict", "explanation")}
+                result["decided_by"] = output.get("decided_by", "llm")
+
+            report = None
+            changed = previous is None or (previous["risk_level"], previous["verdict"]) != (result["risk_level"], result["verdict"])
+            if model_used and changed and result["risk_level"] in REPORT_RISK_LEVELS:
+                report = (result, model_used)
+
+            # A failed model call is not remembered, so the next call retries it
+            state["band"] = band if result["risk_level"] in REPORT_RISK_LEVELS else None
+            state["result"] = result
+            await self.database.run(save_state, attempt_id, source, state, report)
+            self.alerts_processed += len(alerts)
+
+            return {**result, "features": features, "reanalyzed": model_used is not None, "alerts_processed": len(alerts)}
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "llm_calls": self.llm_calls, "alerts_processed": self.alerts_processed}
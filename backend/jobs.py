@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import sqlite3
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from llm_errors import is_rate_limited, is_transient_error, retry_after_seconds
+
+# Durable background job queue on the shared SQLite database.
+# Handlers enqueue and return 202 with a job id; JOB_WORKERS asyncio workers
+# per process claim jobs under BEGIN IMMEDIATE with a lease, so several uvicorn
+# workers can share one queue and a crashed worker's jobs are picked up again
+# once the lease expires. Running jobs renew their lease (heartbeat every third
+# of JOB_LEASE_SECONDS), so long jobs are never picked up twice; a job whose
+# worker died on its last allowed attempt is marked failed instead of re-run
+# forever. Rate limits and transient upstream errors are retried
+# with jittered exponential backoff (honouring Retry-After), and a 429 also
+# pauses this process's workers, so bursts drain at the pace the quota allows.
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "6"))
+JOB_BACKOFF_BASE_SECONDS = float(os.environ.get("JOB_BACKOFF_BASE_SECONDS", "2"))
+JOB_BACKOFF_MAX_SECONDS = float(os.environ.get("JOB_BACKOFF_MAX_SECONDS", "120"))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "300"))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+# Prune finished jobs every N claims instead of on every poll
+PRUNE_EVERY = 500
+
+# handler(payload, data) -> result
+Handler = Callable[[dict, Optional[bytes]], Awaitable[dict]]
+
+
+class JobFailed(Exception):
+    # Raised by handlers for failures the agents reported instead of raising
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def _row_to_job(row: tuple) -> dict:
+    job_id, kind, status, attempts, max_attempts, result, error, created_at, updated_at, run_after = row
+    return {
+        "job_id": job_id,
+        "kind": kind,
+        "status": status,
+        "attempts": attempts,
+        "max_attempts": max_attempts,
+        "result": json.loads(result) if result else None,
+        "error": error,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "next_attempt_at": run_after if status == "queued" else None,
+    }
+
+
+JOB_COLUMNS = "id, kind, status, attempts, max_attempts, result, error, created_at, updated_at, run_after"
+
+
+class JobQueue:
+    def __init__(self, database, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.database = database
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks = []
+        self._wakeup = None
+        self._paused_until = 0.0
+        self._claims = 0
+
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.worker_errors = 0
+        self.abandoned = 0  # leases expired with no attempts left
+
+    def register(self, kind: str, handler: Handler):
+        self._handlers[kind] = handler
+
+    # --- Producer side ---
+
+    def _enqueue(self, conn: sqlite3.Connection, kind: str, payload: dict, data: Optional[bytes], key: Optional[str], max_attempts: int) -> Tuple[dict, bool]:
+        now = time.time()
+        with conn:
+            if key is not None:
+                row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+                if row is not None:
+                    return _row_to_job(row), False
+            job_id = str(uuid.uuid4())
+            conn.execute(
+                """
+                INSERT INTO jobs (id, kind, payload, data, idempotency_key, status, attempts, max_attempts, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+                """,
+                (job_id, kind, json.dumps(payload), data, key, max_attempts, now, now, now)
+            )
+            row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row), True
+
+    async def enqueue(self, kind: str, payload: dict, data: Optional[bytes] = None, idempotency_key: Optional[str] = None, max_attempts: Optional[int] = None) -> Tuple[dict, bool]:
+        # Returns (job, created); a repeated idempotency key returns the original job
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        key = f"{kind}:{idempotency_key}" if idempotency_key else None
+        try:
+            job, created = await self.database.run(self._enqueue, kind, payload, data, key, max_attempts or self.max_attempts)
+        except sqlite3.IntegrityError:
+            # Lost a race with a concurrent request using the same key
+            row = await self.database.fetchone(f"SELECT {JOB_COLUMNS} FROM jobs WHERE idempotency_key = ?", (key,))
+            job, created = _row_to_job(row), False
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return job, created
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        row = await self.database.fetchone(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_job(row) if row else None
+
+    # --- Worker side ---
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[tuple]:
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # The worker running these died (or hung) on the last allowed attempt
+            self.abandoned += conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', error = COALESCE(error || '; ', '') || 'lease expired on final attempt',
+                    data = NULL, locked_by = NULL, locked_until = NULL, updated_at = ?
+                WHERE status = 'running' AND locked_until < ? AND attempts >= max_attempts
+                """,
+                (now, now)
+            ).rowcount
+            row = conn.execute(
+                """
+                SELECT id, kind, payload, data, attempts, max_attempts FROM jobs
+                WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND locked_until < ?)
+                ORDER BY run_after LIMIT 1
+                """,
+                (now, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, locked_by = ?, locked_until = ?, updated_at = ? WHERE id = ?",
+                    (self.worker_id, now + JOB_LEASE_SECONDS, now, row[0])
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return row
+
+    def _finish(self, conn: sqlite3.Connection, job_id: str, status: str, result: Optional[dict], error: Optional[str], run_after: Optional[float]):
+        now = time.time()
+        with conn:
+            if status == "queued":
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, locked_by = NULL, locked_until = NULL, updated_at = ? WHERE id = ? AND locked_by = ?",
+                    (error, run_after, now, job_id, self.worker_id)
+                )
+            else:
+                # Inputs are no longer needed once a job is final
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, data = NULL, locked_by = NULL, locked_until = NULL, updated_at = ? WHERE id = ? AND locked_by = ?",
+                    (status, json.dumps(result) if result is not None else None, error, now, job_id, self.worker_id)
+                )
+
+    def _renew(self, conn: sqlite3.Connection, job_id: str) -> bool:
+        with conn:
+            return conn.execute(
+                "UPDATE jobs SET locked_until = ? WHERE id = ? AND status = 'running' AND locked_by = ?",
+                (time.time() + JOB_LEASE_SECONDS, job_id, self.worker_id)
+            ).rowcount > 0
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                if not await self.database.run(self._renew, job_id):
+                    print(f"Job {job_id} lost its lease")
+                    return
+            except sqlite3.Error as e:
+                print(f"Job {job_id} lease renewal failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+                (time.time() - JOB_RETENTION_SECONDS,)
+            )
+
+    def _backoff(self, attempts: int, exc: BaseException) -> float:
+        hinted = getattr(exc, "retry_after", None) or retry_after_seconds(exc)
+        # Full jitter spreads retries from a burst instead of re-synchronizing them
+        delay = random.uniform(0, min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1)))
+        return max(delay, hinted or 0.0)
+
+    async def _execute(self, job_id: str, kind: str, payload: str, data: Optional[bytes], attempts: int, max_attempts: int):
+        handler = self._handlers.get(kind)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            if handler is None:
+                raise JobFailed(f"No handler registered for job kind '{kind}'")
+            result = await handler(json.loads(payload), data)
+        except Exception as e:
+            rate_limited = is_rate_limited(e)
+            retryable = getattr(e, "retryable", None)
+            retryable = is_transient_error(e) if retryable is None else retryable
+            if retryable and attempts < max_attempts:
+                delay = self._backoff(attempts, e)
+                if rate_limited:
+                    self.rate_limited += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self.retried += 1
+                print(f"Job {job_id} ({kind}) attempt {attempts} failed, retrying in {delay:.1f}s: {e}")
+                await self.database.run(self._finish, job_id, "queued", None, str(e), time.time() + delay)
+            else:
+                self.failed += 1
+                print(f"Job {job_id} ({kind}) failed: {e}")
+                await self.database.run(self._finish, job_id, "failed", None, str(e), None)
+            return
+        finally:
+            heartbeat.cancel()
+        self.succeeded += 1
+        await self.database.run(self._finish, job_id, "succeeded", result, None, None)
+
+    async def _worker(self):
+        while True:
+            try:
+                await self._step()
+            except Exception as e:
+                # e.g. "database is locked" from _finish or _prune under multi-worker
+                # load; an unfinished job is picked up again once its lease expires
+                self.worker_errors += 1
+                print(f"Job worker error: {e}")
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+    async def _step(self):
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        try:
+            claimed = await self.database.run(self._claim)
+        except sqlite3.Error as e:
+            print(f"Job claim failed: {e}")
+            claimed = None
+        if claimed is None:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            return
+
+        job_id, kind, payload, data, attempts, max_attempts = claimed
+        await self._execute(job_id, kind, payload, data, attempts + 1, max_attempts)
+
+        self._claims += 1
+        if self._claims % PRUNE_EVERY == 0:
+            await self.database.run(self._prune)
+
+    def start(self):
+        if not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _release(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', locked_by = NULL, locked_until = NULL WHERE status = 'running' AND locked_by = ?",
+                (self.worker_id,)
+            )
+
+    async def stop(self):
+        # Interrupted jobs go straight back to the queue instead of waiting out their lease
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self.database.run(self._release)
+
+    async def counts(self) -> dict:
+        rows = await self.database.fetchall("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(rows)
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "worker_errors": self.worker_errors,
+            "abandoned": self.abandoned,
+        }
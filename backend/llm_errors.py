@@ -0,0 +1,46 @@
+import asyncio
+from typing import Optional
+
+# Classifies upstream (Groq / HTTP) failures without importing the SDKs, so the
+# same checks work for groq, langchain-groq and httpx exceptions.
+
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError",
+    "ConnectError", "ReadTimeout", "ConnectTimeout", "RemoteProtocolError",
+}
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _error_names(exc: BaseException) -> set:
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    # The gateway wraps upstream errors in LLMUnavailable, which carries the flag
+    if getattr(exc, "rate_limited", False):
+        return True
+    return status_code(exc) == 429 or "RateLimitError" in _error_names(exc)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    # Worth retrying later: rate limits, timeouts, connection and 5xx errors
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return status_code(exc) in TRANSIENT_STATUS_CODES or bool(_error_names(exc) & TRANSIENT_ERROR_NAMES)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
@@ -0,0 +1,365 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from llm_errors import is_rate_limited, is_transient_error, retry_after_seconds
+from rate_limits import limiter_for
+from metrics import Counter, Histogram
+
+# Single path for every Groq call (the four agent graphs and Whisper).
+# - One pooled keep-alive httpx client shared by all models
+# - A timeout on every call; retries share that budget, with jittered backoff
+# - Per-model rate limiting (rate_limits.py), re-applied on each retry
+# - Per-model circuit breaker: after LLM_BREAKER_FAILURES consecutive upstream
+#   failures, calls fail fast for LLM_BREAKER_COOLDOWN_SECONDS, then a single
+#   probe decides whether to close it again
+# - Deadlines: callers may pass an absolute deadline (epoch seconds, carried
+#   through graph state) that caps the budget of every nested call
+# - Hedging: for idempotent calls (hedge=True), a backup request is sent once
+#   the primary outlives the model's observed p95 latency; the first answer wins
+# - httpx, the Groq SDK and LangChain are imported when the first client is
+#   built, so importing this module (for errors and stats) stays cheap
+# - Metrics per model and calling graph node (grader, analyst, auditor,
+#   verifier, whisper): end-to-end latency, outcomes, retries, hedges
+# Failures surface as LLMUnavailable (503: retry later) or LLMError (502),
+# never as fallback verdicts.
+
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.environ.get("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.environ.get("LLM_MAX_KEEPALIVE", "20"))
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))  # no hedging until p95 is meaningful
+LLM_HEDGE_MAX_RATIO = float(os.environ.get("LLM_HEDGE_MAX_RATIO", "0.1"))  # at most 10% extra requests
+LLM_LATENCY_WINDOW = 200
+
+T = TypeVar("T")
+
+llm_call_seconds = Histogram(
+    "llm_call_seconds", "End-to-end model call latency incl. quota wait and retries", ["model", "node"]
+)
+llm_upstream_seconds = Histogram("llm_upstream_seconds", "Latency of single upstream requests", ["model"])
+llm_calls = Counter("llm_calls_total", "Model calls by outcome (ok, error, unavailable, cancelled)", ["model", "node", "outcome"])
+llm_retries = Counter("llm_retries_total", "Retried upstream requests", ["model", "node"])
+llm_hedges = Counter("llm_hedges_total", "Backup requests sent for slow calls", ["model", "node"])
+whisper_bytes = Counter("whisper_audio_bytes_total", "Audio bytes sent for transcription", ["model"])
+whisper_seconds = Counter("whisper_audio_seconds_total", "Seconds of audio transcribed (when known)", ["model"])
+
+
+class LLMError(Exception):
+    # The model call failed for a reason retrying will not fix (bad request, unparseable reply)
+    status = 502
+    retryable = False
+
+    def __init__(self, model: str, message: str, retry_after: Optional[float] = None, rate_limited: bool = False):
+        super().__init__(f"{model}: {message}")
+        self.model = model
+        self.retry_after = retry_after
+        self.rate_limited = rate_limited  # upstream answered 429 (jobs.py pauses its workers on it)
+
+
+class LLMUnavailable(LLMError):
+    # Upstream degraded, over quota, timed out or circuit open: try again later
+    status = 503
+    retryable = True
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True  # exactly one probe while half open
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+_clients: Dict[str, Any] = {}  # "http" / "groq", built on first use
+_chat_models: Dict[str, Any] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, deque] = {}
+gateway_stats_counters = {
+    "calls": 0, "retries": 0, "failures": 0, "fast_failures": 0, "timeouts": 0, "deadline_cutoffs": 0, "hedges": 0, "hedge_wins": 0
+}
+
+
+def http_client():
+    client = _clients.get("http")
+    if client is None:
+        import httpx
+        client = _clients["http"] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+    return client
+
+
+def groq_client():
+    client = _clients.get("groq")
+    if client is None:
+        from groq import AsyncGroq
+        # Retries are ours (budgeted, jittered, breaker-aware), so the SDK's are off
+        client = _clients["groq"] = AsyncGroq(http_client=http_client(), max_retries=0)
+    return client
+
+
+def chat_model(model: str):
+    # One ChatGroq per model, all on the shared connection pool
+    llm = _chat_models.get(model)
+    if llm is None:
+        from langchain_groq import ChatGroq
+        llm = _chat_models[model] = ChatGroq(
+            model_name=model,
+            temperature=0,
+            max_retries=0,
+            http_async_client=http_client(),
+        )
+    return llm
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = _breakers[model] = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN_SECONDS)
+    return breaker
+
+
+def record_latency(model: str, seconds: float):
+    samples = _latencies.get(model)
+    if samples is None:
+        samples = _latencies[model] = deque(maxlen=LLM_LATENCY_WINDOW)
+    samples.append(seconds)
+    llm_upstream_seconds.observe(seconds, model=model)
+
+
+def latency_percentile(model: str, percentile: float) -> Optional[float]:
+    samples = _latencies.get(model)
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+
+def hedge_delay(model: str) -> Optional[float]:
+    # None = do not hedge (not enough history, or the hedge budget is spent)
+    samples = _latencies.get(model)
+    if not samples or len(samples) < LLM_HEDGE_MIN_SAMPLES:
+        return None
+    if gateway_stats_counters["hedges"] >= LLM_HEDGE_MAX_RATIO * gateway_stats_counters["calls"]:
+        return None
+    return latency_percentile(model, LLM_HEDGE_PERCENTILE)
+
+
+def remaining_seconds(deadline: Optional[float]) -> Optional[float]:
+    # Absolute deadline (epoch seconds, as carried in graph state) -> seconds left
+    return None if deadline is None else deadline - time.time()
+
+
+async def _first_success(primary: asyncio.Task, start_backup: Callable[[], asyncio.Task], delay: float):
+    # Waits for the primary; past `delay`, races it against a backup request
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done:
+        return primary.result()
+    backup = start_backup()
+    pending = {primary, backup}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        gateway_stats_counters["hedge_wins"] += 1
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in (primary, backup):
+            task.cancel()
+
+
+async def invoke(
+    model: str,
+    call: Callable[[], Awaitable[T]],
+    tokens: int = 0,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    hedge: bool = False,
+    node: str = ""
+) -> T:
+    # Runs call() (e.g. lambda: chain.ainvoke(...)) under the model's quota, breaker and time budget.
+    # hedge=True is only for idempotent calls: call() may run twice.
+    # node names the caller (graph node) in metrics.
+    started = time.monotonic()
+    outcome = "cancelled"
+    try:
+        result = await _invoke(model, call, tokens, timeout, deadline, hedge, node)
+        outcome = "ok"
+        return result
+    except LLMUnavailable:
+        outcome = "unavailable"
+        raise
+    except LLMError:
+        outcome = "error"
+        raise
+    finally:
+        llm_calls.inc(model=model, node=node, outcome=outcome)
+        llm_call_seconds.observe(time.monotonic() - started, model=model, node=node)
+
+
+async def _invoke(model, call, tokens, timeout, deadline, hedge, node) -> T:
+    budget = timeout or LLM_TIMEOUT_SECONDS
+    left = remaining_seconds(deadline)
+    capped = left is not None and left < budget  # the caller's deadline, not ours, bounds this call
+    if left is not None:
+        budget = min(budget, left)
+        if budget <= 0:
+            raise LLMUnavailable(model, "request deadline already passed")
+    deadline = time.monotonic() + budget
+    breaker = breaker_for(model)
+    limiter = limiter_for(model)
+    gateway_stats_counters["calls"] += 1
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            gateway_stats_counters["fast_failures"] += 1
+            raise LLMUnavailable(model, "circuit open after repeated upstream failures", retry_after=breaker.retry_after())
+
+        sent = False
+
+        async def admitted_call():
+            nonlocal sent
+            # Time spent queued for quota counts against the same budget
+            async with limiter.slot(tokens):
+                sent = True
+                started = time.monotonic()
+                result = await call()
+                record_latency(model, time.monotonic() - started)
+                return result
+
+        async def attempt_call():
+            delay = hedge_delay(model) if hedge and breaker.state == "closed" else None
+            if delay is None:
+                return await admitted_call()
+
+            def start_backup():
+                gateway_stats_counters["hedges"] += 1
+                llm_hedges.inc(model=model, node=node)
+                return asyncio.ensure_future(admitted_call())
+            return await _first_success(asyncio.ensure_future(admitted_call()), start_backup, delay)
+
+        try:
+            result = await asyncio.wait_for(attempt_call(), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            gateway_stats_counters["timeouts"] += 1
+            gateway_stats_counters["failures"] += 1
+            if sent and not capped:
+                breaker.record_failure()  # only upstream silent for our full timeout counts
+            else:
+                # Cut short by queueing or by the caller's deadline: says nothing about upstream
+                if capped:
+                    gateway_stats_counters["deadline_cutoffs"] += 1
+                breaker.probing = False
+            raise LLMUnavailable(model, f"no response within {budget:g}s")
+        except Exception as e:
+            if not is_transient_error(e):
+                # The provider answered; a bad request or reply does not count against the breaker
+                breaker.record_success()
+                gateway_stats_counters["failures"] += 1
+                raise LLMError(model, str(e)) from e
+            breaker.record_failure()
+            attempt += 1
+            hinted = retry_after_seconds(e)
+            delay = max(random.uniform(0, LLM_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)), hinted or 0.0)
+            if attempt > LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                gateway_stats_counters["failures"] += 1
+                raise LLMUnavailable(model, str(e), retry_after=hinted, rate_limited=is_rate_limited(e)) from e
+            gateway_stats_counters["retries"] += 1
+            llm_retries.inc(model=model, node=node)
+            print(f"{model} call failed ({e}); retry {attempt}/{LLM_MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+async def transcribe(
+    model: str,
+    filename: str,
+    audio_bytes: bytes,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    audio_seconds: Optional[float] = None
+) -> str:
+    async def call():
+        transcription = await groq_client().audio.transcriptions.create(
+            file=(filename, audio_bytes),
+            model=model,
+            response_format="json",
+            language="en",
+            temperature=0.0
+        )
+        return transcription.text
+    # Transcription is idempotent, so slow calls may be hedged
+    text = await invoke(model, call, timeout=timeout, deadline=deadline, hedge=True, node="whisper")
+    whisper_bytes.inc(len(audio_bytes), model=model)
+    if audio_seconds is not None:
+        whisper_seconds.inc(audio_seconds, model=model)
+    return text
+
+
+def gateway_stats() -> dict:
+    return {
+        **gateway_stats_counters,
+        "p95_seconds": {model: round(latency_percentile(model, 0.95), 3) for model in _latencies if _latencies[model]},
+        "breakers": {
+            model: {"state": b.state, "consecutive_failures": b.failures, "rejected": b.rejected}
+            for model, b in _breakers.items()
+        },
+    }
+
+
+async def aclose():
+    client = _clients.pop("http", None)
+    _clients.pop("groq", None)
+    if client is not None:
+        await client.aclose()
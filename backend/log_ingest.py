@@ -0,0 +1,193 @@
+import math
+import time
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+# Write-behind ingestion for proctoring alerts.
+# Handlers only append to an in-process buffer; a single background task
+# flushes it with executemany in grouped transactions, when LOG_FLUSH_BATCH rows
+# are pending or every LOG_FLUSH_INTERVAL seconds. The buffer is bounded: once
+# it is full, new batches are refused (HTTP 503) instead of growing memory.
+# A chunk that fails LOG_FLUSH_MAX_FAILURES flushes in a row is written row by
+# row instead: good rows land, rows SQLite keeps rejecting are dropped (and
+# counted), so one bad row cannot wedge the queue.
+
+# Browser sentry alert types -> proctoring_logs.violation_type (data/schema.sql)
+VIOLATION_TYPE_ALIASES = {
+    "LOOKING_AWAY": "gaze_away",
+    "PHONE_DETECTED": "phone_detected",
+    "MULTIPLE_FACES": "multiple_faces",
+    "TAB_SWITCH": "tab_switch",
+    "VOICE_DETECTED": "voice_detected",
+    "AUDIO_VIOLATION": "voice_detected",
+    "FULLSCREEN_EXIT": "fullscreen_exit",
+    "NO_FACE": "no_face",
+}
+
+
+def normalize_violation_type(alert_type: Any) -> str:
+    alert_type = str(alert_type or "unknown")
+    return VIOLATION_TYPE_ALIASES.get(alert_type, alert_type.lower())
+
+
+def _parse_timestamp(timestamp: Any) -> Optional[float]:
+    if isinstance(timestamp, bool):
+        return None
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        text = timestamp.strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        try:
+            # ISO 8601 (e.g. new Date().toISOString()); naive times are taken as UTC
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return None
+
+
+def alert_epoch_seconds(timestamp: Any) -> float:
+    # Browsers send Date.now() (ms); older callers send seconds, numeric
+    # strings or ISO dates. Anything unparseable is stamped with the arrival time.
+    seconds = _parse_timestamp(timestamp)
+    if seconds is None or not math.isfinite(seconds):
+        return time.time()
+    return seconds / 1000 if seconds > 1e11 else seconds
+
+
+# (attempt_id, violation_type, message, confidence_score, snapshot_url, occurred_at)
+LogRow = Tuple[str, str, Optional[str], Optional[float], Optional[str], float]
+
+INSERT_SQL = """
+    INSERT INTO proctoring_logs (attempt_id, violation_type, message, confidence_score, snapshot_url, occurred_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+class LogIngestQueue:
+    def __init__(self, database, max_pending: int, batch_size: int, flush_interval: float, max_rows_per_transaction: int,
+                 max_failures: int = 3):
+        self.database = database
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows_per_transaction = max_rows_per_transaction
+        self.max_failures = max(1, max_failures)
+
+        self._pending = deque()
+        self._failures = 0  # consecutive failed flushes of the chunk at the head
+        # One flush at a time: a caller that flushes to read its own alerts back
+        # must wait for rows another flush has already taken off _pending
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = None
+        self._task = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.transactions = 0
+        self.dropped = 0
+        self.flush_failures = 0
+
+    def offer(self, rows: List[LogRow]) -> bool:
+        # All-or-nothing per batch, so a client retry never duplicates half a batch
+        if len(self._pending) + len(rows) > self.max_pending:
+            self.rejected += len(rows)
+            return False
+        self._pending.extend(rows)
+        self.accepted += len(rows)
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _write(self, conn: sqlite3.Connection, rows: List[LogRow]):
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+
+    def _write_each(self, conn: sqlite3.Connection, rows: List[LogRow]) -> int:
+        # One transaction, one savepoint per row: rows SQLite rejects are skipped.
+        # OperationalError (locked, disk full, ...) is not the row's fault and
+        # aborts the whole chunk for a later retry.
+        written = 0
+        with conn:
+            conn.execute("BEGIN")
+            for row in rows:
+                conn.execute("SAVEPOINT log_row")
+                try:
+                    conn.execute(INSERT_SQL, row)
+                    written += 1
+                except sqlite3.OperationalError:
+                    raise
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO log_row")
+                    print(f"Dropping proctoring log row {row[:2]}: {e}")
+                conn.execute("RELEASE log_row")
+        return written
+
+    async def flush(self):
+        async with self._flush_lock:
+            await self._flush_pending()
+
+    async def _flush_pending(self):
+        while self._pending:
+            count = min(len(self._pending), self.max_rows_per_transaction)
+            rows = [self._pending.popleft() for _ in range(count)]
+            write = self._write_each if self._failures >= self.max_failures else self._write
+            try:
+                written = await self.database.run(write, rows)
+            except sqlite3.Error as e:
+                # Put the rows back (oldest first) and retry on the next tick
+                print(f"Proctoring log flush failed: {e}")
+                self._pending.extendleft(reversed(rows))
+                self._failures += 1
+                self.flush_failures += 1
+                return
+            written = len(rows) if written is None else written
+            self._failures = 0
+            self.written += written
+            self.dropped += len(rows) - written
+            self.transactions += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "transactions": self.transactions,
+            "dropped": self.dropped,
+            "flush_failures": self.flush_failures,
+        }
@@ -1,27 +1,121 @@
-from fastapi import FastAPI, UploadFile, File, Form
-from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
-from pydantic import BaseModel
-from dotenv import load_dotenv
-from groq import Groq
 import os
-import shutil
+import asyncio
+import time
 import base64
 import json
 import random
-
-# 1. Load Environment Variables BEFORE importing agents
+import startup
+
+# Agents (LangGraph/LangChain/Groq) are not imported here: see agents.py.
+# Each import group is timed; the breakdown is printed once the worker is ready.
+with startup.phase("web framework"):
+    from fastapi import FastAPI, UploadFile, File, Form, Header, WebSocket, WebSocketDisconnect
+    from starlette.websockets import WebSocketState
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse
+    from typing import List, Dict, Any, Optional
+    from pathlib import Path
+    from contextlib import asynccontextmanager
+    from pydantic import BaseModel
+    from dotenv import load_dotenv
+
+# 1. Load Environment Variables BEFORE anything reads them
 load_dotenv()
 
-# 2. Import Agents (now that env vars are set)
-from grading_agent import grade_answer_graph
-from integrity_agent import integrity_graph
-from audio_agent import audio_graph
-from identity_agent import identity_graph
+# 2. Agent graphs, loaded on first use or by the lifespan warm-up
+from agents import LazyGraph, load_agent, warm_agents, agent_stats, AGENT_WARMUP
+grade_answer_graph = LazyGraph("grading_agent", "grade_answer_graph")
+integrity_graph = LazyGraph("integrity_agent", "integrity_graph")
+audio_graph = LazyGraph("audio_agent", "audio_graph")
+identity_graph = LazyGraph("identity_agent", "identity_graph")
+
+with startup.phase("storage and pipelines"):
+    from grade_cache import grade_cache
+    from storage import db
+    from migrations import run_migrations
+    from uploads import (
+        read_upload, save_upload, stored_from_bytes, StoredUpload, UploadRejected, UPLOAD_DIR, ID_CARD_TYPES, IMAGE_TYPES, MAX_ID_CARD_BYTES, MAX_IMAGE_BYTES
+    )
+    from pdf_render import rasterize_pdf, prune_render_cache, render_stats
+    from identity_cache import identity_cache_stats
+    from image_prep import prepare_image
+    from log_ingest import LogIngestQueue, normalize_violation_type, alert_epoch_seconds
+    from vad import detect_speech, vad_stats, NUMPY_AVAILABLE
+
+# Write-behind queue for proctoring alerts (see log_ingest.py)
+log_queue = LogIngestQueue(
+    db,
+    max_pending=int(os.environ.get("LOG_QUEUE_MAX_PENDING", "50000")),
+    batch_size=int(os.environ.get("LOG_FLUSH_BATCH", "500")),
+    flush_interval=float(os.environ.get("LOG_FLUSH_INTERVAL_SECONDS", "1.0")),
+    max_rows_per_transaction=int(os.environ.get("LOG_FLUSH_MAX_ROWS", "5000")),
+    max_failures=int(os.environ.get("LOG_FLUSH_MAX_FAILURES", "3"))
+)
+with startup.phase("jobs and gateway"):
+    from cpu_pool import shutdown_process_pool
+    from integrity_state import RollingIntegrity, REPORT_RISK_LEVELS
+    from jobs import JobQueue, JobFailed
+    from rate_limits import rate_limit_stats
+    import llm_gateway
+    from llm_gateway import LLMError
+    import metrics
+    from http_metrics import MetricsMiddleware
+
+# Per-attempt incremental integrity analysis (see integrity_state.py)
+rolling_integrity = RollingIntegrity(db, integrity_graph)
+
+# Durable background jobs for LLM-backed work (see jobs.py); handlers are registered below
+job_queue = JobQueue(db)
 
 # 3. Initialize App & Clients
-app = FastAPI(title="AegisExam AI Service")
-client = Groq() # For Whisper
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema migrations run once per worker start, never per request
+    with startup.phase("migrations"):
+        await asyncio.to_thread(run_migrations, db)
+    print("Database initialized.")
+    with startup.phase("render cache prune"):
+        try:
+            await asyncio.to_thread(prune_render_cache)
+        except OSError as e:
+            print(f"Render cache prune failed: {e}")
+    log_queue.start()
+    job_queue.start()
+    warmup = None
+    if AGENT_WARMUP == "blocking":
+        with startup.phase("agent warm-up"):
+            await warm_agents()
+    elif AGENT_WARMUP == "background":
+        warmup = asyncio.create_task(warm_agents())
+    print(startup.report())
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await job_queue.stop()
+    await log_queue.stop()  # flush whatever is still buffered
+    shutdown_process_pool()
+    await llm_gateway.aclose()
+    db.close()
+
+app = FastAPI(title="AegisExam AI Service", lifespan=lifespan)
+
+# Whisper goes through the shared LLM gateway (pooled connections, quota,
+# retries, circuit breaker); the timeout bounds each transcription including
+# time spent queued for a slot.
+WHISPER_MODEL = "distil-whisper-large-v3-en"
+WHISPER_TIMEOUT_SECONDS = float(os.environ.get("WHISPER_TIMEOUT_SECONDS", "20"))
+
+# End-to-end budgets for latency-critical endpoints. The deadline travels in
+# graph state down to every model call (and lets them hedge); past it the
+# endpoint answers 503 instead of hanging on a slow upstream.
+IDENTITY_DEADLINE_SECONDS = float(os.environ.get("IDENTITY_DEADLINE_SECONDS", "15"))
+AUDIO_DEADLINE_SECONDS = float(os.environ.get("AUDIO_DEADLINE_SECONDS", "10"))
+
+@app.exception_handler(LLMError)
+async def llm_error_handler(request, exc: LLMError):
+    # 503 (+ Retry-After) while Groq is degraded or over quota, 502 for bad upstream replies
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse({"error": str(exc)}, status_code=exc.status, headers=headers)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,7 +123,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+# Outermost, so latency includes every other middleware (see http_metrics.py)
+app.add_middleware(MetricsMiddleware, router_app=app)
 
 # 4. Request Models
 class GradingRequest(BaseModel):
@@ -37,8 +134,31 @@ class GradingRequest(BaseModel):
     student_answer: str
     rubric: str
 
+class BatchGradingItem(BaseModel):
+    question_id: str
+    question: str
+    student_answer: str
+    rubric: str
+
+class BatchGradingRequest(BaseModel):
+    attempt_id: str = None
+    answers: List[BatchGradingItem]
+    max_concurrency: int = None
+    pack_short_answers: bool = True
+
 class IntegrityRequest(BaseModel):
     alerts: List[Dict[str, Any]]
+    attempt_id: Optional[str] = None  # enables incremental analysis of the posted history
+
+class ProctoringAlert(BaseModel):
+    type: str
+    timestamp: float = None
+    message: str = None
+    confidence: float = None
+    snapshot_url: str = None
+
+class LogBatchRequest(BaseModel):
+    alerts: List[ProctoringAlert]
 
 class AudioRequest(BaseModel):
     transcript: str
@@ -58,42 +178,90 @@ async def grade_answer(request: GradingRequest):
     })
     return result
 
+@app.post("/grade/batch")
+async def grade_batch(request: BatchGradingRequest):
+    grading_agent = await load_agent("grading_agent")
+    # Clients may lower the fan-out, never raise it above the server cap
+    cap = grading_agent.GRADE_BATCH_MAX_CONCURRENCY
+    max_concurrency = min(request.max_concurrency or cap, cap)
+    results = await grading_agent.grade_answers_batch(
+        [answer.dict() for answer in request.answers],
+        max_concurrency=max_concurrency,
+        pack_short_answers=request.pack_short_answers
+    )
+    return {
+        "attempt_id": request.attempt_id,
+        "results": [
+            {"question_id": answer.question_id, **result}
+            for answer, result in zip(request.answers, results)
+        ]
+    }
+
+@app.get("/grade/cache_stats")
+def grade_cache_stats():
+    return grade_cache.stats()
+
 @app.post("/analyze_integrity")
 async def analyze_integrity(request: IntegrityRequest):
+    if request.attempt_id:
+        return await rolling_integrity.analyze_alerts(request.attempt_id, request.alerts)
     result = await integrity_graph.ainvoke({
         "alerts": request.alerts
     })
     return result
 
+async def load_registered_id_card(user_id: str) -> StoredUpload:
+    row = await db.fetchone("SELECT id_card_path, id_card_sha256 FROM users WHERE id = ?", (user_id,))
+    if not row or not row[0] or not os.path.exists(row[0]):
+        raise UploadRejected("No registered ID card for this user")
+    data = await asyncio.to_thread(Path(row[0]).read_bytes)
+    return stored_from_bytes(row[0], data, row[1])
+
+async def identity_inputs(id_upload: StoredUpload, webcam_upload: StoredUpload) -> dict:
+    # Shared by /verify_identity and /register_identity:
+    # PDF -> PNG (process pool, cached), then both images normalized in parallel
+    id_card_bytes = id_upload.data
+    if id_upload.ext == "pdf":
+        id_card_bytes = await rasterize_pdf(id_card_bytes, id_upload.sha256)
+
+    (id_image, id_mime), (webcam_image, webcam_mime) = await asyncio.gather(
+        prepare_image(id_card_bytes),
+        prepare_image(webcam_upload.data)
+    )
+    return {
+        "id_card_image_base64": base64.b64encode(id_image).decode('utf-8'),
+        "webcam_image_base64": base64.b64encode(webcam_image).decode('utf-8'),
+        "id_card_mime": id_mime,
+        "webcam_mime": webcam_mime,
+        "id_card_hash": id_upload.sha256,
+        "webcam_hash": webcam_upload.sha256
+    }
+
 @app.post("/verify_identity")
 async def verify_identity(
-    id_card: UploadFile = File(...),
-    webcam_image: UploadFile = File(...)
+    webcam_image: UploadFile = File(...),
+    id_card: Optional[UploadFile] = File(None),
+    user_id: Optional[str] = Form(None)
 ):
+    deadline = time.time() + IDENTITY_DEADLINE_SECONDS
     try:
-        # Read Images
-        id_card_bytes = await id_card.read()
-        webcam_bytes = await webcam_image.read()
-        
-        # Handle PDF ID Card (Convert 1st page to Image)
-        if id_card.filename.lower().endswith('.pdf'):
-            import fitz # PyMuPDF
-            doc = fitz.open(stream=id_card_bytes, filetype="pdf")
-            if len(doc) > 0:
-                page = doc.load_page(0)
-                pix = page.get_pixmap()
-                id_card_bytes = pix.tobytes("png")
-        
-        id_card_b64 = base64.b64encode(id_card_bytes).decode('utf-8')
-        webcam_b64 = base64.b64encode(webcam_bytes).decode('utf-8')
+        # Read Images (type sniffed from content: a stored PDF may arrive as "stored_id.jpg")
+        # With user_id instead of id_card, the registered card (and its stored hash) is reused
+        webcam_upload = await read_upload(webcam_image, IMAGE_TYPES, MAX_IMAGE_BYTES)
+        if id_card is not None:
+            id_upload = await read_upload(id_card, ID_CARD_TYPES, MAX_ID_CARD_BYTES)
+        elif user_id:
+            id_upload = await load_registered_id_card(user_id)
+        else:
+            return {"error": "Provide either id_card or user_id"}
         
         # Invoke Vision Agent
-        result = await identity_graph.ainvoke({
-            "id_card_image_base64": id_card_b64,
-            "webcam_image_base64": webcam_b64
-        })
+        inputs = await identity_inputs(id_upload, webcam_upload)
+        result = await identity_graph.ainvoke({**inputs, "deadline": deadline})
         
         return result
+    except LLMError:
+        raise  # mapped to 502/503 by llm_error_handler
     except Exception as e:
         return {"error": str(e)}
 
@@ -102,54 +270,9 @@ from fastapi.responses import FileResponse
 import sqlite3
 import uuid
 
-# Setup Local DB
-DB_FILE = "hackathon.db"
-UPLOAD_DIR = "uploads"
+# Setup Local DB (pooled WAL connections, see storage.py; schema in migrations.py)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def init_db():
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id TEXT PRIMARY KEY,
-                email TEXT UNIQUE,
-                password TEXT,
-                full_name TEXT,
-                id_card_path TEXT,
-                face_ref_path TEXT
-            )
-        """)
-        # Migration: Add face_ref_path if missing
-        try:
-            conn.execute("ALTER TABLE users ADD COLUMN face_ref_path TEXT")
-        except sqlite3.OperationalError:
-            pass # Column likely exists
-
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS exams (
-                id TEXT PRIMARY KEY,
-                title TEXT,
-                description TEXT,
-                duration_minutes INTEGER,
-                category TEXT,
-                difficulty TEXT,
-                image_url TEXT
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS questions (
-                id TEXT PRIMARY KEY,
-                exam_id TEXT,
-                question_text TEXT,
-                question_type TEXT,
-                options TEXT, -- JSON string
-                correct_answer TEXT,
-                FOREIGN KEY(exam_id) REFERENCES exams(id)
-            )
-        """)
-    print("Database initialized.")
-init_db()
-
 class AuthRequest(BaseModel):
     email: str
     password: str
@@ -159,11 +282,10 @@ class AuthRequest(BaseModel):
 async def signup(req: AuthRequest):
     try:
         user_id = str(uuid.uuid4())
-        with sqlite3.connect(DB_FILE) as conn:
-            conn.execute(
-                "INSERT INTO users (id, email, password, full_name) VALUES (?, ?, ?, ?)",
-                (user_id, req.email, req.password, req.full_name)
-            )
+        await db.execute(
+            "INSERT INTO users (id, email, password, full_name) VALUES (?, ?, ?, ?)",
+            (user_id, req.email, req.password, req.full_name)
+        )
         return {"id": user_id, "email": req.email, "full_name": req.full_name}
     except sqlite3.IntegrityError:
         return {"error": "Email already exists"}
@@ -172,12 +294,10 @@ async def signup(req: AuthRequest):
 
 @app.post("/auth/login")
 async def login(req: AuthRequest):
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.execute(
-            "SELECT id, email, full_name, id_card_path FROM users WHERE email = ? AND password = ?",
-            (req.email, req.password)
-        )
-        user = cursor.fetchone()
+    user = await db.fetchone(
+        "SELECT id, email, full_name, id_card_path FROM users WHERE email = ? AND password = ?",
+        (req.email, req.password)
+    )
     
     if user:
         return {"id": user[0], "email": user[1], "full_name": user[2], "id_card_path": user[3]}
@@ -186,25 +306,15 @@ async def login(req: AuthRequest):
 @app.post("/upload_id_card")
 async def upload_id_card(user_id: str = Form(...), file: UploadFile = File(...)):
     try:
-        file_ext = file.filename.split('.')[-1]
-        filename = f"{user_id}_id.{file_ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        with sqlite3.connect(DB_FILE) as conn:
-            conn.execute("UPDATE users SET id_card_path = ? WHERE id = ?", (filepath, user_id))
-            
-        return {"status": "success", "path": filepath}
+        stored = await save_upload(file, f"{user_id}_id", ID_CARD_TYPES, MAX_ID_CARD_BYTES)
+        await db.execute("UPDATE users SET id_card_path = ?, id_card_sha256 = ? WHERE id = ?", (stored.path, stored.sha256, user_id))
+        return {"status": "success", "path": stored.path}
     except Exception as e:
         return {"error": str(e)}
 
 @app.get("/get_id_card/{user_id}")
 async def get_id_card(user_id: str):
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.execute("SELECT id_card_path FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
+    row = await db.fetchone("SELECT id_card_path FROM users WHERE id = ?", (user_id,))
     
     if row and row[0] and os.path.exists(row[0]):
         return FileResponse(row[0])
@@ -217,59 +327,21 @@ async def register_identity(
     face_ref: UploadFile = File(...)
 ):
     try:
-        # 1. Save ID Card
-        id_ext = id_card.filename.split('.')[-1]
-        id_filename = f"{user_id}_id.{id_ext}"
-        id_path = os.path.join(UPLOAD_DIR, id_filename)
-        
-        with open(id_path, "wb") as buffer:
-            shutil.copyfileobj(id_card.file, buffer)
-            
-        # 2. Save Face Reference
-        face_ext = face_ref.filename.split('.')[-1]
-        face_filename = f"{user_id}_face.{face_ext}"
-        face_path = os.path.join(UPLOAD_DIR, face_filename)
-        
-        with open(face_path, "wb") as buffer:
-            shutil.copyfileobj(face_ref.file, buffer)
-            
-        # 3. Update DB
-        with sqlite3.connect(DB_FILE) as conn:
-            # Check if column exists (migration hack for sqlite)
-            try:
-                conn.execute("ALTER TABLE users ADD COLUMN face_ref_path TEXT")
-            except sqlite3.OperationalError:
-                pass # Already exists
-                
-            conn.execute(
-                "UPDATE users SET id_card_path = ?, face_ref_path = ? WHERE id = ?", 
-                (id_path, face_path, user_id)
-            )
-            
-        # 4. Verify Immediate Match (Optional but good for UX)
-        # Read files for AI
-        with open(id_path, "rb") as f:
-            id_bytes = f.read()
-            
-        # If PDF, convert first page
-        if id_path.lower().endswith('.pdf'):
-            import fitz
-            doc = fitz.open(id_path)
-            pix = doc.load_page(0).get_pixmap()
-            id_bytes = pix.tobytes("png")
+        # 1. Stream ID Card + Face Reference to disk (hashed and validated while writing)
+        id_upload, face_upload = await asyncio.gather(
+            save_upload(id_card, f"{user_id}_id", ID_CARD_TYPES, MAX_ID_CARD_BYTES),
+            save_upload(face_ref, f"{user_id}_face", IMAGE_TYPES, MAX_IMAGE_BYTES)
+        )
             
-        with open(face_path, "rb") as f:
-            face_bytes = f.read()
+        # 2. Update DB
+        await db.execute(
+            "UPDATE users SET id_card_path = ?, id_card_sha256 = ?, face_ref_path = ?, face_ref_sha256 = ? WHERE id = ?", 
+            (id_upload.path, id_upload.sha256, face_upload.path, face_upload.sha256, user_id)
+        )
             
-        id_b64 = base64.b64encode(id_bytes).decode('utf-8')
-        face_b64 = base64.b64encode(face_bytes).decode('utf-8')
-        
-        # Call Identity Agent
-        from identity_agent import identity_graph
-        verification = await identity_graph.ainvoke({
-            "id_card_image_base64": id_b64,
-            "webcam_image_base64": face_b64
-        })
+        # 3. Verify Immediate Match (Optional but good for UX)
+        # The pipeline already holds the bytes, so nothing is read back from disk
+        verification = await identity_graph.ainvoke(await identity_inputs(id_upload, face_upload))
         
         if not verification.get("is_match", False):
             # Strict mode: fail registration? Or just warn?
@@ -279,108 +351,23 @@ async def register_identity(
         return {
             "status": "success", 
             "verification": verification,
-            "paths": {"id": id_path, "face": face_path}
+            "paths": {"id": id_upload.path, "face": face_upload.path}
         }
         
     except Exception as e:
         print(f"Register Identity Error: {e}")
         return {"error": str(e)}
 
-@app.post("/upload_id_card")
-async def upload_id_card(user_id: str = Form(...), file: UploadFile = File(...)):
-    try:
-        file_ext = file.filename.split('.')[-1]
-        filename = f"{user_id}_id.{file_ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        with sqlite3.connect(DB_FILE) as conn:
-            conn.execute("UPDATE users SET id_card_path = ? WHERE id = ?", (filepath, user_id))
-            
-        return {"status": "success", "path": filepath}
-    except Exception as e:
-        return {"error": str(e)}
-
-@app.get("/get_id_card/{user_id}")
-async def get_id_card(user_id: str):
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.execute("SELECT id_card_path FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-    
-    if row and row[0] and os.path.exists(row[0]):
-        return FileResponse(row[0])
-    return {"error": "ID card not found"}
-
-@app.post("/register_identity")
-async def register_identity(
-    user_id: str = Form(...), 
-    id_card: UploadFile = File(...),
-    face_ref: UploadFile = File(...)
-):
-    try:
-        # 1. Save ID Card
-        id_ext = id_card.filename.split('.')[-1]
-        id_filename = f"{user_id}_id.{id_ext}"
-        id_path = os.path.join(UPLOAD_DIR, id_filename)
-        with open(id_path, "wb") as buffer:
-            shutil.copyfileobj(id_card.file, buffer)
-
-        # 2. Save Face Reference
-        face_ext = face_ref.filename.split('.')[-1]
-        face_filename = f"{user_id}_face.{face_ext}"
-        face_path = os.path.join(UPLOAD_DIR, face_filename)
-        with open(face_path, "wb") as buffer:
-            shutil.copyfileobj(face_ref.file, buffer)
-            
-        # 3. Update DB
-        with sqlite3.connect(DB_FILE) as conn:
-            # Check if column exists (migration hack for sqlite)
-            try:
-                conn.execute("ALTER TABLE users ADD COLUMN face_ref_path TEXT")
-            except sqlite3.OperationalError:
-                pass # Already exists
-                
-            conn.execute(
-                "UPDATE users SET id_card_path = ?, face_ref_path = ? WHERE id = ?", 
-                (id_path, face_path, user_id)
-            )
-
-        # 4. Verify Immediate Match (Optional but good for UX)
-        # Read files for AI
-        with open(id_path, "rb") as f:
-            id_bytes = f.read()
-            
-        # If PDF, convert first page
-        if id_path.lower().endswith('.pdf'):
-            import fitz
-            doc = fitz.open(id_path)
-            pix = doc.load_page(0).get_pixmap()
-            id_bytes = pix.tobytes("png")
-            
-        with open(face_path, "rb") as f:
-            face_bytes = f.read()
-            
-        id_b64 = base64.b64encode(id_bytes).decode('utf-8')
-        face_b64 = base64.b64encode(face_bytes).decode('utf-8')
-        
-        # Call Identity Agent
-        from identity_agent import identity_graph
-        verification = await identity_graph.ainvoke({
-            "id_card_image_base64": id_b64,
-            "webcam_image_base64": face_b64
-        })
-
-        return {
-            "status": "success", 
-            "verification": verification,
-            "paths": {"id": id_path, "face": face_path}
-        }
-    except Exception as e:
-        return {"error": str(e)}
-
 # --- EXAM & SEEDING ENDPOINTS ---
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from seeding import generate_mock_exams, bulk_load, SEED_BATCH_SIZE
+from catalog import (
+    get_catalog_version, catalog_etag, etag_matches, decode_cursor, parse_fields, fetch_exam_page, ExamDetailCache
+)
+
+EXAM_CACHE_MAX_ITEMS = int(os.environ.get("EXAM_CACHE_MAX_ITEMS", "1024"))
+exam_cache = ExamDetailCache(db, max_items=EXAM_CACHE_MAX_ITEMS)
 
 class Exam(BaseModel):
     id: str
@@ -399,289 +386,331 @@ class Question(BaseModel):
     options: List[str]
     correct_answer: str
 
-def generate_mock_exams():
-    categories = ["Development", "Design", "Data Science", "Cybersecurity", "Management"]
-    difficulties = ["Beginner", "Intermediate", "Advanced"]
-    
-    exams_data = []
-    
-    # 1. Frontend React Mastery
-    exams_data.append({
-        "title": "Frontend React Mastery",
-        "description": "Test your knowledge of React hooks, components, and state management.",
-        "duration": 45,
-        "category": "Development",
-        "difficulty": "Intermediate",
-        "questions": [
-            {"q": "What is the primary purpose of useEffect?", "opts": ["Side effects", "State management", "Routing", "Styling"], "ans": "Side effects"},
-            {"q": "How do you pass data to child components?", "opts": ["Props", "State", "Context", "Redux"], "ans": "Props"},
-            {"q": "Which hook is used for memoization?", "opts": ["useMemo", "useState", "useEffect", "useReducer"], "ans": "useMemo"},
-            {"q": "What is the virtual DOM?", "opts": ["A copy of the real DOM", "A browser API", "A database", "A style sheet"], "ans": "A copy of the real DOM"},
-            {"q": "Which method is used to update state?", "opts": ["setState", "updateState", "changeState", "modifyState"], "ans": "setState (or updater function)"}
-        ]
-    })
-
-    # 2. Python Data Structures
-    exams_data.append({
-        "title": "Python Data Structures",
-        "description": "Challenge yourself with Python lists, dictionaries, sets, and tuples.",
-        "duration": 30,
-        "category": "Development",
-        "difficulty": "Beginner",
-        "questions": [
-            {"q": "Which data structure is immutable?", "opts": ["Tuple", "List", "Dictionary", "Set"], "ans": "Tuple"},
-            {"q": "How do you define a dictionary?", "opts": ["{}", "[]", "()", "<>"], "ans": "{}"},
-            {"q": "What is the time complexity of looking up an item in a set?", "opts": ["O(1)", "O(n)", "O(log n)", "O(n^2)"], "ans": "O(1)"},
-            {"q": "Which method removes the last item from a list?", "opts": ["pop()", "remove()", "delete()", "clear()"], "ans": "pop()"},
-            {"q": "Can lists contain different data types?", "opts": ["Yes", "No", "Only if specified", "Only strings"], "ans": "Yes"}
-        ]
-    })
-    
-    # 3. UI/UX Principles
-    exams_data.append({
-        "title": "UI/UX Design Principles",
-        "description": "Evaluate your understanding of usability, accessibility, and visual hierarchy.",
-        "duration": 60,
-        "category": "Design",
-        "difficulty": "Intermediate",
-        "questions": [
-            {"q": "What does 'affordance' mean in design?", "opts": ["Clues on how to use an object", "The cost of the product", "The color scheme", "The font size"], "ans": "Clues on how to use an object"},
-            {"q": "Which color is best for error messages?", "opts": ["Red", "Green", "Blue", "Yellow"], "ans": "Red"},
-            {"q": "What is the 3-click rule?", "opts": ["Users should find info in 3 clicks", "Mouse durability test", "Triple click action", "3 button mouse"], "ans": "Users should find info in 3 clicks"},
-            {"q": "What is 'whitespace'?", "opts": ["Empty space between elements", "The color white", "Background image", "Header area"], "ans": "Empty space between elements"},
-            {"q": "What does WCAG stand for?", "opts": ["Web Content Accessibility Guidelines", "Web Color And Graphics", "World Creative Art Group", "Wide Content Access Gateway"], "ans": "Web Content Accessibility Guidelines"}
-        ]
-    })
-
-    # 4. Cybersecurity Basics
-    exams_data.append({
-        "title": "Cybersecurity Fundamentals",
-        "description": "Test your awareness of common threats, encryption, and network security.",
-        "duration": 40,
-        "category": "Cybersecurity",
-        "difficulty": "Beginner",
-        "questions": [
-            {"q": "What does Phishing involve?", "opts": ["Deceptive emails", "Fishing for compliments", "Network scanning", "Password cracking"], "ans": "Deceptive emails"},
-            {"q": "What is 2FA?", "opts": ["Two-Factor Authentication", "Two-Face Algorithm", "To For All", "Token Free Access"], "ans": "Two-Factor Authentication"},
-            {"q": "Which protocol is secure?", "opts": ["HTTPS", "HTTP", "FTP", "Telnet"], "ans": "HTTPS"},
-            {"q": "What is a firewall?", "opts": ["Network security device", "A physical wall", "Antivirus software", "A virus"], "ans": "Network security device"},
-            {"q": "What is SQL Injection?", "opts": ["Malicious SQL code execution", "Installing SQL", "Updating database", "Deleting tables safely"], "ans": "Malicious SQL code execution"}
-        ]
-    })
-    
-    # 5. Project Management 101
-    exams_data.append({
-        "title": "Agile Project Management",
-        "description": "Assess your knowledge of Agile methodologies, Scrum, and Kanban.",
-        "duration": 50,
-        "category": "Management",
-        "difficulty": "Advanced",
-        "questions": [
-            {"q": "What is a Sprint?", "opts": ["A set period for work", "Running fast", "A meeting", "Thinking time"], "ans": "A set period for work"},
-            {"q": "Who is responsible for the Product Backlog?", "opts": ["Product Owner", "Scrum Master", "Team", "Stakeholder"], "ans": "Product Owner"},
-            {"q": "What is a Daily Standup?", "opts": ["Brief status meeting", "Exercise routine", "Code review", "Lunch break"], "ans": "Brief status meeting"},
-            {"q": "What does MVP stand for?", "opts": ["Minimum Viable Product", "Most Valuable Player", "Maximum Value Plan", "Mini Video Project"], "ans": "Minimum Viable Product"},
-            {"q": "What is Kanban focused on?", "opts": ["Visualizing work", "Strict roles", "Sprints only", "Documentation"], "ans": "Visualizing work"}
-        ]
-    })
-
-    # Generate more random variations to hit 'tonnes' of exams (simulated)
-    # We will replicate these base templates with slight variations
-    final_exams = []
-    for i in range(10): # Create 50 exams total
-        for base in exams_data:
-            new_exam = base.copy()
-            new_exam["id"] = str(uuid.uuid4())
-            new_exam["title"] = f"{base['title']} - Variant {i+1}"
-            
-            # Add random questions variation
-            questions = []
-            for q in base["questions"]:
-                questions.append({
-                    "id": str(uuid.uuid4()),
-                    "text": q["q"],
-                    "options": q["opts"],
-                    "correct": q["ans"],
-                    "type": "multiple_choice"
-                })
-            
-            new_exam["questions_data"] = questions
-            final_exams.append(new_exam)
-            
-    return final_exams
-
 @app.post("/debug/seed_exams")
-async def seed_exams():
+async def seed_exams(exams: int = 50, questions_per_exam: int = 5, rebuild_indexes: bool = False):
     try:
-        exams = generate_mock_exams()
-        count = 0
-        with sqlite3.connect(DB_FILE) as conn:
-            # Optional: Clear existing?
-            # conn.execute("DELETE FROM exams")
-            # conn.execute("DELETE FROM questions")
-            
-            for ex in exams:
-                conn.execute(
-                    "INSERT INTO exams (id, title, description, duration_minutes, category, difficulty) VALUES (?, ?, ?, ?, ?, ?)",
-                    (ex["id"], ex["title"], ex["description"], ex["duration"], ex["category"], ex["difficulty"])
-                )
-                
-                for q in ex["questions_data"]:
-                    conn.execute(
-                        "INSERT INTO questions (id, exam_id, question_text, question_type, options, correct_answer) VALUES (?, ?, ?, ?, ?, ?)",
-                        (q["id"], ex["id"], q["text"], q["type"], json.dumps(q["options"]), q["correct"])
-                    )
-                count += 1
-                
-        return {"status": "success", "message": f"Seeded {count} exams with questions."}
+        # Streamed generator + executemany in a single transaction (see seeding.py)
+        exam_count, question_count = await db.run(
+            bulk_load,
+            generate_mock_exams(exams, questions_per_exam),
+            SEED_BATCH_SIZE,
+            rebuild_indexes
+        )
+        exam_cache.invalidate()
+        return {"status": "success", "message": f"Seeded {exam_count} exams with {question_count} questions."}
     except Exception as e:
         return {"error": str(e)}
 
+EXAMS_PAGE_SIZE = int(os.environ.get("EXAMS_PAGE_SIZE", "50"))
+EXAMS_MAX_PAGE_SIZE = int(os.environ.get("EXAMS_MAX_PAGE_SIZE", "500"))
+
 @app.get("/exams")
-async def list_exams(category: str = None):
-    with sqlite3.connect(DB_FILE) as conn:
-        query = "SELECT id, title, description, duration_minutes, category, difficulty, image_url FROM exams"
-        params = []
-        if category:
-            query += " WHERE category = ?"
-            params.append(category)
-            
-        cursor = conn.execute(query, tuple(params))
-        exams = []
-        for row in cursor.fetchall():
-            exams.append({
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "duration_minutes": row[3],
-                "category": row[4],
-                "difficulty": row[5],
-                "image_url": row[6]
-            })
-    return exams
+async def list_exams(request: Request, category: str = None, limit: int = None, cursor: str = None, fields: str = None):
+    # Keyset-paginated catalog: the next page's cursor is returned in X-Next-Cursor.
+    # Without limit/cursor the whole (filtered) catalog is returned, as before
+    # pagination existed. Responses carry an ETag derived from the catalog
+    # version and the normalized query, so unchanged catalogs are answered
+    # with 304 without touching the exams table.
+    try:
+        selected = parse_fields(fields)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if limit is not None or cursor:
+        limit = max(1, min(limit or EXAMS_PAGE_SIZE, EXAMS_MAX_PAGE_SIZE))
+    variant = json.dumps([category or None, selected, list(after) if after else None, limit])
+    if_none_match = request.headers.get("if-none-match")
+
+    def _load(conn):
+        etag = catalog_etag(get_catalog_version(conn), variant)
+        if etag_matches(if_none_match, etag):
+            return etag, None, None
+        items, next_cursor = fetch_exam_page(conn, selected, limit, category=category, after=after)
+        return etag, items, next_cursor
+
+    etag, exams, next_cursor = await db.run(_load)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if exams is None:
+        return Response(status_code=304, headers=headers)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return JSONResponse(exams, headers=headers)
 
 @app.get("/exams/{exam_id}")
 async def get_exam_details(exam_id: str):
-    with sqlite3.connect(DB_FILE) as conn:
-        # Get Exam Info
-        cursor = conn.execute("SELECT id, title, description, duration_minutes, category, difficulty FROM exams WHERE id = ?", (exam_id,))
-        exam_row = cursor.fetchone()
-        
-        if not exam_row:
-            return {"error": "Exam not found"}
-            
-        exam = {
-            "id": exam_row[0],
-            "title": exam_row[1],
-            "description": exam_row[2],
-            "duration_minutes": exam_row[3],
-            "category": exam_row[4],
-            "difficulty": exam_row[5],
-            "questions": []
-        }
-        
-        # Get Questions
-        q_cursor = conn.execute("SELECT id, question_text, question_type, options, correct_answer FROM questions WHERE exam_id = ?", (exam_id,))
-        for q_row in q_cursor.fetchall():
-            exam["questions"].append({
-                "id": q_row[0],
-                "question_text": q_row[1],
-                "question_type": q_row[2],
-                "options": json.loads(q_row[3]),
-                # In a real app, maybe don't send correct_answer to frontend right away?
-                # But for this demo/grading flow, we might need it or hide it.
-                # Sending it facilitates client-side check or easier demo.
-                # "correct_answer": q_row[4] 
-            })
-            
-    return exam
+    # Served from pre-serialized bytes; see ExamDetailCache in catalog.py
+    body = await exam_cache.get(exam_id)
+    if body is None:
+        return {"error": "Exam not found"}
+    return Response(content=body, media_type="application/json")
 
 
 # --- END LOCAL AUTH ---
 
-from fastapi import BackgroundTasks
+# --- PROCTORING LOG INGESTION ---
+@app.post("/attempts/{attempt_id}/logs", status_code=202)
+async def ingest_proctoring_logs(attempt_id: str, request: LogBatchRequest):
+    rows = [
+        (
+            attempt_id,
+            normalize_violation_type(alert.type),
+            alert.message,
+            alert.confidence,
+            alert.snapshot_url,
+            alert_epoch_seconds(alert.timestamp)
+        )
+        for alert in request.alerts
+    ]
+    if not log_queue.offer(rows):
+        # Backpressure: the client keeps the batch and retries
+        return JSONResponse({"error": "Log queue is full, retry later"}, status_code=503, headers={"Retry-After": "1"})
+    return {"status": "accepted", "count": len(rows)}
+
+@app.get("/logs/stats")
+def proctoring_log_stats():
+    return log_queue.stats()
+
+@app.post("/attempts/{attempt_id}/integrity")
+async def analyze_attempt_integrity(attempt_id: str):
+    # Analyzes the stored proctoring logs; only rows newer than the last call are read
+    await log_queue.flush()
+    return await rolling_integrity.analyze_logs(attempt_id)
+
+@app.get("/attempts/{attempt_id}/integrity_reports")
+async def list_integrity_reports(attempt_id: str):
+    rows = await db.fetchall(
+        "SELECT id, risk_level, verdict, explanation, model_used, created_at FROM integrity_reports WHERE attempt_id = ? ORDER BY created_at, rowid",
+        (attempt_id,)
+    )
+    return [
+        {"id": r[0], "risk_level": r[1], "verdict": r[2], "explanation": r[3], "model_used": r[4], "created_at": r[5]}
+        for r in rows
+    ]
+
+@app.get("/integrity/stats")
+def integrity_stats():
+    return rolling_integrity.stats()
+
+# --- Whisper Transcription ---
+async def transcribe_audio(filename: str, audio_bytes: bytes, deadline: Optional[float] = None, audio_seconds: Optional[float] = None) -> str:
+    return await llm_gateway.transcribe(
+        WHISPER_MODEL, filename, audio_bytes, timeout=WHISPER_TIMEOUT_SECONDS, deadline=deadline, audio_seconds=audio_seconds
+    )
+
+async def analyze_audio_bytes(filename: str, audio_bytes: bytes, question: str, attempt_id: Optional[str] = None, deadline: Optional[float] = None) -> dict:
+    # Voice activity detection: silent chunks never reach Whisper, the rest
+    # are trimmed to their speech segments (None = VAD unavailable)
+    vad = await detect_speech(audio_bytes)
+    if vad is not None and not vad.has_speech:
+        return {
+            "status": "success",
+            "analysis": {"is_violation": False, "reason": "No speech detected in this audio chunk.", "decided_by": "vad"},
+            "transcript": "",
+            "speech_seconds": vad.speech_seconds
+        }
+    if vad is not None:
+        filename, audio_bytes = "speech.wav", vad.wav
 
-# --- Helper for Background Processing ---
-async def process_audio_background(temp_filename: str, question: str):
-    try:
-        # Transcribe with Groq Whisper
-        with open(temp_filename, "rb") as file_obj:
-            transcription = client.audio.transcriptions.create(
-                file=(temp_filename, file_obj.read()),
-                model="distil-whisper-large-v3-en",
-                response_format="json",
-                language="en",
-                temperature=0.0
-            )
-        transcript_text = transcription.text
-        
-        # Analyze Transcript with Llama 3
-        analysis = await audio_graph.ainvoke({
-            "transcript": transcript_text,
-            "current_question": question
-        })
-        
-        # Log Violation to DB (Simulated or Real)
-        if analysis["is_violation"]:
-            print(f"AUDIO VIOLATION DETECTED: {analysis['reason']}")
-            # In a real app, strict insert into 'proctoring_logs' here
-            # with sqlite3.connect(DB_FILE) as conn: ...
-            
-    except Exception as e:
-        print(f"Background Audio Error: {e}")
-    finally:
-        # Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+    # Transcribe with Groq Whisper (async, bounded concurrency + timeout)
+    transcript_text = await transcribe_audio(filename, audio_bytes, deadline, vad.speech_seconds if vad is not None else None)
+
+    # Analyze Transcript with Llama 3 (whatever is left of the deadline)
+    analysis = await audio_graph.ainvoke({
+        "transcript": transcript_text,
+        "current_question": question,
+        "deadline": deadline
+    })
+
+    if analysis["is_violation"]:
+        print(f"AUDIO VIOLATION DETECTED: {analysis['reason']}")
+        if attempt_id:
+            log_queue.offer([(attempt_id, "voice_detected", analysis["reason"], None, None, alert_epoch_seconds(None))])
+
+    return {
+        "status": "success",
+        "analysis": analysis,
+        "transcript": transcript_text,
+        "speech_seconds": vad.speech_seconds if vad is not None else None
+    }
 
 @app.post("/analyze_audio_file")
 async def analyze_audio_file(
     question: str = Form(...),
     file: UploadFile = File(...)
 ):
-    temp_filename = ""
     try:
-        # Save Temp File
-        temp_filename = f"temp_{uuid.uuid4()}_{file.filename}"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process Immediately (Blocking) to give feedback
-        # Transcribe with Groq Whisper
-        with open(temp_filename, "rb") as file_obj:
-            transcription = client.audio.transcriptions.create(
-                file=(temp_filename, file_obj.read()),
-                model="distil-whisper-large-v3-en",
-                response_format="json",
-                language="en",
-                temperature=0.0
-            )
-        transcript_text = transcription.text
-        
-        # Analyze Transcript with Llama 3
-        analysis = await audio_graph.ainvoke({
-            "transcript": transcript_text,
-            "current_question": question
-        })
-        
-        return {
-            "status": "success", 
-            "analysis": analysis,
-            "transcript": transcript_text
-        }
+        # Read the chunk straight from the upload (no temp file round trip)
+        audio_bytes = await file.read()
+        deadline = time.time() + AUDIO_DEADLINE_SECONDS
+        return await analyze_audio_bytes(file.filename or "recording.webm", audio_bytes, question, deadline=deadline)
 
+    except LLMError:
+        raise  # mapped to 502/503 by llm_error_handler
     except Exception as e:
         print(f"Audio Analysis Error: {e}")
         return {"error": str(e)}
+
+# --- BACKGROUND JOBS ---
+# Gateway errors carry retryable/retry_after, so rate limits and transient
+# upstream failures are retried with backoff and bad replies fail the job.
+async def run_grade_job(payload: dict, data: Optional[bytes]) -> dict:
+    result = await grade_answer_graph.ainvoke(payload)
+    return {k: result.get(k) for k in ("score", "feedback", "confidence_score", "cached")}
+
+async def run_audio_job(payload: dict, data: Optional[bytes]) -> dict:
+    return await analyze_audio_bytes(payload["filename"], data, payload["question"], payload.get("attempt_id"))
+
+async def run_integrity_job(payload: dict, data: Optional[bytes]) -> dict:
+    await log_queue.flush()
+    result = await rolling_integrity.analyze_logs(payload["attempt_id"])
+    if result["risk_level"] not in REPORT_RISK_LEVELS:
+        raise JobFailed(result["explanation"], retryable=True)
+    return result
+
+job_queue.register("grade", run_grade_job)
+job_queue.register("audio", run_audio_job)
+job_queue.register("integrity", run_integrity_job)
+
+@app.post("/jobs/grade", status_code=202)
+async def enqueue_grade(request: GradingRequest, idempotency_key: Optional[str] = Header(None)):
+    job, _ = await job_queue.enqueue("grade", request.dict(), idempotency_key=idempotency_key)
+    return job
+
+@app.post("/jobs/audio", status_code=202)
+async def enqueue_audio(
+    question: str = Form(...),
+    attempt_id: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None)
+):
+    # Audio travels in the job row itself: no temp files to clean up
+    audio_bytes = await file.read()
+    payload = {"question": question, "attempt_id": attempt_id, "filename": file.filename or "recording.webm"}
+    job, _ = await job_queue.enqueue("audio", payload, data=audio_bytes, idempotency_key=idempotency_key)
+    return job
+
+@app.post("/jobs/integrity/{attempt_id}", status_code=202)
+async def enqueue_integrity(attempt_id: str, idempotency_key: Optional[str] = Header(None)):
+    job, _ = await job_queue.enqueue("integrity", {"attempt_id": attempt_id}, idempotency_key=idempotency_key)
+    return job
+
+@app.get("/jobs/stats")
+async def job_stats():
+    return {**job_queue.stats(), "by_status": await job_queue.counts()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return job
+
+# --- Streaming audio (replaces 15 s multipart chunks) ---
+# The client streams 16 kHz mono s16le PCM as binary messages and may send
+# {"question": "..."} text messages; verdicts come back as JSON per utterance.
+@app.websocket("/ws/audio/{attempt_id}")
+async def stream_audio(websocket: WebSocket, attempt_id: str, question: str = "General Exam Environment"):
+    await websocket.accept()
+    if not NUMPY_AVAILABLE:
+        await websocket.close(code=1011, reason="Streaming audio requires numpy")
+        return
+    from audio_stream import AudioStreamSession
+
+    started_at = time.time()
+    context = {"question": question}
+
+    async def dispatch(wav: bytes, start: float, end: float):
+        deadline = time.time() + AUDIO_DEADLINE_SECONDS
+        transcript_text = await transcribe_audio("utterance.wav", wav, deadline, end - start)
+        analysis = await audio_graph.ainvoke({
+            "transcript": transcript_text,
+            "current_question": context["question"],
+            "deadline": deadline
+        })
+        if analysis["is_violation"]:
+            print(f"AUDIO VIOLATION DETECTED: {analysis['reason']}")
+            log_queue.offer([(attempt_id, "voice_detected", analysis["reason"], None, None, started_at + start)])
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json({
+                "type": "verdict",
+                "start": start,
+                "end": end,
+                "transcript": transcript_text,
+                "analysis": analysis
+            })
+
+    session = AudioStreamSession(dispatch)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+            elif message.get("text"):
+                # Control frames are {"question": "..."}; anything else is ignored
+                try:
+                    control = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    control = None
+                if not isinstance(control, dict):
+                    print(f"Audio stream {attempt_id}: ignoring malformed control frame")
+                    continue
+                if isinstance(control.get("question"), str) and control["question"]:
+                    context["question"] = control["question"]
+    except WebSocketDisconnect as e:
+        print(f"Audio stream {attempt_id} closed: {e!r}")
     finally:
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+        # Trailing speech is still transcribed (and logged) after the client leaves
+        await session.close()
+        print(f"Audio stream {attempt_id} stats: {session.stats()}")
+
+@app.get("/llm/stats")
+def llm_stats():
+    # Per-model admission (queueing for quota) plus gateway retries and breaker states
+    return {"rate_limits": rate_limit_stats(), "gateway": llm_gateway.gateway_stats()}
+
+@app.get("/audio/stats")
+def audio_stats():
+    return vad_stats
+
+# --- Metrics (Prometheus text format) ---
+# Counters/histograms are fed by the middleware, the agent graphs, the LLM
+# gateway and the SQLite pool; the stats below are read at scrape time.
+def _with_hit_rate(stats: dict) -> dict:
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0}
+
+metrics.register_stats("grade_cache", grade_cache.stats)
+metrics.register_stats("exam_cache", exam_cache.stats)
+metrics.register_stats("identity_cache", lambda: _with_hit_rate(identity_cache_stats))
+metrics.register_stats("pdf_render_cache", lambda: _with_hit_rate(render_stats))
+metrics.register_stats("log_queue", log_queue.stats)
+metrics.register_stats("vad", lambda: vad_stats)
+metrics.register_stats("jobs", job_queue.stats)
+metrics.register_stats("rolling_integrity", rolling_integrity.stats)
+metrics.register_stats("llm_gateway", llm_gateway.gateway_stats)
+metrics.register_stats("llm_quota", rate_limit_stats, label="model")
+metrics.register_stats("llm_breaker", lambda: {
+    model: {"open": breaker["state"] != "closed", "consecutive_failures": breaker["consecutive_failures"], "rejected": breaker["rejected"]}
+    for model, breaker in llm_gateway.gateway_stats()["breakers"].items()
+}, label="model")
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/startup/stats")
+def startup_stats():
+    # Import/lifespan phase timings and which agents this worker has loaded so far
+    return {**startup.startup_stats(), "agents": agent_stats()}
 
 @app.post("/analyze_audio_text")
 async def analyze_audio_text(request: AudioRequest):
     result = await audio_graph.ainvoke({
         "transcript": request.transcript,
-        "current_question": request.current_question
+        "current_question": request.current_question,
+        "deadline": time.time() + AUDIO_DEADLINE_SECONDS
     })
     return result
 
@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# In-process metrics served on GET /metrics in the Prometheus text format.
+# - Counter / Gauge / Histogram keyed by label values, safe to update from the
+#   event loop and from the SQLite / CPU thread pools
+# - Stats collectors: the existing *_stats() dicts (caches, queues, VAD, jobs,
+#   gateway, quotas) are turned into gauges at scrape time, so they need no
+#   extra bookkeeping on the hot path
+# Values are per worker process. With several workers (serve.py) a scrape
+# reaches one of them, so every sample carries worker="<pid>" to keep each
+# process's counters a separate, monotonic series.
+
+METRICS_PREFIX = os.environ.get("METRICS_PREFIX", "aegis")
+
+# Seconds; covers cache hits (ms) through slow model calls (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Seconds; SQLite work is mostly sub-millisecond
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+WORKER = str(os.getpid())
+
+_registry: List["Metric"] = []
+_collectors: List[Tuple[str, Callable[[], dict], Optional[str]]] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.append(f'worker="{WORKER}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        # Counts the block as in flight while it runs
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]  # per-bucket counts, sum, count
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+def register_stats(name: str, fn: Callable[[], dict], label: Optional[str] = None):
+    # Exposes fn()'s numeric values as <prefix>_<name>_<key> gauges at scrape time.
+    # With label, fn returns {label_value: {key: value}} (e.g. per model).
+    _collectors.append((name, fn, label))
+
+
+def _render_stats(name: str, fn: Callable[[], dict], label: Optional[str]) -> List[str]:
+    try:
+        stats = fn()
+    except Exception as e:
+        print(f"Metrics collector {name} failed: {e}")
+        return []
+    rows = stats.items() if label else [(None, stats)]
+    series: Dict[str, List[str]] = {}
+    for label_value, values in rows:
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue  # nested or textual stats are left to the JSON endpoints
+            names, label_values = ((label,), (str(label_value),)) if label else ((), ())
+            series.setdefault(key, []).append(f"{METRICS_PREFIX}_{name}_{key}{_labels(names, label_values)} {_number(value)}")
+    lines = []
+    for key, samples in series.items():
+        lines.append(f"# TYPE {METRICS_PREFIX}_{name}_{key} gauge")
+        lines.extend(samples)
+    return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for name, fn, label in _collectors:
+        lines.extend(_render_stats(name, fn, label))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,244 @@
+import sqlite3
+from typing import Callable, List, Tuple, Union
+from storage import Database
+
+# Versioned schema migrations for the local SQLite database.
+# The applied version lives in PRAGMA user_version; each migration runs exactly
+# once, in order, inside a BEGIN IMMEDIATE transaction so concurrent workers
+# starting at the same time cannot apply the same step twice.
+# A step is either a SQL string or a callable taking the connection.
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _add_identity_hashes(conn: sqlite3.Connection):
+    for column in ("id_card_sha256", "face_ref_sha256"):
+        if not _column_exists(conn, "users", column):
+            conn.execute(f"ALTER TABLE users ADD COLUMN {column} TEXT")
+
+
+def _add_face_ref_path(conn: sqlite3.Connection):
+    # Databases created before face references existed lack this column
+    if not _column_exists(conn, "users", "face_ref_path"):
+        conn.execute("ALTER TABLE users ADD COLUMN face_ref_path TEXT")
+
+
+# Indexes on the exam catalog, by name (the seeder drops/rebuilds these around bulk loads).
+# Each is created by a migration below; add new ones here and in a new migration.
+CATALOG_INDEXES = {
+    "idx_questions_exam_id": "CREATE INDEX IF NOT EXISTS idx_questions_exam_id ON questions(exam_id)",
+    "idx_exams_category": "CREATE INDEX IF NOT EXISTS idx_exams_category ON exams(category, id)",
+    # Unfiltered /exams pages walk (COALESCE(category, ''), id) so NULL categories sort and compare
+    "idx_exams_category_key": "CREATE INDEX IF NOT EXISTS idx_exams_category_key ON exams(COALESCE(category, ''), id)",
+}
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            email TEXT UNIQUE,
+            password TEXT,
+            full_name TEXT,
+            id_card_path TEXT,
+            face_ref_path TEXT
+        )
+        """,
+        _add_face_ref_path,
+        """
+        CREATE TABLE IF NOT EXISTS exams (
+            id TEXT PRIMARY KEY,
+            title TEXT,
+            description TEXT,
+            duration_minutes INTEGER,
+            category TEXT,
+            difficulty TEXT,
+            image_url TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS questions (
+            id TEXT PRIMARY KEY,
+            exam_id TEXT,
+            question_text TEXT,
+            question_type TEXT,
+            options TEXT, -- JSON string
+            correct_answer TEXT,
+            FOREIGN KEY(exam_id) REFERENCES exams(id)
+        )
+        """,
+    ]),
+    # SQLite counterparts of the attempt/log tables in data/schema.sql
+    (2, "attempt, answer and integrity tables", [
+        """
+        CREATE TABLE IF NOT EXISTS attempts (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            exam_id TEXT NOT NULL,
+            start_time TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            end_time TEXT,
+            total_score REAL,
+            status TEXT NOT NULL DEFAULT 'in_progress'
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS answers (
+            id TEXT PRIMARY KEY,
+            attempt_id TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            student_answer TEXT,
+            ai_score REAL,
+            ai_feedback TEXT,
+            is_verified INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS proctoring_logs (
+            id INTEGER PRIMARY KEY,
+            attempt_id TEXT NOT NULL,
+            violation_type TEXT NOT NULL,
+            confidence_score REAL,
+            snapshot_url TEXT,
+            timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS integrity_reports (
+            id TEXT PRIMARY KEY,
+            attempt_id TEXT NOT NULL,
+            risk_level TEXT NOT NULL,
+            verdict TEXT NOT NULL,
+            explanation TEXT NOT NULL,
+            model_used TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (3, "indexes for hot lookups", [
+        # Spelled out rather than taken from CATALOG_INDEXES: an applied
+        # migration never changes, new catalog indexes get their own
+        "CREATE INDEX IF NOT EXISTS idx_questions_exam_id ON questions(exam_id)",
+        "CREATE INDEX IF NOT EXISTS idx_exams_category ON exams(category, id)",
+        "CREATE INDEX IF NOT EXISTS idx_attempts_user_id ON attempts(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_attempts_exam_id ON attempts(exam_id)",
+        "CREATE INDEX IF NOT EXISTS idx_answers_attempt_id ON answers(attempt_id)",
+        "CREATE INDEX IF NOT EXISTS idx_proctoring_logs_attempt ON proctoring_logs(attempt_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_integrity_reports_attempt ON integrity_reports(attempt_id, created_at)",
+    ]),
+    # Bumped whenever the exam catalog changes; drives /exams ETags and exam caches
+    (4, "catalog version counter", [
+        "CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 1)",
+    ]),
+    # Identity verdict cache + stored content hashes of registered identity files
+    (5, "identity verdict cache", [
+        _add_identity_hashes,
+        """
+        CREATE TABLE IF NOT EXISTS identity_verdicts (
+            id_card_sha256 TEXT NOT NULL,
+            webcam_sha256 TEXT NOT NULL,
+            variant TEXT NOT NULL,
+            verdict TEXT NOT NULL, -- JSON
+            created_at REAL NOT NULL,
+            PRIMARY KEY (id_card_sha256, webcam_sha256, variant)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # Alert text and client-side event time for ingested proctoring logs
+    (6, "proctoring log details", [
+        "ALTER TABLE proctoring_logs ADD COLUMN message TEXT",
+        "ALTER TABLE proctoring_logs ADD COLUMN occurred_at REAL",
+    ]),
+    # Rolling integrity analysis: aggregated alert features per attempt and source
+    (7, "integrity state", [
+        """
+        CREATE TABLE IF NOT EXISTS integrity_state (
+            attempt_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            high_water INTEGER NOT NULL,
+            accumulator TEXT NOT NULL, -- JSON
+            band INTEGER,
+            result TEXT, -- JSON, last verdict
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (attempt_id, source)
+        ) WITHOUT ROWID
+        """,
+    ]),
+    # Durable background jobs (see jobs.py)
+    (8, "job queue", [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL, -- JSON
+            data BLOB, -- binary input (e.g. audio), cleared once the job is final
+            idempotency_key TEXT UNIQUE,
+            status TEXT NOT NULL, -- queued | running | succeeded | failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            run_after REAL NOT NULL,
+            locked_by TEXT,
+            locked_until REAL,
+            result TEXT, -- JSON
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after)",
+    ]),
+    (9, "catalog pagination key index", [
+        CATALOG_INDEXES["idx_exams_category_key"],
+    ]),
+    # Identity verdict expiry / size cap (see identity_cache.py)
+    (10, "identity verdict age index", [
+        "CREATE INDEX IF NOT EXISTS idx_identity_verdicts_created_at ON identity_verdicts(created_at)",
+    ]),
+    # Incremental integrity analysis reads an attempt's logs past a high-water id
+    # (see integrity_state.py)
+    (11, "proctoring log high-water index", [
+        "CREATE INDEX IF NOT EXISTS idx_proctoring_logs_attempt_id ON proctoring_logs(attempt_id, id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(database: Database) -> int:
+    applied = 0
+    with database.connection() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return 0
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another worker may have just migrated
+            version = current_version(conn)
+            for target, name, steps in MIGRATIONS:
+                if target <= version:
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(f"PRAGMA user_version = {target}")
+                print(f"Applied migration {target}: {name}")
+                applied += 1
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        # Refresh planner statistics for the new indexes
+        conn.execute("PRAGMA optimize")
+    return applied
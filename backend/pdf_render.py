@@ -0,0 +1,124 @@
+import os
+import math
+import time
+import uuid
+import asyncio
+import hashlib
+from typing import Optional
+from cpu_pool import run_cpu
+
+# PDF ID cards are rasterized (first page -> PNG) in the CPU process pool, at a
+# configurable DPI with a hard pixel cap. Renders are cached on disk by the
+# PDF's content hash, so verifying the same card again skips rendering.
+# The cache is bounded: renders unused for RENDER_CACHE_TTL_SECONDS are removed
+# and, past RENDER_CACHE_MAX_BYTES, the least recently used go first (a hit
+# refreshes the file's mtime). Pruned at worker start and every PRUNE_EVERY writes.
+
+PDF_RENDER_DPI = int(os.environ.get("PDF_RENDER_DPI", "150"))
+PDF_RENDER_MAX_PIXELS = int(os.environ.get("PDF_RENDER_MAX_PIXELS", str(4_000_000)))
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", os.path.join(os.environ.get("UPLOAD_DIR", "uploads"), "renders"))
+RENDER_CACHE_TTL_SECONDS = int(os.environ.get("RENDER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PRUNE_EVERY = 64
+PART_FILE_GRACE_SECONDS = 3600  # a .part older than this was left by a crashed write
+
+render_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_writes_since_prune = 0
+
+
+def render_first_page(pdf_bytes: bytes, dpi: int, max_pixels: int) -> bytes:
+    # Runs inside a pool worker
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        if len(doc) == 0:
+            raise ValueError("PDF has no pages")
+        page = doc.load_page(0)
+        zoom = dpi / 72  # PDF user space is 72 units per inch
+        pixels = page.rect.width * zoom * page.rect.height * zoom
+        if pixels > max_pixels:
+            zoom *= math.sqrt(max_pixels / pixels)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return pix.tobytes("png")
+    finally:
+        doc.close()
+
+
+def _read_cached(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)  # recency for LRU eviction
+    except OSError:
+        pass  # evicted by another worker meanwhile; the bytes are still good
+    return data
+
+
+def _write_cached(path: str, data: bytes):
+    # Temp file + rename: concurrent workers never read a partial PNG
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def prune_render_cache(cache_dir: str = None) -> int:
+    # Safe to run from several workers at once: files already gone are skipped
+    cache_dir = cache_dir or RENDER_CACHE_DIR
+    now = time.time()
+    entries = []
+    try:
+        names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path, name.endswith(".part")))
+
+    removed = 0
+    total = sum(size for _, size, _, _ in entries)
+    for mtime, size, path, partial in sorted(entries):  # oldest first
+        age = now - mtime
+        expired = age > (PART_FILE_GRACE_SECONDS if partial else RENDER_CACHE_TTL_SECONDS)
+        if not expired and (partial or total <= RENDER_CACHE_MAX_BYTES):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+    render_stats["evictions"] += removed
+    return removed
+
+
+async def rasterize_pdf(pdf_bytes: bytes, content_hash: Optional[str] = None) -> bytes:
+    digest = content_hash or hashlib.sha256(pdf_bytes).hexdigest()
+    cache_path = os.path.join(RENDER_CACHE_DIR, f"{digest}_{PDF_RENDER_DPI}_{PDF_RENDER_MAX_PIXELS}.png")
+
+    cached = await asyncio.to_thread(_read_cached, cache_path)
+    if cached is not None:
+        render_stats["hits"] += 1
+        return cached
+
+    render_stats["misses"] += 1
+    png = await run_cpu(render_first_page, pdf_bytes, PDF_RENDER_DPI, PDF_RENDER_MAX_PIXELS)
+    global _writes_since_prune
+    try:
+        await asyncio.to_thread(_write_cached, cache_path, png)
+        _writes_since_prune += 1
+        if _writes_since_prune >= PRUNE_EVERY:
+            _writes_since_prune = 0
+            await asyncio.to_thread(prune_render_cache)
+    except OSError as e:
+        print(f"Render cache update failed: {e}")
+    return png
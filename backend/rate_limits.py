@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+# Per-model admission control for Groq calls.
+# Every model gets its own concurrency semaphore plus requests-per-minute and
+# tokens-per-minute token buckets sized to our Groq quota. Calls over quota
+# wait in FIFO order for capacity instead of being sent and failing with 429.
+# Limits are per process: the account quota is split evenly between the
+# WEB_CONCURRENCY server workers (set by serve.py).
+
+# model -> {"concurrency", "rpm", "tpm"}; tpm None = not limited by tokens
+DEFAULT_MODEL_LIMITS = {
+    "llama-3.3-70b-versatile": {"concurrency": 8, "rpm": 30, "tpm": 12000},
+    "llama-3.1-8b-instant": {"concurrency": 8, "rpm": 30, "tpm": 6000},
+    "meta-llama/llama-4-maverick-17b-128e-instruct": {"concurrency": 4, "rpm": 30, "tpm": 6000},
+    "distil-whisper-large-v3-en": {"concurrency": int(os.environ.get("WHISPER_MAX_CONCURRENCY", "8")), "rpm": 20, "tpm": None},
+}
+FALLBACK_LIMITS = {"concurrency": 4, "rpm": 30, "tpm": 6000}
+
+# Worker processes sharing the quota
+WEB_CONCURRENCY = max(1, int(os.environ.get("WEB_CONCURRENCY") or "1"))
+
+# JSON overrides, e.g. MODEL_RATE_LIMITS='{"llama-3.1-8b-instant": {"rpm": 14400, "tpm": 500000}}'
+MODEL_RATE_LIMITS = json.loads(os.environ.get("MODEL_RATE_LIMITS", "{}") or "{}")
+
+# Rough prompt size in tokens (~4 characters per token for English text)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts: str, completion: int = 256) -> int:
+    return sum(len(t or "") for t in texts) // CHARS_PER_TOKEN + completion
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()  # waiters are served in arrival order
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        # Returns the seconds spent waiting
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= amount
+        return waited
+
+
+class ModelLimiter:
+    def __init__(self, model: str, concurrency: int, rpm: float, tpm: Optional[float]):
+        self.model = model
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+        self.calls = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        started = time.monotonic()
+        async with self.semaphore:
+            await self.requests.acquire()
+            if self.tokens is not None and tokens:
+                await self.tokens.acquire(tokens)
+            waited = time.monotonic() - started
+            self.calls += 1
+            self.queued += int(waited > 0.01)
+            self.wait_seconds += waited
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "in_flight": self.in_flight,
+        }
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+
+
+def limiter_for(model: str) -> ModelLimiter:
+    limiter = _limiters.get(model)
+    if limiter is None:
+        limits = {**FALLBACK_LIMITS, **DEFAULT_MODEL_LIMITS.get(model, {}), **MODEL_RATE_LIMITS.get(model, {})}
+        share = WEB_CONCURRENCY
+        limiter = _limiters[model] = ModelLimiter(
+            model,
+            max(1, -(-limits["concurrency"] // share)),  # ceil: every worker can send at least one
+            limits["rpm"] / share,
+            limits["tpm"] / share if limits["tpm"] else None,
+        )
+    return limiter
+
+
+def rate_limit_stats() -> dict:
+    return {model: limiter.stats() for model, limiter in _limiters.items()}
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+from migrations import CATALOG_INDEXES
+from catalog import bump_catalog_version
+
+# Synthetic exam catalog generation + bulk loading.
+# The generator streams one exam (with its questions) at a time, so catalogs of
+# 100k exams / millions of questions never have to fit in memory, and the loader
+# writes them with executemany inside a single transaction.
+
+SEED_BATCH_SIZE = 1000  # exams per executemany round
+
+EXAM_TEMPLATES = []
+
+# 1. Frontend React Mastery
+EXAM_TEMPLATES.append({
+    "title": "Frontend React Mastery",
+    "description": "Test your knowledge of React hooks, components, and state management.",
+    "duration": 45,
+    "category": "Development",
+    "difficulty": "Intermediate",
+    "questions": [
+        {"q": "What is the primary purpose of useEffect?", "opts": ["Side effects", "State management", "Routing", "Styling"], "ans": "Side effects"},
+        {"q": "How do you pass data to child components?", "opts": ["Props", "State", "Context", "Redux"], "ans": "Props"},
+        {"q": "Which hook is used for memoization?", "opts": ["useMemo", "useState", "useEffect", "useReducer"], "ans": "useMemo"},
+        {"q": "What is the virtual DOM?", "opts": ["A copy of the real DOM", "A browser API", "A database", "A style sheet"], "ans": "A copy of the real DOM"},
+        {"q": "Which method is used to update state?", "opts": ["setState", "updateState", "changeState", "modifyState"], "ans": "setState (or updater function)"}
+    ]
+})
+
+# 2. Python Data Structures
+EXAM_TEMPLATES.append({
+    "title": "Python Data Structures",
+    "description": "Challenge yourself with Python lists, dictionaries, sets, and tuples.",
+    "duration": 30,
+    "category": "Development",
+    "difficulty": "Beginner",
+    "questions": [
+        {"q": "Which data structure is immutable?", "opts": ["Tuple", "List", "Dictionary", "Set"], "ans": "Tuple"},
+        {"q": "How do you define a dictionary?", "opts": ["{}", "[]", "()", "<>"], "ans": "{}"},
+        {"q": "What is the time complexity of looking up an item in a set?", "opts": ["O(1)", "O(n)", "O(log n)", "O(n^2)"], "ans": "O(1)"},
+        {"q": "Which method removes the last item from a list?", "opts": ["pop()", "remove()", "delete()", "clear()"], "ans": "pop()"},
+        {"q": "Can lists contain different data types?", "opts": ["Yes", "No", "Only if specified", "Only strings"], "ans": "Yes"}
+    ]
+})
+
+# 3. UI/UX Principles
+EXAM_TEMPLATES.append({
+    "title": "UI/UX Design Principles",
+    "description": "Evaluate your understanding of usability, accessibility, and visual hierarchy.",
+    "duration": 60,
+    "category": "Design",
+    "difficulty": "Intermediate",
+    "questions": [
+        {"q": "What does 'affordance' mean in design?", "opts": ["Clues on how to use an object", "The cost of the product", "The color scheme", "The font size"], "ans": "Clues on how to use an object"},
+        {"q": "Which color is best for error messages?", "opts": ["Red", "Green", "Blue", "Yellow"], "ans": "Red"},
+        {"q": "What is the 3-click rule?", "opts": ["Users should find info in 3 clicks", "Mouse durability test", "Triple click action", "3 button mouse"], "ans": "Users should find info in 3 clicks"},
+        {"q": "What is 'whitespace'?", "opts": ["Empty space between elements", "The color white", "Background image", "Header area"], "ans": "Empty space between elements"},
+        {"q": "What does WCAG stand for?", "opts": ["Web Content Accessibility Guidelines", "Web Color And Graphics", "World Creative Art Group", "Wide Content Access Gateway"], "ans": "Web Content Accessibility Guidelines"}
+    ]
+})
+
+# 4. Cybersecurity Basics
+EXAM_TEMPLATES.append({
+    "title": "Cybersecurity Fundamentals",
+    "description": "Test your awareness of common threats, encryption, and network security.",
+    "duration": 40,
+    "category": "Cybersecurity",
+    "difficulty": "Beginner",
+    "questions": [
+        {"q": "What does Phishing involve?", "opts": ["Deceptive emails", "Fishing for compliments", "Network scanning", "Password cracking"], "ans": "Deceptive emails"},
+        {"q": "What is 2FA?", "opts": ["Two-Factor Authentication", "Two-Face Algorithm", "To For All", "Token Free Access"], "ans": "Two-Factor Authentication"},
+        {"q": "Which protocol is secure?", "opts": ["HTTPS", "HTTP", "FTP", "Telnet"], "ans": "HTTPS"},
+        {"q": "What is a firewall?", "opts": ["Network security device", "A physical wall", "Antivirus software", "A virus"], "ans": "Network security device"},
+        {"q": "What is SQL Injection?", "opts": ["Malicious SQL code execution", "Installing SQL", "Updating database", "Deleting tables safely"], "ans": "Malicious SQL code execution"}
+    ]
+})
+
+# 5. Project Management 101
+EXAM_TEMPLATES.append({
+    "title": "Agile Project Management",
+    "description": "Assess your knowledge of Agile methodologies, Scrum, and Kanban.",
+    "duration": 50,
+    "category": "Management",
+    "difficulty": "Advanced",
+    "questions": [
+        {"q": "What is a Sprint?", "opts": ["A set period for work", "Running fast", "A meeting", "Thinking time"], "ans": "A set period for work"},
+        {"q": "Who is responsible for the Product Backlog?", "opts": ["Product Owner", "Scrum Master", "Team", "Stakeholder"], "ans": "Product Owner"},
+        {"q": "What is a Daily Standup?", "opts": ["Brief status meeting", "Exercise routine", "Code review", "Lunch break"], "ans": "Brief status meeting"},
+        {"q": "What does MVP stand for?", "opts": ["Minimum Viable Product", "Most Valuable Player", "Maximum Value Plan", "Mini Video Project"], "ans": "Minimum Viable Product"},
+        {"q": "What is Kanban focused on?", "opts": ["Visualizing work", "Strict roles", "Sprints only", "Documentation"], "ans": "Visualizing work"}
+    ]
+})
+
+
+def generate_mock_exams(num_exams: int = 50, questions_per_exam: int = 5) -> Iterator[dict]:
+    # Cycle through the templates; question lists wrap around when more
+    # questions are requested than a template has
+    for i in range(num_exams):
+        base = EXAM_TEMPLATES[i % len(EXAM_TEMPLATES)]
+        variant = i // len(EXAM_TEMPLATES) + 1
+
+        questions = []
+        for k in range(questions_per_exam):
+            q = base["questions"][k % len(base["questions"])]
+            questions.append({
+                "id": str(uuid.uuid4()),
+                "text": q["q"] if k < len(base["questions"]) else f"{q['q']} (#{k + 1})",
+                "options": q["opts"],
+                "correct": q["ans"],
+                "type": "multiple_choice"
+            })
+
+        yield {
+            "id": str(uuid.uuid4()),
+            "title": f"{base['title']} - Variant {variant}",
+            "description": base["description"],
+            "duration": base["duration"],
+            "category": base["category"],
+            "difficulty": base["difficulty"],
+            "questions_data": questions
+        }
+
+
+def bulk_load(conn: sqlite3.Connection, exams: Iterable[dict], batch_size: int = SEED_BATCH_SIZE, rebuild_indexes: bool = False) -> Tuple[int, int]:
+    # Everything (including the optional index drop/rebuild) is one transaction:
+    # a failed load leaves the catalog exactly as it was.
+    exam_count, question_count = 0, 0
+    options_json = {}  # template option lists repeat a lot; encode each distinct one once
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if rebuild_indexes:
+            # Maintaining b-trees row by row is slower than one sort at the end
+            for name in CATALOG_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+        exams = iter(exams)
+        while True:
+            batch = list(islice(exams, batch_size))
+            if not batch:
+                break
+
+            question_rows = []
+            for ex in batch:
+                for q in ex["questions_data"]:
+                    key = tuple(q["options"])
+                    if key not in options_json:
+                        options_json[key] = json.dumps(q["options"])
+                    question_rows.append((q["id"], ex["id"], q["text"], q["type"], options_json[key], q["correct"]))
+
+            conn.executemany(
+                "INSERT INTO exams (id, title, description, duration_minutes, category, difficulty) VALUES (?, ?, ?, ?, ?, ?)",
+                [(ex["id"], ex["title"], ex["description"], ex["duration"], ex["category"], ex["difficulty"]) for ex in batch]
+            )
+            conn.executemany(
+                "INSERT INTO questions (id, exam_id, question_text, question_type, options, correct_answer) VALUES (?, ?, ?, ?, ?, ?)",
+                question_rows
+            )
+            exam_count += len(batch)
+            question_count += len(question_rows)
+
+        if rebuild_indexes:
+            for sql in CATALOG_INDEXES.values():
+                conn.execute(sql)
+        bump_catalog_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return exam_count, question_count
+
+
+# Benchmark / bulk seeding CLI:
+#   python seeding.py --db bench.db --exams 100000 --questions-per-exam 20 --rebuild-indexes
+if __name__ == "__main__":
+    from storage import Database
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Seed a synthetic exam catalog")
+    parser.add_argument("--db", default=os.environ.get("DB_FILE", "hackathon.db"))
+    parser.add_argument("--exams", type=int, default=50)
+    parser.add_argument("--questions-per-exam", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    parser.add_argument("--rebuild-indexes", action="store_true")
+    args = parser.parse_args()
+
+    database = Database(args.db, pool_size=1)
+    run_migrations(database)
+
+    started = time.perf_counter()
+    with database.connection() as conn:
+        exam_count, question_count = bulk_load(
+            conn,
+            generate_mock_exams(args.exams, args.questions_per_exam),
+            batch_size=args.batch_size,
+            rebuild_indexes=args.rebuild_indexes
+        )
+    elapsed = time.perf_counter() - started
+    database.close()
+
+    rows = exam_count + question_count
+    print(f"Seeded {exam_count} exams / {question_count} questions in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
@@ -0,0 +1,83 @@
+import os
+import inspect
+import importlib.util
+from dotenv import load_dotenv
+
+# Production launcher: WEB_CONCURRENCY uvicorn worker processes share one
+# listening socket, so CPU-bound handlers (PDF rendering, base64, JSON) use
+# every core instead of one.
+#   python serve.py             from backend/ (the Docker image)
+#   python run.py --prod        from the repo root
+# The supervisor applies migrations and creates the upload directory once, then
+# starts the workers. Each worker still opens its own SQLite pool (WAL + busy
+# timeout; jobs are claimed under BEGIN IMMEDIATE) and uploads/renders are
+# written to temp files and renamed into place, so workers never see each
+# other's partial writes.
+# Workers exit after ~SERVER_MAX_REQUESTS requests (with jitter, so they do not
+# all recycle at once) and the supervisor replaces them; on SIGTERM in-flight
+# requests get SERVER_GRACEFUL_TIMEOUT_SECONDS to finish.
+
+load_dotenv()
+
+SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", "8000"))
+SERVER_MAX_REQUESTS = int(os.environ.get("SERVER_MAX_REQUESTS", "10000"))  # 0 = never recycle
+SERVER_MAX_REQUESTS_JITTER = int(os.environ.get("SERVER_MAX_REQUESTS_JITTER", "1000"))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+SERVER_KEEPALIVE_SECONDS = int(os.environ.get("SERVER_KEEPALIVE_SECONDS", "5"))
+SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", "2048"))
+
+
+def worker_count() -> int:
+    return max(1, int(os.environ.get("WEB_CONCURRENCY") or os.cpu_count() or 1))
+
+
+def prepare(workers: int):
+    from storage import db
+    from migrations import run_migrations
+    from uploads import UPLOAD_DIR
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    run_migrations(db)
+    db.close()  # the supervisor serves nothing; workers open their own pools
+
+    # Inherited by the workers: rate_limits.py splits the Groq quota by
+    # WEB_CONCURRENCY, and one CPU-pool process per worker keeps N workers from
+    # spawning N * min(4, cores) renderers on an N-core box.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.environ.setdefault("CPU_POOL_WORKERS", "1")
+
+
+def serve(app: str = "main:app", app_dir: str = None):
+    import uvicorn
+
+    workers = worker_count()
+    prepare(workers)
+
+    options = {
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": workers,
+        # "auto" picks uvloop / httptools when installed (uvicorn[standard])
+        "loop": "auto",
+        "http": "auto",
+        "backlog": SERVER_BACKLOG,
+        "timeout_keep_alive": SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "limit_max_requests": SERVER_MAX_REQUESTS or None,
+        "proxy_headers": True,
+        "access_log": False,
+    }
+    if app_dir:
+        options["app_dir"] = app_dir
+    # Older uvicorn releases have no jitter option; recycling then happens without it
+    if SERVER_MAX_REQUESTS and "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+        options["limit_max_requests_jitter"] = SERVER_MAX_REQUESTS_JITTER
+
+    fast_paths = [name for name in ("uvloop", "httptools") if importlib.util.find_spec(name)]
+    print(f"Starting {workers} worker(s) on {SERVER_HOST}:{SERVER_PORT} (fast paths: {', '.join(fast_paths) or 'none'})")
+    uvicorn.run(app, **options)
+
+
+if __name__ == "__main__":
+    serve()
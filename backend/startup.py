@@ -0,0 +1,39 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+# Cold-start accounting: main.py wraps its import groups and the lifespan hook
+# wraps its setup steps in phase(...), and the breakdown is printed once the
+# worker is ready (and served on /startup/stats). test_startup.py asserts the
+# import of main stays under STARTUP_BUDGET_SECONDS.
+
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "1.5"))
+
+_started = time.perf_counter()
+phases: Dict[str, float] = {}
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = round(phases.get(name, 0.0) + time.perf_counter() - started, 4)
+
+
+def elapsed() -> float:
+    return time.perf_counter() - _started
+
+
+def report() -> str:
+    lines = [f"  {name:<28}{seconds * 1000:8.1f} ms" for name, seconds in phases.items()]
+    total = elapsed()
+    status = "within" if total <= STARTUP_BUDGET_SECONDS else "OVER"
+    lines.append(f"  {'ready after':<28}{total * 1000:8.1f} ms ({status} {STARTUP_BUDGET_SECONDS:g}s budget)")
+    return "Startup breakdown:\n" + "\n".join(lines)
+
+
+def startup_stats() -> dict:
+    return {"phases_seconds": dict(phases), "budget_seconds": STARTUP_BUDGET_SECONDS}
@@ -0,0 +1,148 @@
+import os
+import time
+import queue
+import sqlite3
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+from metrics import Histogram, DB_BUCKETS
+
+# Shared SQLite access layer.
+# - A small pool of long-lived connections (no connect() per request)
+# - WAL journaling so readers never block on the writer
+# - Per-connection statement cache (sqlite3 keeps compiled statements keyed by SQL text)
+# - Async helpers run every query on a dedicated thread pool, off the event loop
+# - Time spent waiting for a pooled connection and holding it is exported on /metrics
+
+DB_FILE = os.environ.get("DB_FILE", "hackathon.db")
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", str(64 * 1024)))
+DB_STATEMENT_CACHE = int(os.environ.get("DB_STATEMENT_CACHE", "256"))
+
+db_wait_seconds = Histogram(
+    "sqlite_connection_wait_seconds", "Time waiting for a pooled SQLite connection", ["database"], DB_BUCKETS
+)
+db_query_seconds = Histogram(
+    "sqlite_query_seconds", "Time a pooled SQLite connection is held (queries and transactions)", ["database"], DB_BUCKETS
+)
+
+
+class Database:
+    def __init__(self, path: str, pool_size: int = DB_POOL_SIZE):
+        self.path = path
+        self.name = os.path.basename(path)  # metrics label
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue()  # LIFO keeps the hottest connection (and its page cache) in use
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # durable at checkpoint, safe with WAL
+        conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")  # negative = KiB
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        started = time.perf_counter()
+        conn = self._acquire()
+        acquired = time.perf_counter()
+        db_wait_seconds.observe(acquired - started, database=self.name)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+            db_query_seconds.observe(time.perf_counter() - acquired, database=self.name)
+
+    @contextmanager
+    def transaction(self):
+        # Commits on success, rolls back on error
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    # --- Async API (runs on the DB thread pool) ---
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # One thread per pooled connection, so executor threads never wait on the pool
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite")
+        return self._executor
+
+    def _run_sync(self, fn: Callable, *args) -> Any:
+        with self.connection() as conn:
+            return fn(conn, *args)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        # fn(conn, *args) runs on a pooled connection in the DB thread pool
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(self._run_sync, fn, *args))
+
+    async def fetchone(self, sql: str, params: Sequence = ()) -> Optional[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params: Sequence = ()) -> int:
+        def _execute(conn):
+            with conn:
+                return conn.execute(sql, params).rowcount
+        return await self.run(_execute)
+
+    async def executemany(self, sql: str, rows: Iterable[Sequence]) -> int:
+        def _executemany(conn):
+            with conn:
+                return conn.executemany(sql, rows).rowcount
+        return await self.run(_executemany)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+db = Database(DB_FILE)
@@ -0,0 +1,39 @@
+import os
+import sys
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from audio_rules import PhraseMatcher, precheck_transcript
+
+QUESTION = "What is the capital of France? Explain the role of Paris in European history."
+
+
+def test_phrase_matcher():
+    print("\n[TEST] Multi-pattern matching on word boundaries...")
+    matcher = PhraseMatcher(["he", "she", "hers", "hey google"])
+    assert matcher.find("ushers") == []
+    assert matcher.find("she said hey google") == ["she", "hey google"]
+    print("✅ Matcher OK")
+
+
+def test_precheck():
+    print("\n[TEST] Trivial transcripts are decided locally...")
+    assert precheck_transcript("", QUESTION)["is_violation"] is False
+    assert precheck_transcript("Hey Google, what is the capital of France?", QUESTION)["is_violation"] is True
+    assert precheck_transcript("Alexa!", QUESTION)["is_violation"] is True
+    assert precheck_transcript("Hmm... let me think", QUESTION)["is_violation"] is False
+    # Reading the question aloud, with a misheard word
+    assert precheck_transcript("what is the capital of frence", QUESTION)["is_violation"] is False
+    # A phrase that is part of the question is not a violation
+    assert precheck_transcript("what is the answer", "What is the answer to 6 x 7?")["is_violation"] is False
+
+    # Ambiguous: left to the model
+    assert precheck_transcript("Paris was important because of trade", QUESTION) is None
+    assert precheck_transcript("can you tell me which one", QUESTION) is None
+    print("✅ Precheck OK")
+
+
+if __name__ == "__main__":
+    test_phrase_matcher()
+    test_precheck()
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+import audio_stream
+from audio_stream import AudioStreamSession, PcmRingBuffer
+
+SR = 16000
+
+
+def _speech_pcm(seconds: float, speaking) -> bytes:
+    t = np.arange(int(seconds * SR)) / SR
+    voice = sum(np.sin(2 * np.pi * k * 150 * t) * np.exp(-((k * 150 - 700) / 300) ** 2) for k in range(1, 25))
+    signal = 0.1 * voice * np.clip(np.sin(2 * np.pi * 4 * t), 0.3, None) * speaking(t)
+    signal += np.random.default_rng(0).normal(0, 1e-3, len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def test_ring_buffer():
+    print("\n[TEST] Ring buffer keeps the most recent samples by absolute index...")
+    ring = PcmRingBuffer(10)
+    ring.write(np.arange(7, dtype=np.float32))
+    ring.write(np.arange(7, 14, dtype=np.float32))
+    assert ring.oldest == 4 and ring.read(0, 20).tolist() == list(range(4, 14))
+    ring.write(np.arange(14, 40, dtype=np.float32))
+    assert ring.total == 40 and ring.read(35, 38).tolist() == [35, 36, 37]
+    print("✅ Ring buffer OK")
+
+
+def test_utterance_cutting():
+    print("\n[TEST] A continuous stream is cut into utterances on speech boundaries...")
+    pcm = _speech_pcm(30, lambda t: ((t >= 3) & (t < 6)) | ((t >= 15) & (t < 17)))
+
+    utterances = []
+
+    async def dispatch(wav, start, end):
+        utterances.append((start, end))
+
+    async def scenario():
+        session = AudioStreamSession(dispatch)
+        for i in range(0, len(pcm), 4001):  # odd sizes split samples across messages
+            session.feed(pcm[i:i + 4001])
+            await asyncio.sleep(0)
+        await session.close()
+
+    asyncio.run(scenario())
+    assert len(utterances) == 2
+    (s1, e1), (s2, e2) = utterances
+    assert 2.5 <= s1 <= 3.0 and 6.0 <= e1 <= 6.5
+    assert 14.5 <= s2 <= 15.0 and 17.0 <= e2 <= 17.5
+    print("✅ Utterances OK")
+
+
+def test_backlog_when_transcription_lags():
+    print("\n[TEST] Utterances wait for a transcription slot; only overflow is dropped...")
+    # Nine 1 s utterances, each followed by 1.5 s of silence
+    pcm = _speech_pcm(24, lambda t: (t >= 2) & (t % 2.5 < 1.0))
+    release = asyncio.Event()
+    utterances = []
+
+    async def slow_dispatch(wav, start, end):
+        await release.wait()
+        utterances.append(start)
+
+    async def scenario():
+        session = AudioStreamSession(slow_dispatch)
+        for i in range(0, len(pcm), 3200):
+            session.feed(pcm[i:i + 3200])
+            await asyncio.sleep(0)
+        assert len(session._tasks) == 2 and len(session._backlog) == 3
+        release.set()
+        await session.close()
+        return session.stats()
+
+    inflight, backlog = audio_stream.STREAM_MAX_INFLIGHT, audio_stream.STREAM_MAX_BACKLOG
+    audio_stream.STREAM_MAX_INFLIGHT, audio_stream.STREAM_MAX_BACKLOG = 2, 3
+    try:
+        stats = asyncio.run(scenario())
+    finally:
+        audio_stream.STREAM_MAX_INFLIGHT, audio_stream.STREAM_MAX_BACKLOG = inflight, backlog
+    print(f"   Stats: {stats}")
+    assert stats["utterances"] == 5 and stats["backlogged"] == 3 and stats["dropped"] == 4
+    assert len(utterances) == 5
+    print("✅ Backlog OK")
+
+
+if __name__ == "__main__":
+    test_ring_buffer()
+    test_utterance_cutting()
+    test_backlog_when_transcription_lags()
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import json
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+from migrations import run_migrations
+from seeding import generate_mock_exams, bulk_load
+from catalog import (
+    fetch_exam_page, parse_fields, decode_cursor, encode_cursor,
+    get_catalog_version, catalog_etag, etag_matches, ExamDetailCache
+)
+
+
+def test_keyset_pages_cover_catalog_once():
+    print("\n[TEST] Walking cursors returns every exam exactly once...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=1)
+        run_migrations(db)
+        with db.connection() as conn:
+            bulk_load(conn, generate_mock_exams(73, 1))
+            for category in (None, "Design"):
+                seen, after = [], None
+                while True:
+                    items, cursor = fetch_exam_page(conn, parse_fields("title"), 10, category=category, after=after)
+                    assert all(set(item) == {"id", "title"} for item in items)
+                    seen.extend(item["id"] for item in items)
+                    if not cursor:
+                        break
+                    after = decode_cursor(cursor)
+                where, params = ("WHERE category = ?", (category,)) if category else ("", ())
+                expected = conn.execute(f"SELECT COUNT(*) FROM exams {where}", params).fetchone()[0]
+                assert len(seen) == len(set(seen)) == expected
+        db.close()
+
+
+def test_null_categories_are_paged():
+    print("\n[TEST] Exams without a category are not dropped by the cursor...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=1)
+        run_migrations(db)
+        with db.connection() as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO exams (id, title, category) VALUES (?, ?, ?)",
+                    [(f"e{i:02d}", f"Exam {i}", None if i % 2 else "Design") for i in range(10)]
+                )
+            seen, after, pages = [], None, 0
+            while True:
+                items, cursor = fetch_exam_page(conn, parse_fields("title,category"), 3, after=after)
+                seen.extend(item["id"] for item in items)
+                pages += 1
+                if not cursor:
+                    break
+                after = decode_cursor(cursor)
+            assert pages == 4
+            assert sorted(seen) == [f"e{i:02d}" for i in range(10)] and len(set(seen)) == 10
+            # No limit: the whole catalog, no cursor
+            items, cursor = fetch_exam_page(conn, parse_fields("title"), None)
+            assert len(items) == 10 and cursor is None
+        db.close()
+
+
+def test_catalog_version_drives_etag():
+    print("\n[TEST] Seeding bumps the catalog version / ETag...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=1)
+        run_migrations(db)
+        with db.connection() as conn:
+            before = catalog_etag(get_catalog_version(conn))
+            bulk_load(conn, generate_mock_exams(2, 1))
+            after = catalog_etag(get_catalog_version(conn))
+        assert before != after
+        assert etag_matches(after, after)
+        assert etag_matches(f'"x", {after}', after)
+        assert not etag_matches(before, after)
+        # Each query variant has its own validator
+        assert catalog_etag(1, "a") != catalog_etag(1, "b") != catalog_etag(1)
+        db.close()
+
+
+def test_cursor_and_field_validation():
+    assert decode_cursor(encode_cursor("Design", "abc")) == ("Design", "abc")
+    assert decode_cursor(encode_cursor(None, "abc")) == ("", "abc")
+    for bad in ("not-base64!", encode_cursor("x", "y")[:-3]):
+        try:
+            decode_cursor(bad)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    try:
+        parse_fields("title,password")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_exam_detail_cache_coalesces_and_invalidates():
+    print("\n[TEST] Exam detail cache: one rebuild per cold exam, dropped on version bump...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+        run_migrations(db)
+        with db.connection() as conn:
+            bulk_load(conn, generate_mock_exams(3, 5))
+            exam_id = conn.execute("SELECT id FROM exams LIMIT 1").fetchone()[0]
+
+        cache = ExamDetailCache(db, version_check_interval=0)
+
+        async def scenario():
+            bodies = await asyncio.gather(*(cache.get(exam_id) for _ in range(50)))
+            assert len(set(bodies)) == 1
+            assert len(json.loads(bodies[0])["questions"]) == 5
+            assert cache.misses == 1
+            assert await cache.get("missing") is None
+
+            with db.connection() as conn:
+                bulk_load(conn, generate_mock_exams(1, 1))
+            await cache.get(exam_id)
+            assert cache.misses == 3  # "missing" + rebuild after the version bump
+
+        asyncio.run(scenario())
+        print(f"   Stats: {cache.stats()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    test_keyset_pages_cover_catalog_once()
+    test_null_categories_are_paged()
+    test_catalog_version_drives_etag()
+    test_cursor_and_field_validation()
+    test_exam_detail_cache_coalesces_and_invalidates()
+    print("✅ Catalog tests passed")
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from grade_cache import GradeCache, make_cache_key
+
+
+def _cache(tmpdir, **kwargs):
+    options = {"memory_items": 2, "max_rows": 1000, "ttl_seconds": 0}
+    options.update(kwargs)
+    return GradeCache(os.path.join(tmpdir, "cache.db"), **options)
+
+
+def test_key_normalization():
+    print("\n[TEST] Cache keys ignore whitespace noise but not content...")
+    a = make_cache_key("What is X?", "Rubric", "  An   answer\n", "model", "v1")
+    b = make_cache_key("What is X?", "Rubric", "An answer", "model", "v1")
+    c = make_cache_key("What is X?", "Rubric", "An answer", "model", "v2")
+    assert a == b
+    assert a != c
+
+
+def test_memory_and_disk_tiers():
+    print("\n[TEST] LRU tier in front of SQLite tier...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(tmpdir)
+        verdict = {"score": 80, "feedback": "Good", "confidence_score": 0.9}
+        assert cache.get("k1") is None
+        cache.put("k1", verdict)
+        assert cache.get("k1") == verdict
+
+        # Push k1 out of the 2-item LRU; it must still come back from disk
+        cache.put("k2", verdict)
+        cache.put("k3", verdict)
+        assert cache.get("k1") == verdict
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["disk_hits"] == 1
+        assert stats["misses"] == 1
+        print(f"   Stats: {stats}")
+
+
+def test_ttl_expiry():
+    print("\n[TEST] Expired entries are treated as misses...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(tmpdir, ttl_seconds=1)
+        cache.put("k1", {"score": 1})
+        cache._memory["k1"] = (time.time() - 5, {"score": 1})
+        with cache._db.transaction() as conn:
+            conn.execute("UPDATE grade_cache SET created_at = ?", (time.time() - 5,))
+        assert cache.get("k1") is None
+        assert cache.stats()["evictions"] == 1
+
+
+if __name__ == "__main__":
+    test_key_normalization()
+    test_memory_and_disk_tiers()
+    test_ttl_expiry()
+    print("✅ Grade cache tests passed")
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+os.environ.setdefault("GROQ_API_KEY", "dummy")
+
+import grading_agent
+from grade_cache import GradeCache
+from llm_gateway import LLMUnavailable
+
+
+def _item(n: int) -> dict:
+    return {"question": f"Q{n}", "rubric": "R", "student_answer": f"short answer {n}"}
+
+
+def test_batch_isolation_and_cache_namespaces():
+    print("\n[TEST] Packed verdicts stay out of the single-answer cache; failures stay per item...")
+    calls = {"packed": 0}
+
+    async def fake_packed(items):
+        calls["packed"] += 1
+        return [{"score": 5.0, "feedback": "packed", "confidence_score": 0.9, "cached": False} for _ in items]
+
+    async def fake_single(item):
+        if item["question"] == "Q9":
+            raise LLMUnavailable("test-model", "upstream down")
+        return {"score": 7.0, "feedback": "single", "confidence_score": 0.9, "cached": False}
+
+    tmpdir = tempfile.TemporaryDirectory()
+    # Throwaway cache, so verdicts from earlier runs never count as hits
+    grade_cache = GradeCache(os.path.join(tmpdir.name, "grade_cache.db"), memory_items=16, max_rows=1000, ttl_seconds=0)
+    originals = grading_agent._grade_packed, grading_agent._grade_single, grading_agent.grade_cache
+    grading_agent._grade_packed = fake_packed
+    grading_agent._grade_single = fake_single
+    grading_agent.grade_cache = grade_cache
+
+    async def scenario():
+        results = await grading_agent.grade_answers_batch([_item(1), _item(2)])
+        assert [r["feedback"] for r in results] == ["packed", "packed"]
+        # The single-answer path must not see the packed verdict...
+        assert grade_cache.get(grading_agent._cache_key(_item(1))) is None
+        # ...but a later batch reuses it without another model call
+        again = await grading_agent.grade_answers_batch([_item(1), _item(2)])
+        assert all(r["cached"] for r in again) and calls["packed"] == 1
+
+        # Q9 fails, the other answer is still returned
+        mixed = await grading_agent.grade_answers_batch([_item(3), {**_item(9), "question": "Q9"}], pack_short_answers=False)
+        assert mixed[0]["feedback"] == "single"
+        assert "upstream down" in mixed[1]["error"] and mixed[1]["retryable"] is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        grading_agent._grade_packed, grading_agent._grade_single, grading_agent.grade_cache = originals
+        grade_cache._db.close()
+        tmpdir.cleanup()
+    print("✅ Batch grading OK")
+
+
+if __name__ == "__main__":
+    test_batch_isolation_and_cache_namespaces()
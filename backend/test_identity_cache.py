@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import identity_cache
+from storage import Database
+from migrations import run_migrations
+
+
+def test_expiry_and_row_cap():
+    print("\n[TEST] Identity verdicts expire and the table stays under its row cap...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(database)
+        identity_cache.db = database
+        identity_cache.IDENTITY_CACHE_MAX_ROWS = 5
+        identity_cache.PRUNE_EVERY = 4
+
+        for i in range(12):
+            identity_cache.put_verdict("card", f"frame{i}", "v", {"match": True, "i": i})
+        with database.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM identity_verdicts").fetchone()[0]
+        assert count <= 5 + identity_cache.PRUNE_EVERY
+        assert identity_cache.get_verdict("card", "frame11", "v")["i"] == 11
+        assert identity_cache.get_verdict("card", "frame0", "v") is None  # oldest evicted
+
+        # Expired entries are misses and are deleted on read
+        with database.transaction() as conn:
+            conn.execute("UPDATE identity_verdicts SET created_at = 0 WHERE webcam_sha256 = 'frame11'")
+        assert identity_cache.get_verdict("card", "frame11", "v") is None
+        assert identity_cache.identity_cache_stats["evictions"] >= 8
+        database.close()
+    print("✅ Identity cache OK")
+
+
+if __name__ == "__main__":
+    test_expiry_and_row_cap()
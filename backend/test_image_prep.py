@@ -0,0 +1,50 @@
+import asyncio
+import io
+import os
+import sys
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from PIL import Image
+from image_prep import prepare_image, normalize_image, EXIF_ORIENTATION
+from cpu_pool import shutdown_process_pool
+
+
+def _jpeg(size, orientation=None) -> bytes:
+    img = Image.new("RGB", size, (200, 30, 30))
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION] = orientation
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=40, exif=exif.tobytes())
+    return out.getvalue()
+
+
+def test_small_jpegs_keep_orientation():
+    print("\n[TEST] Small upright JPEGs pass through; EXIF-rotated ones are normalized...")
+
+    # Only upright JPEGs within the size limit may be sent as-is
+    assert normalize_image(_jpeg((64, 32)), 1024, 85)[1] is True
+    assert normalize_image(_jpeg((64, 32), orientation=1), 1024, 85)[1] is True
+    assert normalize_image(_jpeg((64, 32), orientation=6), 1024, 85)[1] is False
+    assert normalize_image(_jpeg((64, 32)), 48, 85)[1] is False
+
+    async def scenario():
+
+        # Orientation 6 = rotate 90 degrees: the model must get the upright (32x64) image
+        rotated = _jpeg((64, 32), orientation=6)
+        data, mime = await prepare_image(rotated)
+        assert data != rotated and mime == "image/jpeg"
+        with Image.open(io.BytesIO(data)) as img:
+            assert img.size == (32, 64)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        shutdown_process_pool()
+    print("✅ Image prep OK")
+
+
+if __name__ == "__main__":
+    test_small_jpegs_keep_orientation()
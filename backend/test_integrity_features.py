@@ -0,0 +1,67 @@
+import os
+import sys
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from integrity_features import new_accumulator, accumulate, summarize, extract_features, rule_verdict
+
+T0 = 1715420000000  # ms, as sent by the frontend
+
+
+def _alert(kind: str, offset_s: float):
+    return {"type": kind, "message": kind, "timestamp": T0 + int(offset_s * 1000)}
+
+
+def test_feature_extraction():
+    print("\n[TEST] Per-type counts, bursts and streaks...")
+    alerts = [_alert("LOOKING_AWAY", s) for s in (0, 5, 10)] + [_alert("TAB_SWITCH", 300), _alert("LOOKING_AWAY", 600)]
+    features = extract_features(alerts)
+    gaze = features["per_type"]["gaze_away"]
+    assert features["total_alerts"] == 5
+    assert gaze["count"] == 4 and gaze["max_burst"] == 3 and gaze["longest_streak"] == 3
+    assert features["per_type"]["tab_switch"]["count"] == 1
+
+    # Incremental updates give the same result as one pass
+    acc = accumulate(new_accumulator(), alerts[:2])
+    acc = accumulate(acc, alerts[2:])
+    assert summarize(acc) == features
+    print("✅ Features OK")
+
+
+def test_rule_short_circuit():
+    print("\n[TEST] Clear-cut cases are decided without the LLM...")
+    assert rule_verdict(extract_features([]))["risk_level"] == "LOW"
+    assert rule_verdict(extract_features([_alert("PHONE_DETECTED", 0)]))["risk_level"] == "HIGH"
+    assert rule_verdict(extract_features([_alert("MULTIPLE_FACES", s) for s in (0, 100, 200)]))["risk_level"] == "HIGH"
+    assert rule_verdict(extract_features([_alert("LOOKING_AWAY", s) for s in (0, 200)]))["risk_level"] == "LOW"
+
+    # Ambiguous: left to the model
+    assert rule_verdict(extract_features([_alert("LOOKING_AWAY", s) for s in range(0, 30, 3)])) is None
+    assert rule_verdict(extract_features([_alert("TAB_SWITCH", 0), _alert("LOOKING_AWAY", 60)])) is None
+    print("✅ Rules OK")
+
+
+def test_loose_alert_payloads():
+    print("\n[TEST] String/ISO/garbage timestamps and missing types do not crash...")
+    alerts = [
+        {"type": "TAB_SWITCH", "timestamp": str(T0)},
+        {"type": "TAB_SWITCH", "timestamp": "2024-05-11T09:33:40Z"},
+        {"type": "TAB_SWITCH", "timestamp": "2024-05-11T09:34:40"},
+        {"type": None, "timestamp": "yesterday"},
+        {"timestamp": None},
+        {"type": "LOOKING_AWAY", "timestamp": [1, 2]},
+        {"type": "LOOKING_AWAY", "timestamp": True},
+    ]
+    features = extract_features(alerts)
+    assert features["total_alerts"] == 7
+    assert features["per_type"]["tab_switch"]["count"] == 3
+    assert features["per_type"]["unknown"]["count"] == 2
+    assert features["per_type"]["gaze_away"]["count"] == 2
+    print("✅ Loose payloads OK")
+
+
+if __name__ == "__main__":
+    test_feature_extraction()
+    test_rule_short_circuit()
+    test_loose_alert_payloads()
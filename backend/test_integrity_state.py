@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+from migrations import run_migrations
+from integrity_state import RollingIntegrity, NEW_LOGS_SQL
+
+
+class CountingGraph:
+    # Stands in for integrity_graph's model path; records how often it is asked
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, state):
+        self.calls += 1
+        return {"risk_level": "MEDIUM", "verdict": "Suspicious", "explanation": "test", "decided_by": "llm"}
+
+
+def _alerts(kind: str, count: int, start: int = 0):
+    return [{"type": kind, "timestamp": 1715420000 + (start + i) * 5} for i in range(count)]
+
+
+def test_rolling_analysis():
+    print("\n[TEST] Only new alerts are processed and the model is re-asked on band changes...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(db)
+        graph = CountingGraph()
+        rolling = RollingIntegrity(db, graph, "test-model")
+
+        async def scenario():
+            history = _alerts("TAB_SWITCH", 2)
+            first = await rolling.analyze_alerts("a1", history)
+            assert first["verdict"] == "Suspicious" and first["alerts_processed"] == 2
+            assert graph.calls == 1
+
+            # Same history again: nothing new, no model call
+            again = await rolling.analyze_alerts("a1", history)
+            assert again["alerts_processed"] == 0 and graph.calls == 1
+
+            # One more alert in the same band: counters update, verdict reused
+            history += _alerts("TAB_SWITCH", 1, start=2)
+            same_band = await rolling.analyze_alerts("a1", history)
+            assert same_band["alerts_processed"] == 1 and not same_band["reanalyzed"]
+            assert same_band["features"]["per_type"]["tab_switch"]["count"] == 3
+            assert graph.calls == 1
+
+            # A phone is a rule verdict: decided locally and reported
+            history += _alerts("PHONE_DETECTED", 1, start=10)
+            high = await rolling.analyze_alerts("a1", history)
+            assert high["risk_level"] == "HIGH" and high["decided_by"] == "rules"
+            assert graph.calls == 1
+
+        asyncio.run(scenario())
+
+        with db.connection() as conn:
+            reports = conn.execute("SELECT risk_level, model_used FROM integrity_reports WHERE attempt_id = 'a1' ORDER BY rowid").fetchall()
+        assert reports == [("MEDIUM", "test-model"), ("HIGH", "rules")]
+        db.close()
+    print("✅ Rolling analysis OK")
+
+
+def test_rolling_from_logs():
+    print("\n[TEST] Stored proctoring logs are read past the high-water mark...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(db)
+        rolling = RollingIntegrity(db, CountingGraph(), "test-model")
+
+        def insert(conn, kind, at):
+            with conn:
+                conn.execute("INSERT INTO proctoring_logs (attempt_id, violation_type, occurred_at) VALUES ('a2', ?, ?)", (kind, at))
+
+        async def scenario():
+            await db.run(insert, "gaze_away", 1715420000.0)
+            first = await rolling.analyze_logs("a2")
+            assert first["risk_level"] == "LOW" and first["alerts_processed"] == 1
+            await db.run(insert, "phone_detected", 1715420100.0)
+            second = await rolling.analyze_logs("a2")
+            assert second["risk_level"] == "HIGH" and second["alerts_processed"] == 1
+
+        asyncio.run(scenario())
+
+        # Only the new rows are read, in id order, straight from the index
+        with db.connection() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {NEW_LOGS_SQL}", ("a2", 1)).fetchall())
+        assert "idx_proctoring_logs_attempt_id" in plan and "TEMP B-TREE" not in plan, plan
+        db.close()
+    print("✅ Log-based analysis OK")
+
+
+if __name__ == "__main__":
+    test_rolling_analysis()
+    test_rolling_from_logs()
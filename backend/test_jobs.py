@@ -0,0 +1,214 @@
+import asyncio
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import jobs
+import llm_gateway
+from storage import Database
+from migrations import run_migrations
+from jobs import JobQueue, JobFailed
+
+jobs.JOB_BACKOFF_BASE_SECONDS = 0.01
+jobs.JOB_POLL_INTERVAL_SECONDS = 0.02
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+async def _wait_for(queue: JobQueue, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] in ("succeeded", "failed") or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.02)
+
+
+def test_job_queue():
+    print("\n[TEST] Jobs retry on rate limits, fail fast otherwise, and dedupe by key...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+        run_migrations(db)
+        queue = JobQueue(db, workers=2, max_attempts=3)
+        calls = {"flaky": 0}
+
+        async def flaky(payload, data):
+            calls["flaky"] += 1
+            if calls["flaky"] < 3:
+                raise RateLimited("429 Too Many Requests")
+            return {"echo": payload["value"], "size": len(data)}
+
+        async def broken(payload, data):
+            raise JobFailed("bad input", retryable=False)
+
+        queue.register("flaky", flaky)
+        queue.register("broken", broken)
+
+        async def scenario():
+            queue.start()
+            try:
+                job, created = await queue.enqueue("flaky", {"value": 7}, data=b"abc", idempotency_key="k1")
+                again, created_again = await queue.enqueue("flaky", {"value": 7}, data=b"abc", idempotency_key="k1")
+                assert created and not created_again and again["job_id"] == job["job_id"]
+
+                done = await _wait_for(queue, job["job_id"])
+                assert done["status"] == "succeeded" and done["attempts"] == 3
+                assert done["result"] == {"echo": 7, "size": 3}
+
+                bad, _ = await queue.enqueue("broken", {})
+                failed = await _wait_for(queue, bad["job_id"])
+                assert failed["status"] == "failed" and failed["attempts"] == 1 and failed["error"] == "bad input"
+            finally:
+                await queue.stop()
+
+        asyncio.run(scenario())
+        assert queue.stats()["rate_limited"] == 2
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM jobs WHERE data IS NOT NULL").fetchone()[0] == 0
+        db.close()
+    print("✅ Job queue OK")
+
+
+def test_leases():
+    print("\n[TEST] Expired leases respect max_attempts; running jobs keep theirs...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+        run_migrations(db)
+        queue = JobQueue(db, workers=1, max_attempts=2)
+        calls = {"slow": 0}
+
+        async def slow(payload, data):
+            calls["slow"] += 1
+            await asyncio.sleep(0.5)
+            return {}
+
+        queue.register("slow", slow)
+        jobs.JOB_LEASE_SECONDS = 0.15
+        try:
+            async def scenario():
+                # A job whose worker died on its final attempt is failed, not re-run
+                dead, _ = await queue.enqueue("slow", {})
+                await db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = 2, locked_by = 'gone', locked_until = 0 WHERE id = ?",
+                    (dead["job_id"],)
+                )
+                assert await db.run(queue._claim) is None
+                failed = await queue.get(dead["job_id"])
+                assert failed["status"] == "failed" and "lease expired" in failed["error"]
+                assert queue.stats()["abandoned"] == 1
+
+                # A job running past the lease is renewed, so a second queue never claims it
+                other = JobQueue(db, workers=1, max_attempts=2)
+                other.register("slow", slow)
+                job, _ = await queue.enqueue("slow", {})
+                queue.start()
+                other.start()
+                try:
+                    done = await _wait_for(queue, job["job_id"])
+                finally:
+                    await queue.stop()
+                    await other.stop()
+                assert done["status"] == "succeeded" and done["attempts"] == 1
+                assert calls["slow"] == 1
+
+            asyncio.run(scenario())
+        finally:
+            jobs.JOB_LEASE_SECONDS = 300
+        db.close()
+    print("✅ Leases OK")
+
+
+def test_worker_survives_db_errors():
+    print("\n[TEST] A database error while finishing a job does not kill the worker...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+        run_migrations(db)
+        queue = JobQueue(db, workers=1, max_attempts=3)
+        finish = queue._finish
+        failures = {"left": 1}
+
+        def flaky_finish(*args):
+            if failures["left"]:
+                failures["left"] -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return finish(*args)
+
+        async def quick(payload, data):
+            return {"value": payload["value"]}
+
+        queue._finish = flaky_finish
+        queue.register("quick", quick)
+        jobs.JOB_LEASE_SECONDS = 0.1
+        try:
+            async def scenario():
+                queue.start()
+                try:
+                    first, _ = await queue.enqueue("quick", {"value": 1})
+                    second, _ = await queue.enqueue("quick", {"value": 2})
+                    return await _wait_for(queue, first["job_id"]), await _wait_for(queue, second["job_id"])
+                finally:
+                    await queue.stop()
+
+            first, second = asyncio.run(scenario())
+        finally:
+            jobs.JOB_LEASE_SECONDS = 300
+        # The job whose result was lost is re-run once its lease expires
+        assert first["status"] == "succeeded" and first["attempts"] == 2
+        assert second["status"] == "succeeded"
+        assert queue.stats()["worker_errors"] == 1
+        db.close()
+    print("✅ Worker error handling OK")
+
+
+def test_gateway_rate_limit_pauses_workers():
+    print("\n[TEST] A 429 surfacing through the LLM gateway pauses the workers...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+        run_migrations(db)
+        queue = JobQueue(db, workers=1, max_attempts=3)
+        calls = {"upstream": 0}
+        paused = []
+
+        async def upstream():
+            calls["upstream"] += 1
+            if calls["upstream"] == 1:
+                raise RateLimited("429 Too Many Requests")
+            return "ok"
+
+        async def grade(payload, data):
+            paused.append(queue._paused_until)
+            return {"answer": await llm_gateway.invoke("test-jobs-429", upstream)}
+
+        queue.register("grade", grade)
+        retries = llm_gateway.LLM_MAX_RETRIES
+        llm_gateway.LLM_MAX_RETRIES = 0  # the first 429 leaves the gateway straight away
+        try:
+            async def scenario():
+                queue.start()
+                try:
+                    job, _ = await queue.enqueue("grade", {})
+                    return await _wait_for(queue, job["job_id"])
+                finally:
+                    await queue.stop()
+
+            done = asyncio.run(scenario())
+        finally:
+            llm_gateway.LLM_MAX_RETRIES = retries
+        assert done["status"] == "succeeded" and done["attempts"] == 2
+        assert queue.stats()["rate_limited"] == 1
+        assert paused[0] == 0.0 and paused[1] > 0.0  # the retry ran after the queue-wide pause was set
+        db.close()
+    print("✅ Gateway rate limits OK")
+
+
+if __name__ == "__main__":
+    test_job_queue()
+    test_leases()
+    test_worker_survives_db_errors()
+    test_gateway_rate_limit_pauses_workers()
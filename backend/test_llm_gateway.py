@@ -0,0 +1,157 @@
+import asyncio
+import os
+import sys
+import time
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import llm_gateway
+from llm_gateway import invoke, breaker_for, LLMError, LLMUnavailable
+
+llm_gateway.LLM_BACKOFF_BASE_SECONDS = 0.01
+
+
+class UpstreamDown(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def test_retries_and_errors():
+    print("\n[TEST] Transient failures are retried, others surface as errors...")
+    calls = {"n": 0}
+
+    async def flaky():
+        calls["n"] += 1
+        if calls["n"] < 2:
+            raise UpstreamDown("503 Service Unavailable")
+        return "ok"
+
+    async def bad():
+        raise BadRequest("400 invalid prompt")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def scenario():
+        assert await invoke("test-retry", flaky) == "ok" and calls["n"] == 2
+        try:
+            await invoke("test-retry", bad)
+            assert False, "expected LLMError"
+        except LLMError as e:
+            assert not isinstance(e, LLMUnavailable) and e.status == 502
+        try:
+            await invoke("test-retry", slow, timeout=0.05)
+            assert False, "expected LLMUnavailable"
+        except LLMUnavailable as e:
+            assert e.status == 503
+
+    asyncio.run(scenario())
+    print("✅ Retries OK")
+
+
+def test_circuit_breaker():
+    print("\n[TEST] Breaker opens after repeated failures and fails fast...")
+    breaker = breaker_for("test-breaker")
+    breaker.failure_threshold, breaker.cooldown = 3, 0.1
+    calls = {"n": 0}
+
+    async def down():
+        calls["n"] += 1
+        raise UpstreamDown("503 Service Unavailable")
+
+    async def up():
+        return "ok"
+
+    async def scenario():
+        for _ in range(3):
+            try:
+                await invoke("test-breaker", down)
+            except LLMUnavailable:
+                pass
+        assert breaker.state == "open"
+        before = calls["n"]
+        try:
+            await invoke("test-breaker", down)
+            assert False, "expected fast failure"
+        except LLMUnavailable as e:
+            assert e.retry_after is not None
+        assert calls["n"] == before  # upstream was not called
+
+        await asyncio.sleep(0.12)
+        assert await invoke("test-breaker", up) == "ok"  # half-open probe succeeds
+        assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+    print("✅ Circuit breaker OK")
+
+
+def test_hedging_and_deadlines():
+    print("\n[TEST] Slow calls are hedged past p95; expired deadlines fail fast...")
+    llm_gateway.LLM_HEDGE_MAX_RATIO = 1.0
+    for _ in range(llm_gateway.LLM_HEDGE_MIN_SAMPLES):
+        llm_gateway.record_latency("test-hedge", 0.01)
+    calls = {"n": 0}
+
+    async def sometimes_slow():
+        calls["n"] += 1
+        # The first (primary) request stalls; the backup answers promptly
+        await asyncio.sleep(5 if calls["n"] == 1 else 0.01)
+        return calls["n"]
+
+    async def scenario():
+        started = time.monotonic()
+        assert await invoke("test-hedge", sometimes_slow, hedge=True) == 2
+        assert time.monotonic() - started < 1
+        try:
+            await invoke("test-hedge", sometimes_slow, deadline=time.time() - 1)
+            assert False, "expected deadline failure"
+        except LLMUnavailable:
+            pass
+        assert calls["n"] == 2  # the expired call never reached upstream
+
+    asyncio.run(scenario())
+    stats = llm_gateway.gateway_stats()
+    assert stats["hedge_wins"] >= 1 and "test-hedge" in stats["p95_seconds"]
+    print("✅ Hedging and deadlines OK")
+
+
+def test_deadline_cutoffs_spare_breaker():
+    print("\n[TEST] Calls cut off by the caller's deadline do not trip the breaker...")
+    breaker = breaker_for("test-cutoff")
+    breaker.failure_threshold, breaker.cooldown = 2, 10
+
+    async def stalls():
+        await asyncio.sleep(1)
+        return "late"
+
+    async def scenario():
+        for _ in range(3):
+            try:
+                await invoke("test-cutoff", stalls, timeout=5, deadline=time.time() + 0.05)
+                assert False, "expected timeout"
+            except LLMUnavailable:
+                pass
+        assert breaker.state == "closed" and breaker.failures == 0
+        # Silent for the full own timeout: that is the upstream's fault
+        for _ in range(2):
+            try:
+                await invoke("test-cutoff", stalls, timeout=0.05)
+                assert False, "expected timeout"
+            except LLMUnavailable:
+                pass
+        assert breaker.state == "open"
+
+    asyncio.run(scenario())
+    assert llm_gateway.gateway_stats()["deadline_cutoffs"] >= 3
+    print("✅ Deadline cutoffs OK")
+
+
+if __name__ == "__main__":
+    test_retries_and_errors()
+    test_circuit_breaker()
+    test_hedging_and_deadlines()
+    test_deadline_cutoffs_spare_breaker()
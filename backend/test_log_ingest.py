@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+from migrations import run_migrations
+from log_ingest import LogIngestQueue, normalize_violation_type, alert_epoch_seconds
+
+
+def _row(attempt_id: str, i: int):
+    return (attempt_id, normalize_violation_type("LOOKING_AWAY"), f"event {i}", None, None, alert_epoch_seconds(1715420000000 + i))
+
+
+def test_batched_flush_and_backpressure():
+    print("\n[TEST] Alerts are flushed in grouped transactions with a bounded buffer...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(db)
+        queue = LogIngestQueue(db, max_pending=1000, batch_size=100, flush_interval=0.05, max_rows_per_transaction=400)
+
+        async def scenario():
+            for batch in range(9):
+                assert queue.offer([_row("a1", batch * 100 + i) for i in range(100)])
+            # 900 pending + 200 would exceed the bound: refused as a whole
+            assert not queue.offer([_row("a1", i) for i in range(200)])
+            assert queue.stats()["rejected"] == 200
+
+            queue.start()
+            assert queue.offer([_row("a2", i) for i in range(50)])
+            await asyncio.sleep(0.2)
+            await queue.stop()
+
+        asyncio.run(scenario())
+        stats = queue.stats()
+        print(f"   Stats: {stats}")
+        assert stats["pending"] == 0
+        assert stats["written"] == stats["accepted"]
+        assert stats["transactions"] < stats["written"] / 50
+
+        with db.connection() as conn:
+            count, kinds = conn.execute("SELECT COUNT(*), GROUP_CONCAT(DISTINCT violation_type) FROM proctoring_logs").fetchone()
+        assert count == stats["written"]
+        assert kinds == "gaze_away"
+        db.close()
+
+
+def test_bad_row_is_dropped():
+    print("\n[TEST] A row SQLite keeps rejecting is dropped, not retried forever")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(db)
+        queue = LogIngestQueue(db, max_pending=1000, batch_size=100, flush_interval=0.05,
+                               max_rows_per_transaction=400, max_failures=2)
+        bad = ("a1", None, "no type", None, None, 1.0)  # violates NOT NULL violation_type
+
+        async def scenario():
+            assert queue.offer([_row("a1", i) for i in range(5)] + [bad] + [_row("a1", i) for i in range(5, 10)])
+            await queue.flush()
+            await queue.flush()
+            assert queue.stats()["pending"] == 11  # still retrying the whole chunk
+            await queue.flush()  # third try goes row by row
+            assert queue.offer([_row("a2", i) for i in range(5)])
+            await queue.flush()
+
+        asyncio.run(scenario())
+        stats = queue.stats()
+        print(f"   Stats: {stats}")
+        assert stats["pending"] == 0
+        assert stats["dropped"] == 1
+        assert stats["flush_failures"] == 2
+        assert stats["written"] == 15
+
+        with db.connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM proctoring_logs").fetchone()[0]
+        assert count == 15
+        db.close()
+
+
+class SlowDatabase:
+    # Holds each write open long enough for a second flush to start meanwhile
+    def __init__(self, database):
+        self.database = database
+
+    async def run(self, fn, *args):
+        await asyncio.sleep(0.1)
+        return await self.database.run(fn, *args)
+
+
+def test_concurrent_flushes():
+    print("\n[TEST] A flush returns only once rows taken by another flush are committed")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        run_migrations(db)
+        queue = LogIngestQueue(SlowDatabase(db), max_pending=1000, batch_size=100, flush_interval=1.0,
+                               max_rows_per_transaction=400)
+
+        def count(conn):
+            return conn.execute("SELECT COUNT(*) FROM proctoring_logs").fetchone()[0]
+
+        async def scenario():
+            assert queue.offer([_row("a1", i) for i in range(20)])
+            background = asyncio.create_task(queue.flush())
+            await asyncio.sleep(0.01)  # the background flush has taken the rows off the buffer
+            await queue.flush()
+            assert await db.run(count) == 20
+            await background
+
+        asyncio.run(scenario())
+        assert queue.stats()["written"] == 20
+        db.close()
+
+
+def test_timestamp_units():
+    assert alert_epoch_seconds(1715420000) == 1715420000
+    assert alert_epoch_seconds(1715420000123) == 1715420000.123
+
+
+if __name__ == "__main__":
+    test_batched_flush_and_backpressure()
+    test_bad_row_is_dropped()
+    test_concurrent_flushes()
+    test_timestamp_units()
+    print("✅ Log ingestion tests passed")
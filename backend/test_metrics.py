@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import metrics
+from metrics import Counter, Gauge, Histogram
+
+
+def test_prometheus_text():
+    print("\n[TEST] Counters, gauges, histograms and stats render as Prometheus text...")
+    calls = Counter("test_calls_total", "Test calls", ["model"])
+    busy = Gauge("test_in_flight", "Test in flight")
+    latency = Histogram("test_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+    metrics.register_stats("test_cache", lambda: {"hits": 3, "hit_rate": 0.75, "state": "closed"})
+    metrics.register_stats("test_quota", lambda: {"m1": {"in_flight": 2}}, label="model")
+
+    calls.inc(model="a")
+    calls.inc(2, model="a")
+    with busy.track():
+        assert 'aegis_test_in_flight{worker="%s"} 1' % metrics.WORKER in metrics.render()
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, route="/x")
+
+    text = metrics.render()
+    worker = f'worker="{metrics.WORKER}"'
+    assert f'aegis_test_calls_total{{model="a",{worker}}} 3' in text
+    assert f'aegis_test_in_flight{{{worker}}} 0' in text
+    # Buckets are cumulative and end with +Inf
+    assert f'aegis_test_seconds_bucket{{route="/x",{worker},le="0.1"}} 1' in text
+    assert f'aegis_test_seconds_bucket{{route="/x",{worker},le="1.0"}} 2' in text
+    assert f'aegis_test_seconds_bucket{{route="/x",{worker},le="+Inf"}} 3' in text
+    assert f'aegis_test_seconds_count{{route="/x",{worker}}} 3' in text
+    # Numeric stats become gauges; text values are skipped
+    assert f'aegis_test_cache_hit_rate{{{worker}}} 0.75' in text
+    assert "aegis_test_cache_state" not in text
+    assert f'aegis_test_quota_in_flight{{model="m1",{worker}}} 2' in text
+    print("✅ Metrics OK")
+
+
+if __name__ == "__main__":
+    test_prometheus_text()
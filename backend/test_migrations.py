@@ -0,0 +1,49 @@
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+from migrations import run_migrations, current_version, LATEST_VERSION, CATALOG_INDEXES
+
+
+def test_fresh_database_gets_indexes():
+    print("\n[TEST] Fresh database is migrated to the latest version...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=1)
+        assert run_migrations(db) == LATEST_VERSION
+        assert run_migrations(db) == 0  # second start is a no-op
+
+        with db.connection() as conn:
+            assert current_version(conn) == LATEST_VERSION
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM questions WHERE exam_id = ?", ("x",)).fetchall()
+            assert any("idx_questions_exam_id" in row[-1] for row in plan)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert set(CATALOG_INDEXES) <= indexes
+        db.close()
+
+
+def test_legacy_database_is_upgraded():
+    print("\n[TEST] Pre-migration database gains face_ref_path...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "legacy.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE users (id TEXT PRIMARY KEY, email TEXT UNIQUE, password TEXT, full_name TEXT, id_card_path TEXT)")
+            conn.execute("INSERT INTO users (id, email) VALUES ('u1', 'a@b.c')")
+
+        db = Database(path, pool_size=1)
+        run_migrations(db)
+        with db.connection() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+            assert "face_ref_path" in columns
+            assert conn.execute("SELECT email FROM users WHERE id = 'u1'").fetchone()[0] == "a@b.c"
+        db.close()
+
+
+if __name__ == "__main__":
+    test_fresh_database_gets_indexes()
+    test_legacy_database_is_upgraded()
+    print("✅ Migration tests passed")
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import pdf_render
+from pdf_render import prune_render_cache
+
+
+def _write(cache_dir: str, name: str, size: int, age: float):
+    path = os.path.join(cache_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_render_cache_is_bounded():
+    print("\n[TEST] Render cache drops expired renders, then least recently used past the size cap...")
+    ttl, cap = pdf_render.RENDER_CACHE_TTL_SECONDS, pdf_render.RENDER_CACHE_MAX_BYTES
+    pdf_render.RENDER_CACHE_TTL_SECONDS, pdf_render.RENDER_CACHE_MAX_BYTES = 3600, 250
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            _write(cache_dir, "expired.png", 10, 7200)
+            _write(cache_dir, "old.png", 100, 300)
+            _write(cache_dir, "recent.png", 100, 200)
+            used = _write(cache_dir, "used.png", 100, 400)
+            assert pdf_render._read_cached(used) == b"x" * 100  # a hit makes it the newest
+            _write(cache_dir, "stale.png.abc.part", 5, 2 * pdf_render.PART_FILE_GRACE_SECONDS)
+            _write(cache_dir, "writing.png.def.part", 5, 1)
+
+            assert prune_render_cache(cache_dir) == 3
+            assert sorted(os.listdir(cache_dir)) == ["recent.png", "used.png", "writing.png.def.part"]
+            assert prune_render_cache(cache_dir) == 0
+            assert prune_render_cache(os.path.join(cache_dir, "missing")) == 0
+    finally:
+        pdf_render.RENDER_CACHE_TTL_SECONDS, pdf_render.RENDER_CACHE_MAX_BYTES = ttl, cap
+    print("✅ Render cache pruning OK")
+
+
+if __name__ == "__main__":
+    test_render_cache_is_bounded()
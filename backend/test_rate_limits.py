@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+import time
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from rate_limits import TokenBucket, ModelLimiter
+
+
+def test_token_bucket():
+    print("\n[TEST] Requests over the per-minute budget wait instead of failing...")
+
+    async def scenario():
+        bucket = TokenBucket(per_minute=600, capacity=2)  # 10/s, burst of 2
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+    assert 0.15 <= elapsed < 0.5, elapsed
+    print(f"✅ Token bucket OK ({elapsed:.2f}s for 2 over-budget requests)")
+
+
+def test_model_limiter_concurrency():
+    print("\n[TEST] Per-model semaphore caps calls in flight...")
+
+    async def scenario():
+        limiter = ModelLimiter("test-model", concurrency=2, rpm=6000, tpm=None)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        return peak, limiter.stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 2 and stats["calls"] == 6 and stats["queued"] >= 4
+    print("✅ Model limiter OK")
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_model_limiter_concurrency()
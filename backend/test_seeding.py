@@ -0,0 +1,41 @@
+import os
+import sys
+import types
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+from migrations import run_migrations
+from seeding import generate_mock_exams, bulk_load
+
+
+def test_generator_streams_requested_shape():
+    print("\n[TEST] Generator is lazy and honours the requested sizes...")
+    exams = generate_mock_exams(12, 7)
+    assert isinstance(exams, types.GeneratorType)
+    exams = list(exams)
+    assert len(exams) == 12
+    assert all(len(ex["questions_data"]) == 7 for ex in exams)
+    assert len({q["id"] for ex in exams for q in ex["questions_data"]}) == 84
+
+
+def test_bulk_load_with_index_rebuild():
+    print("\n[TEST] Bulk load in one transaction, indexes rebuilt afterwards...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=1)
+        run_migrations(db)
+        with db.connection() as conn:
+            counts = bulk_load(conn, generate_mock_exams(250, 4), batch_size=100, rebuild_indexes=True)
+            assert counts == (250, 1000)
+            assert conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 1000
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert {"idx_questions_exam_id", "idx_exams_category"} <= indexes
+        db.close()
+
+
+if __name__ == "__main__":
+    test_generator_streams_requested_shape()
+    test_bulk_load_with_index_rebuild()
+    print("✅ Seeding tests passed")
@@ -0,0 +1,42 @@
+import os
+import sys
+import json
+import subprocess
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from startup import STARTUP_BUDGET_SECONDS
+
+HEAVY_MODULES = ["langgraph", "langchain_core", "langchain_groq", "groq", "httpx"] + [
+    "grading_agent", "integrity_agent", "audio_agent", "identity_agent"
+]
+
+# Imports main in a fresh interpreter (a real cold start) and reports what it cost
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import main
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_cold_import_budget():
+    print("\n[TEST] Importing main stays within the cold-start budget and loads no agents...")
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "dummy")}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=backend_dir, env=env, capture_output=True, text=True, check=True
+    )
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"   import main: {probe['seconds'] * 1000:.0f} ms (budget {STARTUP_BUDGET_SECONDS:g}s)")
+    assert probe["loaded"] == [], f"eagerly imported: {probe['loaded']}"
+    assert probe["seconds"] <= STARTUP_BUDGET_SECONDS
+    print("✅ Cold start OK")
+
+
+if __name__ == "__main__":
+    test_cold_import_budget()
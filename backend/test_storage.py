@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from storage import Database
+
+
+def test_pool_uses_wal_and_reuses_connections():
+    print("\n[TEST] Pooled connections run in WAL mode...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=2)
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            first = conn
+        with db.connection() as conn:
+            assert conn is first
+        db.close()
+
+
+def test_async_queries_run_off_loop():
+    print("\n[TEST] Async helpers execute on the DB thread pool...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(os.path.join(tmpdir, "test.db"), pool_size=4)
+
+        async def scenario():
+            await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            await db.executemany("INSERT INTO items (name) VALUES (?)", [(f"item-{i}",) for i in range(100)])
+            counts = await asyncio.gather(*(db.fetchone("SELECT COUNT(*) FROM items") for _ in range(20)))
+            assert all(row[0] == 100 for row in counts)
+            rows = await db.fetchall("SELECT name FROM items WHERE id <= ?", (3,))
+            assert [r[0] for r in rows] == ["item-0", "item-1", "item-2"]
+
+        asyncio.run(scenario())
+        db.close()
+
+
+if __name__ == "__main__":
+    test_pool_uses_wal_and_reuses_connections()
+    test_async_queries_run_off_loop()
+    print("✅ Storage tests passed")
@@ -0,0 +1,44 @@
+import os
+import sys
+import wave
+import io
+
+# Ensure backend dir is in path
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+import numpy as np
+from vad import analyze_samples, VAD_SAMPLE_RATE
+
+
+def _speech_like(t, start, seconds):
+    # Formant-shaped harmonics with a syllable-rate envelope
+    voice = sum(np.sin(2 * np.pi * k * 150 * t) * np.exp(-((k * 150 - 700) / 300) ** 2) for k in range(1, 25))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    return 0.1 * voice * envelope * ((t >= start) & (t < start + seconds))
+
+
+def test_vad():
+    print("\n[TEST] Silence and noise are dropped, speech is kept and trimmed...")
+    rng = np.random.default_rng(0)
+    t = np.arange(15 * VAD_SAMPLE_RATE) / VAD_SAMPLE_RATE
+
+    silent = analyze_samples((rng.normal(0, 1e-4, len(t))).astype(np.float32))
+    assert not silent.has_speech and silent.wav is None
+
+    noise = analyze_samples((rng.normal(0, 0.1, len(t))).astype(np.float32))
+    assert not noise.has_speech
+
+    hum = analyze_samples((0.05 * np.sin(2 * np.pi * 50 * t)).astype(np.float32))
+    assert not hum.has_speech
+
+    speech = analyze_samples((_speech_like(t, 5, 3) + rng.normal(0, 1e-3, len(t))).astype(np.float32))
+    assert speech.has_speech and 2.5 <= speech.speech_seconds <= 4.0
+    start, end = speech.segments[0]
+    assert 4.5 <= start <= 5.5 and 7.5 <= end <= 8.5
+    with wave.open(io.BytesIO(speech.wav)) as wav:
+        assert wav.getframerate() == VAD_SAMPLE_RATE and wav.getnframes() < len(t) / 3
+    print("✅ VAD OK")
+
+
+if __name__ == "__main__":
+    test_vad()
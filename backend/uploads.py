@@ -0,0 +1,113 @@
+import os
+import uuid
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Set, Tuple
+from fastapi import UploadFile
+
+# Single upload pipeline for identity files.
+# Uploads are consumed in chunks; each chunk is hashed, size-checked and (when
+# saving) written to disk off the event loop as it arrives. The caller gets the
+# bytes it already holds, so nothing is re-read from disk afterwards.
+# The file type comes from magic bytes, never from the client's filename.
+
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", "uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_ID_CARD_BYTES = int(os.environ.get("MAX_ID_CARD_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_BYTES = int(os.environ.get("MAX_IMAGE_BYTES", str(8 * 1024 * 1024)))
+
+IMAGE_TYPES = {"jpg", "png", "webp"}
+ID_CARD_TYPES = IMAGE_TYPES | {"pdf"}
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "pdf": "application/pdf",
+}
+
+
+class UploadRejected(ValueError):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: Optional[str]  # None when the upload was only read into memory
+    sha256: str
+    size: int
+    ext: str
+    content_type: str
+    data: bytes
+
+
+def sniff_type(head: bytes) -> Optional[str]:
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    return None
+
+
+async def _consume(upload: UploadFile, allowed: Set[str], max_bytes: int, out=None) -> Tuple[str, str, int, bytes]:
+    hasher = hashlib.sha256()
+    chunks = []
+    size = 0
+    ext = None
+
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if ext is None:
+            ext = sniff_type(chunk[:16])
+            if ext not in allowed:
+                raise UploadRejected(f"Unsupported file type for '{upload.filename}'; allowed: {', '.join(sorted(allowed))}")
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(f"'{upload.filename}' exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        hasher.update(chunk)
+        chunks.append(chunk)
+        if out is not None:
+            await asyncio.to_thread(out.write, chunk)
+
+    if ext is None:
+        raise UploadRejected(f"'{upload.filename}' is empty")
+    return ext, hasher.hexdigest(), size, b"".join(chunks)
+
+
+def stored_from_bytes(path: str, data: bytes, sha256: Optional[str] = None) -> StoredUpload:
+    # Wraps a file that is already on disk (e.g. a registered ID card)
+    ext = sniff_type(data[:16])
+    if ext is None:
+        raise UploadRejected(f"Unrecognized file type: {path}")
+    return StoredUpload(path, sha256 or hashlib.sha256(data).hexdigest(), len(data), ext, CONTENT_TYPES[ext], data)
+
+
+async def read_upload(upload: UploadFile, allowed: Set[str], max_bytes: int) -> StoredUpload:
+    ext, digest, size, data = await _consume(upload, allowed, max_bytes)
+    return StoredUpload(None, digest, size, ext, CONTENT_TYPES[ext], data)
+
+
+async def save_upload(upload: UploadFile, basename: str, allowed: Set[str], max_bytes: int, directory: str = UPLOAD_DIR) -> StoredUpload:
+    # Written to a unique temp name and renamed into place, so readers (and other
+    # workers) never see a half-written file.
+    tmp_path = os.path.join(directory, f".{basename}.{uuid.uuid4().hex}.part")
+    out = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        try:
+            ext, digest, size, data = await _consume(upload, allowed, max_bytes, out)
+        finally:
+            await asyncio.to_thread(out.close)
+        path = os.path.join(directory, f"{basename}.{ext}")
+        await asyncio.to_thread(os.replace, tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return StoredUpload(path, digest, size, ext, CONTENT_TYPES[ext], data)
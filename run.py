@@ -3,18 +3,29 @@ import os
 import sys
 
 # Wrapper to start the FastAPI backend from the root directory
+#   python run.py            single worker, no file watching
+#   python run.py --reload   development: restart on code changes
+#   python run.py --prod     production: one worker per core (see backend/serve.py)
 if __name__ == "__main__":
     # Ensure backend directory is in the Python path
     cwd = os.getcwd()
     sys.path.append(os.path.join(cwd, "backend"))
+    reload = "--reload" in sys.argv[1:]
+
+    if "--prod" in sys.argv[1:]:
+        from serve import serve
+        serve("main:app", app_dir=os.path.join(cwd, "backend"))
+        sys.exit(0)
     
     print(f"🚀 Starting AegisExam Backend from {cwd}...")
     print("📍 URL: http://localhost:8000")
+    if reload:
+        print("🔁 Auto-reload enabled")
     print("---------------------------------------------")
     
     # Run Uvicorn
     # 'backend.main:app' assumes the folder is 'backend' and file is 'main.py'
     try:
-        uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
+        uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=reload)
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user.")
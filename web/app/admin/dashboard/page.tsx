@@ -25,7 +25,8 @@ export default function AdminDashboard() {
             const response = await fetch('http://localhost:8000/analyze_integrity', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ alerts: mockAlerts })
+                // attempt_id lets the backend fold in only alerts it has not seen yet
+                body: JSON.stringify({ alerts: mockAlerts, attempt_id: `demo-${studentId}` })
             })
 
             if (!response.ok) throw new Error("Analysis Failed")
@@ -41,10 +41,23 @@ export function ExamInterface({ examId }: ExamInterfaceProps) {
 
     const [storedIdUrl, setStoredIdUrl] = useState<string | null>(null)
 
+    // ATTEMPT (one id per exam session; keys the server-side proctoring logs)
+    const [attemptId] = useState(() => {
+        if (typeof window === 'undefined') return ''
+        const key = `attempt_${examId}`
+        const existing = sessionStorage.getItem(key)
+        if (existing) return existing
+        const created = crypto.randomUUID()
+        sessionStorage.setItem(key, created)
+        return created
+    })
+
     // REFS
     const webcamRef = useRef<Webcam>(null)
     const canvasRef = useRef<HTMLCanvasElement>(null)
-    const mediaRecorderRef = useRef<MediaRecorder | null>(null)
+    const audioSocketRef = useRef<WebSocket | null>(null)
+    const audioContextRef = useRef<AudioContext | null>(null)
+    const audioStreamRef = useRef<MediaStream | null>(null)
     const internalVideoRef = useRef<HTMLVideoElement | null>(null)
 
     // PROCTORING HOOK
@@ -53,6 +66,10 @@ export function ExamInterface({ examId }: ExamInterfaceProps) {
         canvasRef: canvasRef
     })
 
+    const alertsRef = useRef(alerts)
+    alertsRef.current = alerts
+    const sentAlertsRef = useRef(0)
+
     const handleUserMedia = () => {
         if (webcamRef.current?.video) {
             internalVideoRef.current = webcamRef.current.video
@@ -109,6 +126,27 @@ export function ExamInterface({ examId }: ExamInterfaceProps) {
         return () => stopAudioMonitoring()
     }, [isVerified, isSubmitting])
 
+    // Ship new proctoring alerts to the backend in batches (one request per 5s, not per event)
+    useEffect(() => {
+        if (!attemptId) return
+        const interval = setInterval(async () => {
+            const pending = alertsRef.current.slice(sentAlertsRef.current)
+            if (pending.length === 0) return
+            try {
+                const res = await fetch(`http://localhost:8000/attempts/${attemptId}/logs`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ alerts: pending })
+                })
+                // On 503 (server backpressure) the batch stays pending and is retried
+                if (res.ok) sentAlertsRef.current += pending.length
+            } catch (e) {
+                console.error("Failed to upload proctoring logs", e)
+            }
+        }, 5000)
+        return () => clearInterval(interval)
+    }, [attemptId])
+
     // Proctoring Alerts Handler (Lockout Logic)
     useEffect(() => {
         if (alerts.length > 0) {
@@ -151,69 +189,54 @@ export function ExamInterface({ examId }: ExamInterfaceProps) {
         setLockoutReason(null)
     }
 
+    // Streams 16 kHz PCM over one WebSocket; the server cuts utterances on
+    // speech boundaries and pushes back a verdict per utterance
     const startAudioMonitoring = async () => {
+        if (!attemptId || audioSocketRef.current) return
         try {
             const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
-            const mediaRecorder = new MediaRecorder(stream)
-            mediaRecorderRef.current = mediaRecorder
+            audioStreamRef.current = stream
 
-            const chunks: Blob[] = []
+            const context = new AudioContext({ sampleRate: 16000 })
+            audioContextRef.current = context
+            await context.audioWorklet.addModule('/audio/pcm-capture-worklet.js')
+            const capture = new AudioWorkletNode(context, 'pcm-capture')
+            context.createMediaStreamSource(stream).connect(capture)
 
-            mediaRecorder.ondataavailable = (e) => {
-                if (e.data.size > 0) chunks.push(e.data)
-            }
+            const question = encodeURIComponent("General Exam Environment")
+            const socket = new WebSocket(`ws://localhost:8000/ws/audio/${attemptId}?question=${question}`)
+            socket.binaryType = 'arraybuffer'
+            audioSocketRef.current = socket
 
-            // Every 15 seconds, send audio
-            const interval = setInterval(() => {
-                if (mediaRecorder.state === 'recording') {
-                    mediaRecorder.stop()
-                    setTimeout(() => mediaRecorder.start(), 100)
-                }
-            }, 15000)
+            capture.port.onmessage = (e) => {
+                if (socket.readyState === WebSocket.OPEN) socket.send(e.data)
+            }
 
-            mediaRecorder.onstop = async () => {
-                if (chunks.length > 0) {
-                    const blob = new Blob(chunks, { type: 'audio/webm' })
-                    chunks.length = 0
-                    await analyzeAudio(blob)
+            socket.onmessage = (e) => {
+                const data = JSON.parse(e.data)
+                if (data.analysis && data.analysis.is_violation) {
+                    toast.error(`AUDIO VIOLATION: ${data.analysis.reason}`, {
+                        duration: 5000,
+                        icon: <ShieldAlert className="w-6 h-6 text-red-600 animate-pulse" />
+                    })
                 }
             }
 
-            mediaRecorder.start()
-            return () => clearInterval(interval)
+            socket.onclose = () => {
+                if (audioSocketRef.current === socket) audioSocketRef.current = null
+            }
         } catch (err) {
             console.error("Audio monitoring failed:", err)
         }
     }
 
     const stopAudioMonitoring = () => {
-        if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
-            mediaRecorderRef.current.stop()
-        }
-        mediaRecorderRef.current?.stream.getTracks().forEach(track => track.stop())
-    }
-
-    const analyzeAudio = async (audioBlob: Blob) => {
-        const formData = new FormData()
-        formData.append("file", audioBlob, "recording.webm")
-        formData.append("question", "General Exam Environment")
-
-        try {
-            const res = await fetch('http://localhost:8000/analyze_audio_file', {
-                method: 'POST',
-                body: formData
-            })
-
-            const data = await res.json()
-            if (data.analysis && data.analysis.is_violation) {
-                toast.error(`AUDIO VIOLATION: ${data.analysis.reason}`, {
-                    duration: 5000,
-                    icon: <ShieldAlert className="w-6 h-6 text-red-600 animate-pulse" />
-                })
-            }
-        } catch (e) {
-            console.error("Audio upload failed", e)
-        }
+        audioSocketRef.current?.close()
+        audioSocketRef.current = null
+        audioContextRef.current?.close()
+        audioContextRef.current = null
+        audioStreamRef.current?.getTracks().forEach(track => track.stop())
+        audioStreamRef.current = null
     }
 
     const handleGrade = async () => {
@@ -82,7 +82,13 @@ export default function IdentityVerification({ onVerified, storedIdUrl }: Identi
 
         const selfieFile = dataURLtoFile(selfieBase64, "selfie.jpg");
         const formData = new FormData();
-        formData.append("id_card", idImage); // Name must match backend 'id_card'
+        const storedUser = localStorage.getItem("user");
+        if (storedIdUrl && storedUser) {
+            // Registered ID card: the backend reuses its stored copy (and cached verdicts)
+            formData.append("user_id", JSON.parse(storedUser).id);
+        } else {
+            formData.append("id_card", idImage); // Name must match backend 'id_card'
+        }
         formData.append("webcam_image", selfieFile); // Name must match backend 'webcam_image'
 
         try {
@@ -0,0 +1,37 @@
+// Captures microphone audio as 16-bit PCM for /ws/audio streaming.
+// The AudioContext runs at 16 kHz, so frames only need converting, not resampling.
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+    constructor() {
+        super()
+        this.pending = []
+        this.pendingSamples = 0
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0]
+        if (channel) {
+            const pcm = new Int16Array(channel.length)
+            for (let i = 0; i < channel.length; i++) {
+                const s = Math.max(-1, Math.min(1, channel[i]))
+                pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff
+            }
+            this.pending.push(pcm)
+            this.pendingSamples += pcm.length
+            // ~250 ms per message keeps WebSocket overhead low
+            if (this.pendingSamples >= sampleRate / 4) {
+                const out = new Int16Array(this.pendingSamples)
+                let offset = 0
+                for (const part of this.pending) {
+                    out.set(part, offset)
+                    offset += part.length
+                }
+                this.port.postMessage(out.buffer, [out.buffer])
+                this.pending = []
+                this.pendingSamples = 0
+            }
+        }
+        return true
+    }
+}
+
+registerProcessor('pcm-capture', PcmCaptureProcessor)